@@ -9,32 +9,34 @@ RandomForest 기반 사각지대(공급 대비 과도한 위험) 진단
 - 그래서 '정책이 정상 작동한 지역'에서 공급→위험의 평균적 관계를 학습하고,
   그 관계로부터 벗어난 지역을 사각지대로 진단한다.
 """
-import shap
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
-from config import SUPPLY_VARS, OUTPUT_DIR
+from config import SUPPLY_VARS, OUTPUT_DIR, CACHE_DIR, AI_RF_PARAMS
+from index_calculator import classify_quadrants
+from model_store import fit_or_load, load_model, model_hash
 
+# model_store 저장 이름 (대시보드 / 시나리오 도구: model_store.load_model(BLINDSPOT_MODEL))
+BLINDSPOT_MODEL = "ai_blindspot_rf"
 
-def run_ai_diagnosis(df, df_final):
-    """
-    A/B 유형(정상 작동 지역)에서 학습한
-    '공급 → 위험 완화의 평균적 정책 효과'를 기준으로,
-    실제 위험이 과도한 지역을 사각지대로 진단한다.
+# 행별 SHAP 값 캐시 ({모델 해시}.npz: 행 해시 → SHAP 값)
+SHAP_CACHE_DIR = CACHE_DIR / "shap"
 
-    입력:
-      - df: (원본 통합 데이터) district + supply 변수들(SUPPLY_VARS) 포함
-            ※ 여기에서 '공급 변수'를 가져옴
-      - df_final: (최종 지표 테이블) district + Need_Index + Supply_Index 포함
-            ※ 여기에서 'Need/Supply 지수'와 사분면, 결과 컬럼을 생성함
 
-    출력:
-      - df_final: Quadrant, Predicted_Need_by_Supply, Inefficiency 컬럼이 추가된 결과
-      - model: AB 지역으로 학습한 RandomForest 모델
+def fit_blindspot_model(df, df_final, use_store=True):
     """
+    4사분면 분류 + A/B 지역에서 '공급 → 위험' 모델 학습
 
-    print("\n" + "=" * 60)
-    print("🤖 AI 기반 사각지대 진단 (RandomForest)")
-    print("=" * 60)
+    입력은 run_ai_diagnosis와 같고, df_final에 Quadrant 컬럼을 채운다.
+    use_store=True면 학습 입력(A/B 데이터 + 설정)이 같을 때 model_store에 저장된 모델을 사용
+    반환: AB 지역으로 학습한 RandomForest 모델
+    """
+    # sklearn은 import 시간이 길어 이 단계가 실제로 실행될 때만 불러온다.
+    from sklearn.ensemble import RandomForestRegressor
 
     # =====================================================
     # 0. 4사분면 분류 (Need / Supply 중앙값 기준)
@@ -47,30 +49,19 @@ def run_ai_diagnosis(df, df_final):
     # B: Need 낮고, Supply 낮음  → "양호형" (위험 낮고 공급도 낮음: 큰 문제 없음)
     # C: Need 높고, Supply 낮음  → "심각부족형" (위험 높은데 공급 부족)
     # D: Need 높고, Supply 높음  → "고위험 대응형" (위험도 높고 공급도 많은데 해결이 어려운 유형)
-    
-    def assign_quadrant(row, median_need, median_supply):
-        # Need가 중앙값보다 낮고, Supply가 중앙값 이상이면 A
-        if row["Need_Index"] < median_need and row["Supply_Index"] >= median_supply:
-            return "A"  # 과잉공급형
-        # Need 낮고 Supply도 낮으면 B
-        elif row["Need_Index"] < median_need and row["Supply_Index"] < median_supply:
-            return "B"  # 양호형
-        # Need 높고 Supply 낮으면 C (가장 전형적인 "지원 부족" 문제)
-        elif row["Need_Index"] >= median_need and row["Supply_Index"] < median_supply:
-            return "C"  # 심각부족형
-        # Need 높고 Supply도 높으면 D (공급이 있음에도 위험이 높음)
-        else:
-            return "D"  # 고위험 대응형
+    #
+    # 분류 규칙은 index_calculator.classify_quadrants와 동일 (배열 단위 한 번에 분류)
 
     # 중앙값 계산 (서울 25개 자치구 표본의 가운데 값)
     median_need = df_final["Need_Index"].median()
     median_supply = df_final["Supply_Index"].median()
 
     # 각 자치구에 대해 Quadrant(A/B/C/D) 라벨을 부여
-    df_final["Quadrant"] = df_final.apply(
-        assign_quadrant,
-        axis=1,
-        args=(median_need, median_supply)
+    df_final["Quadrant"] = classify_quadrants(
+        df_final["Need_Index"].to_numpy(),
+        df_final["Supply_Index"].to_numpy(),
+        median_need,
+        median_supply,
     )
 
     # =====================================================
@@ -119,13 +110,43 @@ def run_ai_diagnosis(df, df_final):
     # RandomForest 사용 이유(직관):
     # - 선형 모델이 놓치기 쉬운 비선형 관계/상호작용(예: 특정 인프라 조합) 포착 가능
     # - 단, 표본이 작아 과적합 위험이 있으므로 깊이 제한 등 튜닝이 중요할 수 있음
-    model = RandomForestRegressor(
-        n_estimators=300,   # 트리 개수 (많을수록 안정적이지만 과적합은 깊이에서 주로 발생)
-        max_depth=6,        # 트리 깊이 제한 (너무 깊으면 n=25에서 과적합 쉽게 발생)
-        random_state=42
+    # - 하이퍼파라미터는 config.AI_RF_PARAMS (트리 300개, 깊이 6)
+    # - 같은 학습 입력이면 저장소의 모델을 재사용 (다시 학습하지 않음, 실행마다 예측 동일)
+    if not use_store:
+        model = RandomForestRegressor(**AI_RF_PARAMS)
+        model.fit(X_train, y_train)
+        return model
+
+    model, _ = fit_or_load(
+        BLINDSPOT_MODEL,
+        lambda: RandomForestRegressor(**AI_RF_PARAMS),
+        X_train,
+        y_train,
+        AI_RF_PARAMS,
     )
-    model.fit(X_train, y_train)
+    return model
+
+
+def load_blindspot_model():
+    """
+    파이프라인(main.py diagnose)이 저장한 사각지대 모델을 학습 없이 불러오기
 
+    - 정책 시뮬레이터 / 최적화 / 반사실 도구가 사용
+    - 파이프라인이 마지막으로 사용한 키(model_store의 {이름}.current)의 모델을 정확히 불러옴
+      (CSV에서 다시 읽은 값으로 학습하면 부동소수점 끝자리 차이로 다른 모델이 되므로 학습하지 않음)
+    - 저장된 모델이 없으면 FileNotFoundError, 변수 구성이 SUPPLY_VARS와 다르면 ValueError
+    """
+    model, meta = load_model(BLINDSPOT_MODEL)
+    if meta.get("features", SUPPLY_VARS) != SUPPLY_VARS:
+        raise ValueError(
+            f"[ai_diagnosis] 저장된 모델의 변수 구성이 SUPPLY_VARS와 다름: {meta.get('features')} "
+            "→ python main.py diagnose를 다시 실행"
+        )
+    return model
+
+
+def score_blindspots(model, df, df_final):
+    """학습한 모델로 전체 지역의 기대 Need와 사각지대 점수(Inefficiency)를 df_final에 기록"""
     # =====================================================
     # 3. 모든 지역에 대해 "정책 기준 위험도" 예측
     # =====================================================
@@ -153,37 +174,114 @@ def run_ai_diagnosis(df, df_final):
     df_final["Inefficiency"] = (
         df_final["Need_Index"] - df_final["Predicted_Need_by_Supply"]
     )
+    return df_final
 
-    # =====================================================
-    # 5. 사각지대 순위 테이블
-    # =====================================================
-    # 사각지대(양수) 후보를 높은 순서대로 보기 위해
-    # Inefficiency 내림차순으로 정렬한 표를 만든다.
-    df_ai = (
-        df_final[[
-            "district",
-            "Quadrant",
-            "Need_Index",
-            "Supply_Index",
-            "Predicted_Need_by_Supply",
-            "Inefficiency"
-        ]]
-        .sort_values("Inefficiency", ascending=False)
-        .reset_index(drop=True)
-    )
 
-    print("\n🚨 AI가 찾은 사각지대 TOP 10")
-    print(df_ai.head(10).to_string(index=False))
+def _shap_chunk(args):
+    """
+    행 묶음 하나의 SHAP 값 (병렬 작업 단위)
 
-    # 순위 테이블 저장:
-    # OUTPUT_DIR는 config에서 Path 객체로 정의되어 있다고 가정 (OUTPUT_DIR / "파일명" 사용)
-    df_ai.to_csv(
-        OUTPUT_DIR / "ai_blindspot_ranking.csv",
-        index=False,
-        encoding="utf-8-sig"
-    )
-    print("💾 ai_blindspot_ranking.csv 저장 완료")
+    TreeExplainer 기본 방식(tree_path_dependent):
+    - 배경 데이터 없이 트리에 저장된 학습 표본 수로 조건부 기댓값을 계산하는 정확한 Tree SHAP
+    - 비용이 '행 수 × 트리 수 × 잎 수 × 깊이²'라 배경 데이터 크기와 무관
+    """
+    # shap은 import 시간이 길어 실제로 실행될 때만 불러온다.
+    import shap
+
+    model, X = args
+    return shap.TreeExplainer(model).shap_values(X)
+
+
+def _row_hashes(X):
+    """행별 내용 해시 (float64 바이트, 16자리)"""
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    return np.array([hashlib.sha256(row.tobytes()).hexdigest()[:16] for row in X])
+
+
+def _load_shap_cache(key):
+    path = SHAP_CACHE_DIR / f"{key}.npz"
+    if not path.exists():
+        return {}
+    with np.load(path) as data:
+        return dict(zip(data["rows"].tolist(), data["values"]))
+
+
+def _save_shap_cache(key, cache):
+    """모델 해시별 캐시 파일 하나 (다른 모델의 오래된 캐시는 정리)"""
+    SHAP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = SHAP_CACHE_DIR / f"{key}.npz"
+
+    # 프로세스마다 다른 임시 파일에 쓴 뒤 교체 (동시에 저장해도 서로의 임시 파일을 덮어쓰지 않음)
+    with tempfile.NamedTemporaryFile(dir=SHAP_CACHE_DIR, prefix=f"{key}.", suffix=".tmp.npz", delete=False) as f:
+        np.savez(f, rows=np.array(list(cache)), values=np.array(list(cache.values())))
+    os.replace(f.name, path)
+
+    # 완성된 캐시 파일만 정리 (다른 프로세스가 쓰는 중인 .tmp.npz는 건드리지 않음)
+    for old in SHAP_CACHE_DIR.glob("*.npz"):
+        if old != path and not old.name.endswith(".tmp.npz"):
+            old.unlink(missing_ok=True)
+
+
+def explain_blindspots(model, X_all, rows=None, n_jobs=None, chunk_size=500, use_cache=True):
+    """
+    모델 예측에 대한 공급 변수별 SHAP 값 (정확한 Tree SHAP, 필요한 행만)
+
+    입력:
+    - X_all: 전체 지역의 공급 변수 (DataFrame, SUPPLY_VARS)
+    - rows: 설명할 행 (불리언 마스크 또는 위치 목록, None이면 전체)
+    - n_jobs: 병렬 프로세스 수 (None이면 CPU 수, 1이면 단일 프로세스)
+    - chunk_size: 작업 하나의 행 수
+    - use_cache: (모델 해시, 행 해시)가 같은 행은 저장된 값을 그대로 사용
+
+    반환: (설명한 행 수, 변수 수) SHAP 값 행렬 (rows 순서)
+    """
+    X = X_all.to_numpy(dtype=float) if hasattr(X_all, "to_numpy") else np.asarray(X_all, dtype=float)
+    if rows is not None:
+        X = X[rows]
+    values = np.empty(X.shape)
 
+    # 1. 캐시에 있는 행은 건너뜀
+    hashes = _row_hashes(X)
+    key = model_hash(model) if use_cache else None
+    cache = _load_shap_cache(key) if use_cache else {}
+    missing = np.array([h not in cache for h in hashes], dtype=bool)
+    for i in np.flatnonzero(~missing):
+        values[i] = cache[hashes[i]]
+
+    # 2. 나머지 행만 청크로 나눠 병렬 계산
+    todo = np.flatnonzero(missing)
+    if len(todo):
+        chunks = [todo[s:s + chunk_size] for s in range(0, len(todo), chunk_size)]
+        tasks = [(model, X[c]) for c in chunks]
+
+        n_jobs = n_jobs or os.cpu_count() or 1
+        if n_jobs == 1 or len(tasks) == 1:
+            parts = list(map(_shap_chunk, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as pool:
+                parts = list(pool.map(_shap_chunk, tasks))
+
+        for c, part in zip(chunks, parts):
+            values[c] = part
+
+        if use_cache:
+            cache.update(zip(hashes[todo].tolist(), values[todo]))
+            _save_shap_cache(key, cache)
+
+    return values
+
+
+def run_blindspot_explanation(df, df_final, model, out_dir=OUTPUT_DIR, n_jobs=None):
+    """
+    사각지대 후보(Inefficiency > 0) 지역만 SHAP으로 설명하고 ai_blindspot_shap.csv 저장
+
+    입력:
+      - df: 원본 통합 데이터 (SUPPLY_VARS)
+      - df_final: run_ai_diagnosis 결과 (Quadrant, Inefficiency 포함, df와 같은 행 순서)
+      - model: AB 지역으로 학습한 RandomForest 모델
+    출력:
+      - 사각지대 후보 지역의 SHAP 테이블 (SUPPLY_VARS + district, Inefficiency, Quadrant)
+    """
     # =====================================================
     # 6. SHAP 기반 원인 분석
     # =====================================================
@@ -197,16 +295,15 @@ def run_ai_diagnosis(df, df_final):
     #   "이 변수가 모델의 예측을 이렇게 밀어올렸다/내렸다" 수준의 해석이 안전하다.
     print("\n🔍 SHAP 기반 원인 분석 시작")
 
-    # shap.Explainer(model, X_all):
-    # - 트리 모델이므로 내부적으로 TreeExplainer를 사용하게 될 가능성이 큼
-    # - X_all은 background/데이터 분포 정보로 활용될 수 있음
-    explainer = shap.Explainer(model, X_all)
-    shap_values = explainer(X_all)
+    # 사각지대 의심 지역만 설명:
+    # Inefficiency > 0인 지역(공급 대비 Need가 과도한 지역)만 계산
+    # (전체 지역을 설명한 뒤 걸러내지 않음 → 지역 수가 많을수록 계산량 차이가 큼)
+    mask = (df_final["Inefficiency"] > 0).to_numpy()
 
-    # shap_values.values: (샘플 수, 변수 수) 형태의 SHAP 값 행렬
-    # 이를 DataFrame으로 만들어 변수명(SUPPLY_VARS)을 컬럼으로 붙인다.
-    shap_df = pd.DataFrame(
-        shap_values.values,
+    # (후보 지역 수, 변수 수) 형태의 SHAP 값 행렬을
+    # DataFrame으로 만들어 변수명(SUPPLY_VARS)을 컬럼으로 붙인다.
+    blindspots = pd.DataFrame(
+        explain_blindspots(model, df[SUPPLY_VARS], rows=mask, n_jobs=n_jobs),
         columns=SUPPLY_VARS
     )
 
@@ -214,23 +311,86 @@ def run_ai_diagnosis(df, df_final):
     # - district 라벨을 붙여서 어떤 자치구의 SHAP인지 식별 가능하게 함
     # - Inefficiency(사각지대 점수)를 붙여서 "사각지대일수록 어떤 변수 패턴이 있나" 탐색 가능
     # - Quadrant(A/B/C/D)도 같이 저장하여 유형별 비교 가능
-    shap_df["district"] = df["district"].values
-    shap_df["Inefficiency"] = df_final["Inefficiency"].values
-    shap_df["Quadrant"] = df_final["Quadrant"].values
-
-    # 사각지대 의심 지역만 저장:
-    # Inefficiency > 0인 지역(공급 대비 Need가 과도한 지역)만 필터링
-    blindspots = shap_df[shap_df["Inefficiency"] > 0]
+    blindspots["district"] = df["district"].values[mask]
+    blindspots["Inefficiency"] = df_final["Inefficiency"].values[mask]
+    blindspots["Quadrant"] = df_final["Quadrant"].values[mask]
 
     # SHAP 결과 저장:
     # 이 파일은 "사각지대 후보 지역들의 변수 기여도" 테이블이라고 보면 됨
     blindspots.to_csv(
-        OUTPUT_DIR / "ai_blindspot_shap.csv",
+        out_dir / "ai_blindspot_shap.csv",
         index=False,
         encoding="utf-8-sig"
     )
 
     print("💾 ai_blindspot_shap.csv 저장 완료")
+    return blindspots
+
+
+def run_ai_diagnosis(df, df_final, out_dir=OUTPUT_DIR, explain=True):
+    """
+    A/B 유형(정상 작동 지역)에서 학습한
+    '공급 → 위험 완화의 평균적 정책 효과'를 기준으로,
+    실제 위험이 과도한 지역을 사각지대로 진단한다.
+
+    입력:
+      - df: (원본 통합 데이터) district + supply 변수들(SUPPLY_VARS) 포함
+            ※ 여기에서 '공급 변수'를 가져옴
+      - df_final: (최종 지표 테이블) district + Need_Index + Supply_Index 포함
+            ※ 여기에서 'Need/Supply 지수'와 사분면, 결과 컬럼을 생성함
+      - out_dir: 결과 CSV 저장 디렉토리 (기본 OUTPUT_DIR)
+      - explain: True면 사각지대 후보의 SHAP 분석(ai_blindspot_shap.csv)까지 실행
+
+    출력:
+      - df_final: Quadrant, Predicted_Need_by_Supply, Inefficiency 컬럼이 추가된 결과
+      - model: AB 지역으로 학습한 RandomForest 모델
+    """
+
+    print("\n" + "=" * 60)
+    print("🤖 AI 기반 사각지대 진단 (RandomForest)")
+    print("=" * 60)
+
+    # 0~2. 4사분면 분류 + A/B 지역으로 모델 학습
+    model = fit_blindspot_model(df, df_final)
+
+    # 3~4. 전체 지역 기대 Need / 사각지대 점수
+    score_blindspots(model, df, df_final)
+
+    # =====================================================
+    # 5. 사각지대 순위 테이블
+    # =====================================================
+    # 사각지대(양수) 후보를 높은 순서대로 보기 위해
+    # Inefficiency 내림차순으로 정렬한 표를 만든다.
+    df_ai = (
+        df_final[[
+            "district",
+            "Quadrant",
+            "Need_Index",
+            "Supply_Index",
+            "Predicted_Need_by_Supply",
+            "Inefficiency"
+        ]]
+        .sort_values("Inefficiency", ascending=False)
+        .reset_index(drop=True)
+    )
+
+    print("\n🚨 AI가 찾은 사각지대 TOP 10")
+    print(df_ai.head(10).to_string(index=False))
+
+    # 순위 테이블 저장:
+    # out_dir는 Path 객체 (기본값 config.OUTPUT_DIR, out_dir / "파일명" 사용)
+    df_ai.to_csv(
+        out_dir / "ai_blindspot_ranking.csv",
+        index=False,
+        encoding="utf-8-sig"
+    )
+    print("💾 ai_blindspot_ranking.csv 저장 완료")
+
+    # 6. SHAP 기반 원인 분석 (사각지대 후보 지역만)
+    #    main.py 파이프라인은 explain=False로 호출하고 별도 단계(ai_shap)에서 실행
+    if explain:
+        run_blindspot_explanation(df, df_final, model, out_dir)
+
     print("✅ AI 기반 사각지대 진단 완료")
     print("=" * 60)
 
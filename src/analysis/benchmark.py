@@ -0,0 +1,240 @@
+"""
+benchmark.py
+
+합성 지역 규모별 파이프라인 단계 벤치마크
+
+역할 요약:
+- NEED_VARS / SUPPLY_VARS와 같은 스키마의 합성 테이블을
+  25 / 250 / 3,500 / 50,000개 지역 규모로 만든다.
+  (서울 자치구 → 시군구 → 전국 읍면동 규모를 가정)
+- 규모마다 단계(정규화, 지수, Gap/4사분면, 순위, RF 진단, SHAP, Need 요인)를
+  instrumentation.measure로 측정하고
+  결과를 BENCH_HISTORY_PATH(JSON lines)에 누적 저장
+- 같은 규모 · 단계의 이전 최고 기록보다 tolerance배 이상 느려지면 회귀로 표시
+
+→ 규모가 커질 때 어느 단계가 먼저 한계에 닿는지,
+  코드 변경으로 느려진 단계가 없는지를 배포 전에 확인하기 위한 도구
+
+사용 예:
+    python benchmark.py                       # 기본 규모 전체
+    python benchmark.py --sizes 25 250        # 일부 규모만
+    python benchmark.py --check               # 회귀가 있으면 종료 코드 1
+"""
+import argparse
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config import BASE_DIR, NEED_VARS, SUPPLY_VARS
+from instrumentation import METRICS_PATH, measure, set_quiet
+
+BENCH_HISTORY_PATH = METRICS_PATH.parent / "benchmark_history.jsonl"
+
+SIZES = [25, 250, 3_500, 50_000]
+
+
+# =====================================================
+# 1. 합성 데이터
+# =====================================================
+def make_synthetic_regions(n_regions, template=None, noise=0.1, seed=42):
+    """
+    실제 자치구 테이블을 틀로 한 합성 지역 테이블
+
+    - 변수마다 실제 값 중 하나를 뽑고 로그정규 잡음(±noise 정도)을 곱한다.
+      → 변수별 단위 / 범위는 실제 데이터와 비슷하게 유지
+    - 반환: district + NEED_VARS + SUPPLY_VARS (load_data()와 같은 컬럼 구성)
+    """
+    if template is None:
+        from table_store import load_district_table
+        template = load_district_table("merged")
+
+    rng = np.random.default_rng(seed)
+    variables = NEED_VARS + SUPPLY_VARS
+    base = template[variables].to_numpy(dtype=float)
+
+    picks = rng.integers(0, len(base), size=(n_regions, len(variables)))
+    values = base[picks, np.arange(len(variables))]
+    values *= rng.lognormal(0.0, noise, size=values.shape)
+
+    df = pd.DataFrame(values, columns=variables)
+    df.insert(0, "district", [f"R{i:06d}" for i in range(n_regions)])
+    return df
+
+
+# =====================================================
+# 2. 단계 실행
+# =====================================================
+def _quietly(func):
+    """단계 함수의 배너 출력을 숨긴다 (측정 시간에 콘솔 출력이 섞이지 않도록)"""
+    def wrapper(*args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*args)
+    return wrapper
+
+
+def _stages(out_dir):
+    """(단계 이름, 함수, 입력 이름 목록) — 앞 단계 결과를 이름으로 받는다"""
+    from data_loader import normalize_data
+    from index_calculator import (
+        calculate_need_index,
+        calculate_supply_index,
+        calculate_gap_index,
+        save_rankings,
+    )
+    from ai_diagnosis import fit_blindspot_model, score_blindspots, explain_blindspots
+    from need_driver import run_need_driver_analysis
+
+    def indices(norm):
+        return calculate_need_index(norm[0].copy()), calculate_supply_index(norm[1].copy())
+
+    def rf_diagnosis(df, tables):
+        df_final = tables["analysis"].copy()
+        # 저장소를 쓰면 두 번째 실행부터 학습 대신 로드 시간을 재게 되므로 항상 학습
+        model = fit_blindspot_model(df, df_final, use_store=False)
+        return score_blindspots(model, df, df_final), model
+
+    return [
+        ("normalize", normalize_data, ["df"]),
+        ("indices", indices, ["normalize"]),
+        ("gap_quadrant", lambda idx: calculate_gap_index(*idx), ["indices"]),
+        ("rankings", lambda df, idx: save_rankings(df, *idx, out_dir=out_dir), ["df", "indices"]),
+        ("rf_diagnosis", rf_diagnosis, ["df", "gap_quadrant"]),
+        # 전체 지역 설명 시간 (캐시 없이, 규모별 비교를 위해 사각지대 후보로 거르지 않음)
+        ("shap", lambda df, rf: explain_blindspots(rf[1], df[SUPPLY_VARS], use_cache=False),
+         ["df", "rf_diagnosis"]),
+        ("need_drivers", lambda idx: run_need_driver_analysis(idx[0]), ["indices"]),
+    ]
+
+
+def run_benchmark(sizes=SIZES, budget=120.0, seed=42):
+    """
+    규모별로 모든 단계를 측정한 레코드 목록 반환
+
+    - budget: 바로 앞 규모의 시간을 지역 수에 비례해 늘린 예상 시간이 이 값(초)을 넘으면
+      그 단계(와 그 결과를 쓰는 하위 단계)는 건너뜀
+      → 전국 규모에서 수십 분 걸리는 단계가 있어도 벤치마크 전체가 멈추지 않도록
+    - 레코드: instrumentation.measure 레코드 + n_regions, status("run" / "skipped")
+      (건너뛴 단계는 expected_s = 예상 시간)
+    """
+    set_quiet(True)
+    records, last = [], {}
+
+    with tempfile.TemporaryDirectory(prefix="mhvi_bench_") as tmp:
+        stages = _stages(Path(tmp))
+        for n in sizes:
+            results = {"df": make_synthetic_regions(n, seed=seed)}
+            for name, func, inputs in stages:
+                expected = last[name][1] * n / last[name][0] if name in last else 0.0
+                if expected > budget or any(d not in results for d in inputs):
+                    records.append({
+                        "stage": name, "n_regions": n, "status": "skipped",
+                        "expected_s": round(expected, 1),
+                    })
+                    print(f"  {n:>7,d}개 지역  {name:14s}  생략 (예상 {expected:,.0f}s)")
+                    continue
+
+                result, record = measure(name, _quietly(func), [results[d] for d in inputs])
+                results[name] = result
+                records.append({**record, "n_regions": n, "status": "run"})
+                print(f"  {n:>7,d}개 지역  {name:14s} {record['wall_s']:9.3f}s")
+                last[name] = (n, record["wall_s"])
+
+    return records
+
+
+# =====================================================
+# 3. 기록 / 회귀 비교
+# =====================================================
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path=BENCH_HISTORY_PATH):
+    if not path.exists():
+        return pd.DataFrame()
+    with open(path, encoding="utf-8") as f:
+        return pd.DataFrame([json.loads(line) for line in f if line.strip()])
+
+
+def append_history(records, path=BENCH_HISTORY_PATH):
+    """이번 실행 레코드를 run_id / 커밋과 함께 기록 파일에 추가"""
+    meta = {"run_id": datetime.now().strftime("%Y%m%dT%H%M%S"), "commit": _git_commit()}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps({**meta, **record}, ensure_ascii=False) + "\n")
+    return path
+
+
+def find_regressions(records, history, tolerance=1.5, min_seconds=0.05):
+    """
+    이전 기록 대비 느려진 (규모, 단계) 목록
+
+    - 비교 기준: 같은 규모 · 단계의 이전 최소 wall 시간
+    - min_seconds 미만의 짧은 단계는 측정 잡음이 커서 비교하지 않음
+    """
+    if history.empty:
+        return []
+    ran = history[history["status"] == "run"]
+    best = ran.groupby(["n_regions", "stage"])["wall_s"].min()
+
+    regressions = []
+    for r in records:
+        if r["status"] != "run":
+            continue
+        prev = best.get((r["n_regions"], r["stage"]))
+        if prev is not None and r["wall_s"] >= min_seconds and r["wall_s"] > prev * tolerance:
+            regressions.append({**r, "best_wall_s": prev, "ratio": r["wall_s"] / prev})
+    return regressions
+
+
+# =====================================================
+# 실행 진입점
+# =====================================================
+def main():
+    parser = argparse.ArgumentParser(description="합성 지역 규모별 단계 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="지역 수 목록")
+    parser.add_argument("--budget", type=float, default=120.0, help="단계별 예상 시간 한도(초), 넘으면 생략")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="이전 최고 기록 대비 회귀 판정 배수")
+    parser.add_argument("--check", action="store_true", help="회귀가 있으면 종료 코드 1")
+    parser.add_argument("--no-save", action="store_true", help="기록 파일에 추가하지 않음")
+    args = parser.parse_args()
+
+    history = load_history()
+    records = run_benchmark(args.sizes, budget=args.budget)
+
+    table = pd.DataFrame([r for r in records if r["status"] == "run"])
+    print("\n⏱️ 단계별 wall 시간 (초, 빈칸 = 예상 시간이 한도를 넘어 생략)")
+    print(table.pivot(index="stage", columns="n_regions", values="wall_s")
+          .reindex(list(dict.fromkeys(table["stage"]))).to_string())
+
+    regressions = find_regressions(records, history, tolerance=args.tolerance)
+    for r in regressions:
+        print(
+            f"⚠️ 회귀: {r['n_regions']:,d}개 지역 {r['stage']} "
+            f"{r['wall_s']:.3f}s (이전 최고 {r['best_wall_s']:.3f}s, {r['ratio']:.2f}배)"
+        )
+
+    if not args.no_save:
+        print(f"📁 기록: {append_history(records)}")
+
+    if args.check and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
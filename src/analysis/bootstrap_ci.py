@@ -0,0 +1,162 @@
+"""
+bootstrap_ci.py
+
+설문 추정치 표본오차에 대한 지수 / 순위 신뢰구간 (모수적 부트스트랩)
+
+역할 요약:
+- 우울감 경험률 · 스트레스 인지율 · 고위험 음주율 · 의료 미충족률은
+  지역사회건강조사 표본 추정치이므로 표본오차가 있다. (config.SURVEY_EFFECTIVE_N)
+- 복제본마다 이 변수들을 이항 분포로 다시 추출하고
+  (나머지 변수는 그대로) 정규화 → 지수 → 순위를 처음부터 다시 계산한다.
+- 복제본 묶음(청크) 하나는 (복제본 × 자치구 × 변수) 배열 하나로
+  index_calculator.compute_index_arrays가 한 번에 계산한다. (복제본 루프 없음)
+- 청크는 여러 코어에서 병렬 계산하고, 청크마다 seed에서 파생된 독립 난수열을 쓰므로
+  같은 seed면 코어 수와 무관하게 결과가 같다.
+
+출력:
+- need_index_ranking.csv와 같은 행 순서 · 컬럼에 신뢰구간 컬럼을 붙인
+  need_index_ranking_ci.csv
+  (Supply 변수는 설문 추정치가 아니므로 Supply_Index 구간은 계산하지 않음)
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config import OUTPUT_DIR, NEED_VARS, SUPPLY_VARS, SURVEY_EFFECTIVE_N
+from index_calculator import compute_index_arrays
+from weight_scenarios import _ranks
+
+VARIABLES = NEED_VARS + SUPPLY_VARS
+
+CI_PATH = OUTPUT_DIR / "need_index_ranking_ci.csv"
+
+
+# =====================================================
+# 1. 입력 재추출
+# =====================================================
+def perturb_survey(values, n, rng, effective_n=SURVEY_EFFECTIVE_N):
+    """
+    (자치구 × 변수) 원본 값 → (n × 자치구 × 변수) 복제본
+
+    - effective_n의 변수(%): 비율 p를 Binomial(n_eff, p) / n_eff로 다시 추출
+    - 나머지 변수: 원래 값 그대로 (복사 없이 broadcast 후 설문 열만 덮어씀)
+    """
+    block = np.repeat(values[None, :, :], n, axis=0)
+    for var, n_eff in effective_n.items():
+        k = VARIABLES.index(var)
+        p = np.clip(values[:, k] / 100.0, 0.0, 1.0)
+        block[:, :, k] = rng.binomial(n_eff, p, size=(n, len(p))) / n_eff * 100.0
+    return block
+
+
+# =====================================================
+# 2. 청크 단위 계산 (병렬 작업 단위)
+# =====================================================
+def _bootstrap_chunk(args):
+    """
+    복제본 청크 하나의 Need / Gap 지수와 순위 (모두 복제본 × 자치구)
+
+    메모리 절약을 위해 지수는 float32, 순위는 int32로 반환
+    """
+    values, n, seed_seq = args
+    rng = np.random.default_rng(seed_seq)
+
+    need, _, gap, _, _ = compute_index_arrays(perturb_survey(values, n, rng), VARIABLES)
+    return {
+        "need": need.astype(np.float32),
+        "gap": gap.astype(np.float32),
+        "need_rank": _ranks(need).astype(np.int32),
+        "gap_rank": _ranks(gap).astype(np.int32),
+    }
+
+
+def bootstrap_indices(df, n_boot=2_000, seed=42, chunk_size=200, n_jobs=None):
+    """
+    부트스트랩 복제본 전체 계산
+
+    입력:
+    - df: district + NEED_VARS + SUPPLY_VARS (load_district_table("merged"))
+    - n_boot: 복제본 수
+    - seed: 재현용 시드 (청크별 난수열은 SeedSequence.spawn으로 파생)
+    - chunk_size: 청크 하나의 복제본 수
+      (청크 배열 크기 = chunk_size × 자치구 수 × 변수 수, 동 규모 3,500곳이면 약 100MB)
+    - n_jobs: 병렬 프로세스 수 (None이면 CPU 수, 1이면 단일 프로세스)
+
+    반환:
+    - {"need", "gap", "need_rank", "gap_rank"}: (n_boot × 자치구) 배열
+    """
+    values = df[VARIABLES].to_numpy(dtype=float)
+
+    sizes = [min(chunk_size, n_boot - s) for s in range(0, n_boot, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(values, n, ss) for n, ss in zip(sizes, seeds)]
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or len(tasks) == 1:
+        parts = list(map(_bootstrap_chunk, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as pool:
+            parts = list(pool.map(_bootstrap_chunk, tasks))
+
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+
+# =====================================================
+# 3. 신뢰구간 표
+# =====================================================
+def summarize_ci(replicates, df_ranking, districts, level=0.95):
+    """
+    복제본 → need_index_ranking.csv 옆에 붙일 신뢰구간 컬럼
+
+    입력:
+    - df_ranking: need_index_ranking.csv와 같은 표 (district, Need_Index, rank)
+    - districts: 복제본 배열의 자치구 순서
+
+    추가 컬럼 (level=0.95면 2.5% / 97.5% 분위):
+    - Need_Index_CI_Low / _High,  Need_Rank_CI_Low / _High
+    - Gap_Index_CI_Low / _High,   Gap_Rank_CI_Low / _High
+    - Need_Rank_SD (순위 표준편차)
+    """
+    q = [(1 - level) / 2, (1 + level) / 2]
+
+    ci = pd.DataFrame({"district": districts})
+    for name, key in [("Need", "need"), ("Gap", "gap")]:
+        lo, hi = np.quantile(replicates[key], q, axis=0)
+        ci[f"{name}_Index_CI_Low"], ci[f"{name}_Index_CI_High"] = lo, hi
+
+        # 순위는 정수 분위수 (실제로 관측된 순위 값)
+        lo, hi = np.quantile(replicates[f"{key}_rank"], q, axis=0, method="inverted_cdf")
+        ci[f"{name}_Rank_CI_Low"], ci[f"{name}_Rank_CI_High"] = lo, hi
+
+    ci["Need_Rank_SD"] = replicates["need_rank"].std(axis=0)
+
+    return df_ranking.merge(ci, on="district", how="left")
+
+
+# =====================================================
+# 실행 진입점
+# =====================================================
+def main():
+    import time
+    from table_store import load_district_table
+
+    df = load_district_table("merged")
+    df_ranking = pd.read_csv(OUTPUT_DIR / "need_index_ranking.csv", encoding="utf-8-sig")
+
+    start = time.perf_counter()
+    replicates = bootstrap_indices(df)
+    elapsed = time.perf_counter() - start
+
+    df_ci = summarize_ci(replicates, df_ranking, df["district"].tolist())
+    df_ci.to_csv(CI_PATH, index=False, encoding="utf-8-sig")
+
+    print(f"\n🎲 설문 표본오차 부트스트랩: {len(replicates['need']):,}회 ({elapsed:.2f}초)")
+    print(df_ci[["district", "rank", "Need_Rank_CI_Low", "Need_Rank_CI_High",
+                 "Need_Index_CI_Low", "Need_Index_CI_High"]].head(10).to_string(index=False))
+    print(f"📁 저장 위치: {CI_PATH}")
+
+
+if __name__ == "__main__":
+    main()
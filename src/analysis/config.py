@@ -14,17 +14,17 @@ config.py
 → 분석 로직과 '정책적 판단 기준'을 분리하기 위한 핵심 파일
 """
 from pathlib import Path
-import matplotlib.pyplot as plt
 
 # =====================================================
 # 1. 시각화 환경 설정 (한글 깨짐 방지)
 # =====================================================
-# matplotlib에서 한글이 깨지는 문제를 방지하기 위해
-# 시스템에 설치된 'Malgun Gothic' 폰트를 기본 폰트로 지정
-plt.rcParams['font.family'] = 'Malgun Gothic'
-
-# 마이너스(-) 기호가 네모(□)로 깨지는 현상 방지
-plt.rcParams['axes.unicode_minus'] = False
+# matplotlib에서 한글이 깨지는 문제를 방지하기 위한 기본 폰트
+# (시스템에 설치된 'Malgun Gothic' 사용, 없으면 matplotlib 기본 폰트로 대체)
+#
+# ※ config를 import하는 것만으로 matplotlib이 로드되지 않도록
+#   값만 정의하고, 실제 적용은 visualization.py가 차트를 그릴 때 한다.
+#   (마이너스(-) 기호가 네모(□)로 깨지는 현상 방지 설정도 함께 적용)
+FONT_FAMILY = 'Malgun Gothic'
 
 # =====================================================
 # 2. 프로젝트 경로 설정
@@ -35,10 +35,25 @@ plt.rcParams['axes.unicode_minus'] = False
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 
+# KOSIS 등에서 내려받은 원본 데이터 디렉토리
+# (need/, supply/ 하위 폴더 + 자치구 경계 GeoJSON)
+RAW_DIR = BASE_DIR / "data" / "raw"
+
+# 정신건강 인프라(센터) 위치/개수 데이터 디렉토리 (대시보드 지도용)
+INFRA_DIR = BASE_DIR / "data" / "infra"
+
 # 전처리 완료된 입력 데이터가 저장된 디렉토리
 # (정규화, 지수 계산 직전 단계의 tidy 데이터 등)
 DATA_DIR = BASE_DIR / "data" / "processed"
 
+# 전처리 테이블의 바이너리 캐시 디렉토리
+# (원본 CSV 내용 해시를 키로 하는 .npy 파일, git에는 올리지 않음)
+CACHE_DIR = BASE_DIR / "data" / "cache"
+
+# 대시보드(src/ui/ui_3.py)가 읽는 최종 결과 파일
+# (4사분면 라벨이 "C: 심각 부족형" 형식인 대시보드용 표기)
+DASHBOARD_RESULT_PATH = DATA_DIR / "mhvi_final_result.csv"
+
 # 분석 결과(테이블)를 저장할 출력 디렉토리
 # 예: feature importance, SHAP 결과, 사각지대 랭킹 등
 OUTPUT_DIR = BASE_DIR / "data" / "outputs" / "tables"
@@ -48,6 +63,9 @@ OUTPUT_DIR = BASE_DIR / "data" / "outputs" / "tables"
 # exist_ok=True → 이미 존재해도 에러 발생 안 함
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# 4사분면 차트 등 그림 파일(PNG / SVG) 출력 디렉토리
+FIGURE_DIR = BASE_DIR / "data" / "outputs" / "figures"
+
 # =====================================================
 # 3. Need 변수 목록 (취약도 측면 지표)
 # =====================================================
@@ -90,6 +108,30 @@ SUPPLY_VARS = [
     'cultural_satisfaction'                      # 문화 만족도 (주관적 지표)
 ]
 
+# =====================================================
+# 4-1. 변수 방향 (변수가 속한 지수 기준)
+# =====================================================
+# normalization.py의 direction과 같은 규칙:
+# - "positive": 값이 클수록 그 지수 점수가 큼
+#               (Need 변수 → 더 취약, Supply 변수 → 공급이 더 많음)
+# - "negative": 반대 방향 → 정규화 점수를 뒤집어 사용 (0~100 방법은 100 - 점수, 그 외 부호 반전)
+#
+# index_calculator.compute_final_tables가 지수를 합산할 때 한 번만 적용한다.
+# (정규화기 normalizers/*.json은 방향 없이 저장 → 같은 변수를 두 번 뒤집지 않음)
+# 지금은 모든 변수가 positive → 정규화 점수를 그대로 사용
+VAR_DIRECTIONS = {
+    **{v: "positive" for v in NEED_VARS},
+    **{v: "positive" for v in SUPPLY_VARS},
+}
+
+# =====================================================
+# 4-2. 정규화 방법
+# =====================================================
+# Need / Supply 변수를 같은 스케일로 맞추는 방법 (normalization.py)
+# - "minmax": 0~100 (기본, 기존 결과와 동일)
+# - "zscore" / "rank" / "robust": 대안 시나리오 비교용
+NORM_METHOD = "minmax"
+
 # =====================================================
 # 5. Need 지수 가중치 (총합 = 1)
 # =====================================================
@@ -172,3 +214,60 @@ POLICY_SCENARIO = {
     "elderly_leisure_welfare_facilities_count": ("add", 8),
     "in_home_elderly_welfare_facilities_count": ("add", 4),
 }
+
+# 위 시나리오 항목 1회(= 정책 단위 1개)를 자치구 한 곳에 적용하는 비용 (억원)
+# - policy_optimizer.py의 예산 배분 최적화에서 사용
+# ⚠️ 실제 예산 자료가 아닌 비교용 가정값 → 예산실 단가로 교체해서 사용
+POLICY_UNIT_COST = {
+    "welfare_budget_per_capita": 300,                 # 복지 예산 10% 증액
+    "cultural_satisfaction": 20,                      # 문화 프로그램 확대
+    "parks_count": 40,                                # 소공원 4개 조성
+    "libraries_count": 60,                            # 작은도서관 2개
+    "public_sports_facilities_count": 80,             # 생활체육시설 2개
+    "medical_institutions_count": 10,                 # 의원 5곳 유치 지원
+    "health_promotion_centers_count": 50,             # 건강증진센터 1개
+    "elderly_leisure_welfare_facilities_count": 16,   # 경로당 8개
+    "in_home_elderly_welfare_facilities_count": 12,   # 재가 노인복지시설 4개
+}
+
+# =====================================================
+# 8. 모델 하이퍼파라미터
+# =====================================================
+# RandomForest 설정을 한 곳에 모아 두어
+# main.py 파이프라인이 '설정이 바뀐 모델 단계만' 다시 실행할 수 있게 함
+#
+# ai_diagnosis.py: 공급 → Need 기준선 모델 (A/B 지역 학습)
+AI_RF_PARAMS = {
+    "n_estimators": 300,   # 트리 개수 (많을수록 안정적이지만 과적합은 깊이에서 주로 발생)
+    "max_depth": 6,        # 트리 깊이 제한 (너무 깊으면 n=25에서 과적합 쉽게 발생)
+    "random_state": 42,
+}
+
+# tree_based_need_analysis.py: 자살률-Need 지표 동반성 모델
+TREE_RF_PARAMS = {
+    "n_estimators": 300,
+    "max_depth": 4,
+    "min_samples_split": 3,
+    "min_samples_leaf": 2,
+    "max_features": "sqrt",
+    "random_state": 42,
+    "n_jobs": -1,
+}
+
+# =====================================================
+# 9. 설문 추정치 불확실성 (부트스트랩 신뢰구간)
+# =====================================================
+# 지역사회건강조사 기반 비율 변수(%)는 표본 추정치이므로 표본오차가 있다.
+# 원본 KOSIS 파일에는 표준오차가 없어서
+# 자치구별 유효 표본 수(n_eff)로 이항 표본오차를 근사한다.
+#   - 자치구(보건소)당 조사 표본 약 900명, 설계효과 약 1.5 → 유효 표본 약 600명
+#   - 표준오차 ≈ sqrt(p(1-p) / n_eff)
+#
+# bootstrap_ci.py가 이 값으로 입력을 다시 추출해
+# Need / Gap 지수와 순위의 신뢰구간을 계산한다.
+SURVEY_EFFECTIVE_N = {
+    'depression_experience_rate': 600,
+    'perceived_stress_rate': 600,
+    'high_risk_drinking_rate': 600,
+    'unmet_medical_need_rate': 600,
+}
@@ -0,0 +1,425 @@
+"""
+counterfactual.py
+
+자치구별 반사실(counterfactual) 탐색: "무엇이 바뀌면 사각지대에서 벗어나는가"
+
+역할 요약:
+- ai_blindspot_ranking.csv에서 Inefficiency > 0인 자치구마다
+  SUPPLY_VARS를 가장 적게 바꿔서 목표를 만족하는 공급 값을 찾는다.
+    · target="blindspot": Predicted_Need_by_Supply ≥ Need_Index - tolerance
+      (AI 기준선이 실제 Need를 설명 → Inefficiency ≤ tolerance)
+    · target="quadrant":  Supply_Index ≥ 공급 중앙값 (C: 심각부족형 → D로 이동)
+      ※ 4사분면의 Need 축은 공급 변수로 바뀌지 않으므로
+        C / D에서 A / B로 옮기는 공급 변화는 존재하지 않는다. (D는 이미 중앙값 이상)
+- 거리: 변수별 변화량을 관측 범위(최댓값 - 최솟값) 대비 0~100점으로 환산한 뒤
+  metric="l1"(변화량 합) 또는 "l2"(유클리드)
+- 탐색 범위: 변수별 관측 최솟값 ~ 최댓값 (데이터에 없는 공급 수준은 제안하지 않음)
+
+탐색 방법 (9개 변수 격자 전수 탐색 대신):
+- blindspot: RandomForest 예측은 트리 분할 기준값(threshold) 사이에서 일정하므로
+  변수마다 '분할 기준값으로 나뉜 구간' 중 현재 값에 가장 가까운 점만 후보로 둔다.
+    1) 탐욕: 한 변수를 다른 구간으로 옮기는 후보 전체를 한 번의 predict로 평가하고
+       '목표까지 좁힌 예측 차이 / 늘어난 거리'가 가장 큰 이동을 반복
+    2) 원형(prototype): 목표를 이미 만족하는 실제 자치구 중 가장 가까운 곳에서 출발
+    3) 가지치기: 원래 값으로 되돌려도 목표를 만족하는 변수는 되돌림 (거리 감소 큰 순)
+  → 1)과 2) 중 거리가 짧은 결과를 채택
+- quadrant: Supply_Index가 정규화 점수의 선형 가중합이므로 정확한 해를 바로 계산
+  (l1: 점수당 가중치가 큰 변수부터 채움, l2: 가중치 방향 이동 + 범위 자르기)
+- 자치구를 청크로 나눠 여러 코어에서 병렬 계산
+
+결과 상태(status):
+- "reached":   목표를 만족하는 변화 발견
+- "ceiling":   목표가 모델 예측 상한(트리별 최대 잎 값의 평균)보다 높아 어떤 공급 값으로도 불가능
+               (A/B 지역으로 학습한 모델은 A/B의 Need보다 크게 예측하지 못함)
+              → 탐색하지 않고 변화 없음으로 기록
+- "not_found": 탐색에서 찾지 못함 (가장 가까이 간 결과를 함께 기록)
+
+⚠️ 모델 기준의 가상 변화이며, 인과 효과나 정책 권고가 아님
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config import OUTPUT_DIR, SUPPLY_VARS
+
+COUNTERFACTUAL_PATH = OUTPUT_DIR / "ai_blindspot_counterfactual.csv"
+
+TARGETS = ("blindspot", "quadrant")
+METRICS = ("l1", "l2")
+
+# 분할 기준값 바로 옆 점을 고를 때의 간격 (관측 범위 대비 비율)
+EDGE_EPS = 1e-6
+
+# 작업 프로세스의 탐색 상태 (모델 포함) — 프로세스마다 _init_worker로 한 번만 전달
+_CTX = None
+
+
+# =====================================================
+# 1. 공통 계산
+# =====================================================
+def _distance(delta_score, metric):
+    """변화량(0~100 점수 단위, … × 변수) → 거리"""
+    if metric == "l1":
+        return np.abs(delta_score).sum(axis=-1)
+    return np.sqrt((delta_score ** 2).sum(axis=-1))
+
+
+def _predict(model, Z):
+    return model.predict(pd.DataFrame(Z, columns=SUPPLY_VARS))
+
+
+def split_grid(model, n_features=len(SUPPLY_VARS)):
+    """변수별 분할 기준값 (숲 전체 트리의 threshold, 정렬 · 중복 제거)"""
+    features, thresholds = [], []
+    for est in model.estimators_:
+        tree = est.tree_
+        internal = tree.feature >= 0
+        features.append(tree.feature[internal])
+        thresholds.append(tree.threshold[internal])
+    features, thresholds = np.concatenate(features), np.concatenate(thresholds)
+    return [np.unique(thresholds[features == f]) for f in range(n_features)]
+
+
+def prediction_ceiling(model):
+    """모델 예측의 상한: 트리별 최대 잎 값의 평균 (RandomForest 예측 = 트리 예측의 평균)"""
+    return float(np.mean([est.tree_.value.max() for est in model.estimators_]))
+
+
+def _cell_values(x_f, thresholds, lo, hi, eps):
+    """
+    변수 하나의 구간 후보: 분할 기준값으로 나뉜 구간마다 x_f에 가장 가까운 점
+
+    - 트리는 x ≤ threshold면 왼쪽 → 구간 (t_k, t_k+1]
+    - x_f보다 위 구간: 아래 경계 바로 위 (t_k + eps)
+    - x_f보다 아래 구간: 위 경계 바로 아래 (t_k+1 - eps, float32 변환 여유)
+    - 관측 범위 [lo, hi] 밖 구간은 제외, x_f가 속한 구간도 제외
+    """
+    t = thresholds[(thresholds >= lo) & (thresholds < hi)]
+    above = t[t >= x_f] + eps
+    below = t[t < x_f] - eps
+    values = np.concatenate([below[below >= lo], above[above <= hi]])
+    return np.unique(values)
+
+
+# =====================================================
+# 2. blindspot 목표: 트리 구간 탐색
+# =====================================================
+def _prune(ctx, x, z, pred, goal):
+    """목표를 유지하는 한, 원래 값으로 되돌렸을 때 거리가 가장 많이 줄어드는 변수부터 되돌림"""
+    while True:
+        changed = np.flatnonzero(z != x)
+        if len(changed) == 0:
+            return z, pred
+        cand = np.repeat(z[None, :], len(changed), axis=0)
+        cand[np.arange(len(changed)), changed] = x[changed]
+        preds = _predict(ctx["model"], cand)
+        ok = preds >= goal
+        if not ok.any():
+            return z, pred
+        dist = _distance((cand - x) * ctx["scale"], ctx["metric"])
+        best = np.flatnonzero(ok)[np.argmin(dist[ok])]
+        z, pred = cand[best], preds[best]
+
+
+def _greedy_cells(ctx, x, pred, goal, max_steps):
+    """
+    한 변수를 다른 구간으로 옮기는 이동을 반복 (후보 전체를 한 번의 predict로 평가)
+
+    점수 = min(예측, 목표) 증가량 / 거리 증가량 → 목표 쪽으로 가장 효율적인 이동
+    """
+    z, dist = x.copy(), 0.0
+    for _ in range(max_steps):
+        if pred >= goal:
+            break
+        cand = []
+        for f, grid in enumerate(ctx["grid"]):
+            values = _cell_values(z[f], grid, ctx["lo"][f], ctx["hi"][f], ctx["eps"][f])
+            block = np.repeat(z[None, :], len(values), axis=0)
+            block[:, f] = values
+            cand.append(block)
+        cand = np.concatenate(cand)
+        if len(cand) == 0:
+            break
+
+        preds = _predict(ctx["model"], cand)
+        progress = np.minimum(preds, goal) - min(pred, goal)
+        cost = _distance((cand - x) * ctx["scale"], ctx["metric"]) - dist
+        score = np.where(progress > 0, progress / np.maximum(cost, 1e-12), -np.inf)
+        best = int(np.argmax(score))
+        if not np.isfinite(score[best]):
+            break
+        z, pred = cand[best], preds[best]
+        dist = float(_distance((z - x) * ctx["scale"], ctx["metric"]))
+    return z, pred
+
+
+def _search_blindspot(ctx, x, need):
+    """자치구 하나의 blindspot 목표 탐색 → (z, 예측, status)"""
+    goal = need - ctx["tolerance"]
+    pred0 = float(_predict(ctx["model"], x[None, :])[0])
+    if pred0 >= goal:
+        return x.copy(), pred0, "reached"
+    if goal > ctx["ceiling"]:
+        # 어떤 공급 값으로도 도달 불가 → 탐색 없이 현재 값 그대로 보고
+        return x.copy(), pred0, "ceiling"
+
+    results = [_greedy_cells(ctx, x, pred0, goal, ctx["max_steps"])]
+
+    # 원형: 목표를 이미 만족하는 실제 자치구 중 가장 가까운 곳
+    feasible = ctx["proto_pred"] >= goal
+    if feasible.any():
+        protos = ctx["proto_X"][feasible]
+        near = np.argmin(_distance((protos - x) * ctx["scale"], ctx["metric"]))
+        results.append((protos[near].copy(), float(ctx["proto_pred"][feasible][near])))
+
+    best = None
+    for z, pred in results:
+        if pred >= goal:
+            z, pred = _prune(ctx, x, z, pred, goal)
+        dist = float(_distance((z - x) * ctx["scale"], ctx["metric"]))
+        key = (pred < goal, dist if pred >= goal else -pred)
+        if best is None or key < best[0]:
+            best = (key, z, pred)
+
+    _, z, pred = best
+    return z, pred, "reached" if pred >= goal else "not_found"
+
+
+# =====================================================
+# 3. quadrant 목표: 선형 지수의 정확한 해
+# =====================================================
+def _search_quadrant(ctx, x, supply):
+    """
+    Supply_Index ≥ 중앙값이 되는 최소 변화 (선형 가중합 → 닫힌 해)
+
+    Supply_Index 변화 = Σ supply_gain_f × 거리 단위 변화_f
+    (supply_gain_f: 변수 f를 관측 범위의 1%만큼 올릴 때의 Supply_Index 증가량)
+    """
+    # 중앙값과 정확히 같으면 D (classify_quadrants: ≥ 중앙값) → 반올림 오차만큼 여유
+    need = ctx["median_supply"] - supply + 1e-9
+    if need <= 1e-9:
+        return x.copy(), supply, "reached"
+
+    # 점수 1점(거리 단위) 이동당 Supply_Index 증가량, 올릴 수 있는 최대 점수
+    gain = ctx["supply_gain"]
+    room = (ctx["hi"] - x) * ctx["scale"]
+    room = np.where(gain > 0, room, 0.0)
+    if (gain * room).sum() < need:
+        return x + room / ctx["scale"], supply + (gain * room).sum(), "not_found"
+
+    if ctx["metric"] == "l1":
+        # 점수당 효율이 큰 변수부터 채움 (분수 배낭 문제)
+        step = np.zeros_like(x)
+        for f in np.argsort(-gain):
+            take = min(room[f], need / gain[f]) if gain[f] > 0 else 0.0
+            step[f], need = take, need - take * gain[f]
+            if need <= 1e-12:
+                break
+    else:
+        # l2: 가중치 방향으로 이동, 범위에 닿은 변수는 잘라서 고정 (이분 탐색으로 이동량 결정)
+        lo_t, hi_t = 0.0, float(room.max() / gain[gain > 0].min())
+        for _ in range(100):
+            t = (lo_t + hi_t) / 2
+            if (gain * np.minimum(t * gain, room)).sum() >= need:
+                hi_t = t
+            else:
+                lo_t = t
+        step = np.minimum(hi_t * gain, room)
+
+    z = x + step / ctx["scale"]
+    return z, supply + (gain * step).sum(), "reached"
+
+
+# =====================================================
+# 4. 청크 / 전체 실행
+# =====================================================
+def _init_worker(ctx):
+    """프로세스 풀 initializer: 모델(트리 300개)이 든 탐색 상태를 프로세스당 한 번만 받아 둠"""
+    global _CTX
+    _CTX = ctx
+
+
+def _counterfactual_chunk(rows):
+    """자치구 청크 하나의 탐색 결과 (z, 목표 값, status 목록) — 작업마다 행 번호만 전달"""
+    ctx = _CTX
+    out = []
+    for r in rows:
+        x = ctx["X"][r]
+        if ctx["target"] == "blindspot":
+            out.append(_search_blindspot(ctx, x, ctx["need"][r]))
+        else:
+            out.append(_search_quadrant(ctx, x, ctx["supply"][r]))
+    return out
+
+
+def run_counterfactuals(
+    sim,
+    districts,
+    target="blindspot",
+    metric="l1",
+    tolerance=0.0,
+    max_steps=30,
+    chunk_size=4,
+    n_jobs=None,
+):
+    """
+    자치구별 최소 공급 변화 탐색
+
+    입력:
+    - sim: policy_simulation.build_simulator 상태 (원본 공급 값, Need, 모델, 정규화 파라미터)
+    - districts: 탐색할 자치구 목록 (예: Inefficiency > 0 자치구)
+    - target: "blindspot" | "quadrant"
+    - metric: "l1" | "l2" (관측 범위 대비 0~100 점수 단위)
+    - tolerance: blindspot 목표 여유 (Inefficiency ≤ tolerance)
+    - max_steps: 탐욕 이동 최대 횟수
+    - chunk_size / n_jobs: 자치구 청크 크기 / 병렬 프로세스 수 (None이면 CPU 수)
+
+    반환: district, target, status, distance, n_changed,
+          Need_Index, Goal, Before, After (목표 기준: 기대 Need 또는 Supply_Index),
+          {변수}_from / {변수}_to (바뀐 변수만 값 기록, 나머지는 NaN)
+    """
+    if target not in TARGETS:
+        raise ValueError(f"[counterfactual] unknown target: {target} (choose from {TARGETS})")
+    if metric not in METRICS:
+        raise ValueError(f"[counterfactual] unknown metric: {metric} (choose from {METRICS})")
+
+    from policy_simulation import score_supply
+
+    X_all = sim["X"]
+    lo, hi = X_all.min(axis=0), X_all.max(axis=0)
+    span = np.where(hi > lo, hi - lo, 1.0)
+
+    ctx = {
+        "X": X_all,
+        "need": sim["need"],
+        "supply": sim["base_supply"],
+        "target": target,
+        "metric": metric,
+        "tolerance": tolerance,
+        "max_steps": max_steps,
+        "lo": lo,
+        "hi": hi,
+        "eps": span * EDGE_EPS,
+        "scale": 100.0 / span,
+    }
+    if target == "blindspot":
+        model = sim["model"]
+        ctx.update({
+            "model": model,
+            "grid": split_grid(model),
+            "ceiling": prediction_ceiling(model),
+            "proto_X": X_all,
+            "proto_pred": sim["base_predicted"],
+        })
+    else:
+        if sim["normalizer"]["method"] == "rank":
+            raise ValueError("[counterfactual] quadrant 목표는 선형 정규화(minmax / zscore / robust)에서만 정확")
+        # 거리 1점(관측 범위의 1%) 이동당 Supply_Index 증가량: 변수 하나씩 1점 올려 선형 기울기 측정
+        probe = X_all[:1] + np.diag(1.0 / ctx["scale"])
+        base, _ = score_supply(sim, X_all[:1], predict=False)
+        moved, _ = score_supply(sim, probe, predict=False)
+        ctx.update({
+            "supply_gain": moved - base[0],
+            "median_supply": sim["median_supply"],
+        })
+
+    pos = {d: i for i, d in enumerate(sim["districts"])}
+    rows = np.array([pos[d] for d in districts], dtype=int)
+
+    tasks = [r for r in np.array_split(rows, max(1, -(-len(rows) // chunk_size))) if len(r)]
+
+    # 탐색 상태(모델 포함)는 initializer로 프로세스마다 한 번만 보내고 작업에는 행 번호만 담는다.
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or len(tasks) <= 1:
+        _init_worker(ctx)
+        try:
+            parts = list(map(_counterfactual_chunk, tasks))
+        finally:
+            _init_worker(None)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(n_jobs, len(tasks)), initializer=_init_worker, initargs=(ctx,)
+        ) as pool:
+            parts = list(pool.map(_counterfactual_chunk, tasks))
+    found = [r for part in parts for r in part]
+
+    if target == "blindspot":
+        before = sim["base_predicted"][rows]
+        goal = sim["need"][rows] - tolerance
+    else:
+        # 닫힌 해의 결과도 실제 지수 계산 경로(저장된 정규화)로 다시 확인
+        before = sim["base_supply"][rows]
+        goal = np.full(len(rows), sim["median_supply"])
+        after, _ = score_supply(sim, np.array([z for z, _, _ in found]), predict=False)
+        found = [(z, a, s) for (z, _, s), a in zip(found, after)]
+
+    records = []
+    for r, b, g, (z, after, status) in zip(rows, before, goal, found):
+        x = X_all[r]
+        changed = z != x
+        record = {
+            "district": sim["districts"][r],
+            "target": target,
+            "status": status,
+            "distance": float(_distance((z - x) * ctx["scale"], metric)),
+            "n_changed": int(changed.sum()),
+            "Need_Index": sim["need"][r],
+            "Goal": g,
+            "Before": b,
+            "After": after,
+        }
+        for f, var in enumerate(SUPPLY_VARS):
+            record[f"{var}_from"] = x[f] if changed[f] else np.nan
+            record[f"{var}_to"] = z[f] if changed[f] else np.nan
+        records.append(record)
+
+    return pd.DataFrame(records)
+
+
+# =====================================================
+# 실행 진입점
+# =====================================================
+def main():
+    import argparse
+    import time
+    from ai_diagnosis import load_blindspot_model
+    from policy_simulation import build_simulator
+    from table_store import load_district_table
+
+    parser = argparse.ArgumentParser(description="사각지대 자치구별 반사실 탐색")
+    parser.add_argument("--target", choices=TARGETS, default="blindspot")
+    parser.add_argument("--metric", choices=METRICS, default="l1")
+    parser.add_argument("--tolerance", type=float, default=0.0, help="blindspot 목표 여유 (Inefficiency ≤ 값)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="병렬 프로세스 수")
+    args = parser.parse_args()
+
+    df = load_district_table("merged")
+    df_final = pd.read_csv(OUTPUT_DIR / "mhvi_final_result.csv", encoding="utf-8-sig")
+    df_ai = pd.read_csv(OUTPUT_DIR / "ai_blindspot_ranking.csv", encoding="utf-8-sig")
+
+    model = load_blindspot_model()
+    sim = build_simulator(df, df_final, model)
+
+    blindspots = df_ai.loc[df_ai["Inefficiency"] > 0, "district"].tolist()
+    if args.target == "quadrant":
+        blindspots = df_ai.loc[(df_ai["Inefficiency"] > 0) & (df_ai["Quadrant"] == "C"), "district"].tolist()
+
+    start = time.perf_counter()
+    df_cf = run_counterfactuals(
+        sim, blindspots, target=args.target, metric=args.metric,
+        tolerance=args.tolerance, n_jobs=args.jobs,
+    )
+    elapsed = time.perf_counter() - start
+
+    df_cf.to_csv(COUNTERFACTUAL_PATH, index=False, encoding="utf-8-sig")
+
+    print(f"\n🧭 반사실 탐색 ({args.target}, {args.metric}) 자치구 {len(df_cf)}곳 ({elapsed:.2f}초)")
+    print(df_cf[["district", "status", "distance", "n_changed", "Goal", "Before", "After"]]
+          .to_string(index=False))
+    print(f"📁 저장 위치: {COUNTERFACTUAL_PATH}")
+
+
+if __name__ == "__main__":
+    main()
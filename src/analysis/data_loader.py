@@ -7,11 +7,13 @@ data_loader.py
 - Need / Supply 원본 데이터를 불러와 하나의 테이블로 병합
 - 이후 지수 계산을 위해 모든 변수를 동일한 스케일(0~100)로 정규화
 - "데이터가 제대로 들어왔는지"를 사람이 확인할 수 있도록
-  풍부한 로그 출력 제공
+  풍부한 로그 출력 제공 (조용한 모드에서는 head / describe 등 점검용 출력 생략)
 """
 import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
-from config import DATA_DIR, NEED_VARS, SUPPLY_VARS
+from config import NEED_VARS, SUPPLY_VARS, NORM_METHOD
+from table_store import load_district_table
+from normalization import fit_normalizer, transform, save_normalizer, load_normalizer
+from instrumentation import is_quiet
 
 
 def load_data():
@@ -33,23 +35,20 @@ def load_data():
     """
 
     # -----------------------------------------------------
-    # 1. 전처리 완료된 Need / Supply 데이터 로드
-    # -----------------------------------------------------
-    # DATA_DIR은 config.py에서 정의된 processed 데이터 경로
-    df_need = pd.read_csv(DATA_DIR / "need_tidy.csv")
-    df_supply = pd.read_csv(DATA_DIR / "supply_tidy.csv")
-
-    # -----------------------------------------------------
-    # 2. district 기준 inner join
+    # 1. 전처리 완료된 Need / Supply 데이터 로드 + 병합
     # -----------------------------------------------------
+    # table_store의 공용 로더 사용:
+    # - need_tidy.csv / supply_tidy.csv를 district 기준 inner join
+    # - 원본 CSV 내용이 바뀌지 않았다면 바이너리 캐시에서 바로 읽음
+    #
     # inner join을 사용하는 이유:
     # - Need와 Supply 데이터가 모두 존재하는 자치구만 분석 대상으로 삼기 위함
     # - 한쪽 데이터가 없는 지역을 억지로 포함시키면
     #   이후 지수 계산 및 AI 분석에서 왜곡 발생 가능
-    df = df_need.merge(df_supply, on='district', how='inner')
+    df = load_district_table("merged")
 
     # -----------------------------------------------------
-    # 3. 데이터 로드 결과 점검용 로그 출력
+    # 2. 데이터 로드 결과 점검용 로그 출력
     # -----------------------------------------------------
     print("=" * 60)
     print("📊 데이터 로드 완료")
@@ -58,10 +57,14 @@ def load_data():
     print(f"구 개수: {len(df)}")                 # 자치구 수 (보통 25)
     print(f"변수 개수: {len(df.columns) - 1}")   # district 제외 변수 수
 
+    # 조용한 모드(야간 배치 등)에서는 아래 점검용 출력 생략
+    # → 대규모 데이터에서 describe()가 단계 시간의 대부분을 차지하지 않도록
+    if is_quiet():
+        return df
+
     print("\n변수 목록:")
-    # df_need.columns[1:] → district를 제외한 Need 변수들
-    print("Need (11개):", df_need.columns.tolist()[1:])
-    print("Supply (9개):", df_supply.columns.tolist()[1:])
+    print(f"Need ({len(NEED_VARS)}개):", NEED_VARS)
+    print(f"Supply ({len(SUPPLY_VARS)}개):", SUPPLY_VARS)
 
     print("\n첫 5개 구:")
     print(df.head())
@@ -80,42 +83,7 @@ def load_data():
     return df
 
 
-def normalize_to_100(series):
-    """
-    0~100점으로 정규화
-
-    목적:
-    - 서로 단위가 다른 변수들(비율, 개수, 금액 등)을
-      동일한 스케일로 변환하여
-      가중합(Need_Index, Supply_Index)이 가능하도록 함
-
-    방법:
-    - Min-Max Scaling 사용
-    - 최솟값 → 0, 최댓값 → 100
-    - 중간 값은 선형 비례
-
-    Parameters:
-    -----------
-    series : pd.Series
-        정규화할 단일 변수 시리즈
-
-    Returns:
-    --------
-    np.array
-        0~100 범위로 정규화된 값 (1차원 배열)
-
-    ⚠️ 주의:
-    - 이 함수는 방향성(좋다/나쁘다)을 고려하지 않음
-    - 즉, "값이 클수록 나쁜 변수"든 "클수록 좋은 변수"든
-      일단 크기만 기준으로 0~100으로 변환
-    - 방향성 처리는 이후 지수 해석 단계에서 의미를 부여
-    """
-    scaler = MinMaxScaler(feature_range=(0, 100))
-    normalized = scaler.fit_transform(series.values.reshape(-1, 1))
-    return normalized.flatten()
-
-
-def normalize_data(df):
+def normalize_data(df, method=NORM_METHOD, save=False):
     """
     Need와 Supply 변수 정규화
 
@@ -127,47 +95,84 @@ def normalize_data(df):
 
     입력:
     - df: district + Need + Supply 변수를 포함한 DataFrame
+    - method: 정규화 방법 (normalization.METHODS, 기본값 config.NORM_METHOD)
+    - save: True면 학습된 정규화 파라미터를 need / supply 이름으로 저장
+      → 이후 transform_districts()로 새 자치구만 같은 기준으로 변환 가능
+      (저장 파일은 파이프라인 기준값이므로 main.py normalize 단계만 save=True로 호출)
 
     출력:
     - df_need_norm:
         district + 각 Need 변수의 *_norm 컬럼
     - df_supply_norm:
         district + 각 Supply 변수의 *_norm 컬럼
+
+    ⚠️ 주의:
+    - 방향성(좋다/나쁘다)은 고려하지 않음
+    - 즉, "값이 클수록 나쁜 변수"든 "클수록 좋은 변수"든
+      일단 크기만 기준으로 변환하고,
+      방향성 처리는 이후 지수 해석 단계에서 의미를 부여
     """
 
     print("=" * 60)
-    print("📏 변수 정규화")
+    print(f"📏 변수 정규화 ({method})")
     print("=" * 60)
 
     # -----------------------------------------------------
     # 1. Need 변수 정규화
     # -----------------------------------------------------
     # district 컬럼은 그대로 두고,
-    # 각 Need 변수를 normalize_to_100으로 변환
-    df_need_norm = df[['district']].copy()
+    # 모든 Need 변수를 한 번에 학습 · 변환 (→ *_norm 컬럼)
+    need_normalizer = fit_normalizer(df, NEED_VARS, method)
+    df_need_norm = transform(need_normalizer, df)
     for var in NEED_VARS:
-        df_need_norm[f'{var}_norm'] = normalize_to_100(df[var])
         print(f"  ✅ {var:40s} → 정규화 완료")
 
     # -----------------------------------------------------
     # 2. Supply 변수 정규화
     # -----------------------------------------------------
-    # Supply 변수도 동일한 방식으로 0~100 스케일 변환
-    df_supply_norm = df[['district']].copy()
+    # Supply 변수도 동일한 방식으로 변환
+    supply_normalizer = fit_normalizer(df, SUPPLY_VARS, method)
+    df_supply_norm = transform(supply_normalizer, df)
     for var in SUPPLY_VARS:
-        df_supply_norm[f'{var}_norm'] = normalize_to_100(df[var])
         print(f"  ✅ {var:40s} → 정규화 완료")
 
+    if save:
+        save_normalizer(need_normalizer, "need")
+        save_normalizer(supply_normalizer, "supply")
+
     # -----------------------------------------------------
     # 3. 정규화 결과 샘플 출력
     # -----------------------------------------------------
     # 사람이 직접 확인하면서
     # - 값 범위가 0~100인지
     # - 이상치가 튀지 않았는지
-    # 빠르게 점검하기 위한 출력
-    print("\n정규화 결과 샘플:")
-    print(df_need_norm.head())
+    # 빠르게 점검하기 위한 출력 (조용한 모드에서는 생략)
+    if not is_quiet():
+        print("\n정규화 결과 샘플:")
+        print(df_need_norm.head())
 
-    print("\n✅ 모든 변수 0~100점 변환 완료")
+    print("\n✅ 모든 변수 정규화 완료")
 
     return df_need_norm, df_supply_norm
+
+
+def transform_districts(df_rows):
+    """
+    저장된 정규화 파라미터로 일부 자치구만 변환
+
+    목적:
+    - 새 자치구가 추가되거나 한 자치구의 값만 갱신됐을 때
+      전체 테이블을 다시 정규화하지 않고
+      normalize_data() 때와 같은 기준(최솟값/범위 등)으로 점수화
+
+    입력:
+    - df_rows: district + Need + Supply 변수 (행 수 무관)
+
+    출력:
+    - df_need_norm, df_supply_norm (normalize_data()와 같은 컬럼 구성)
+      ※ minmax 기준 범위 밖의 값은 0~100을 벗어날 수 있음
+    """
+    return (
+        transform(load_normalizer("need"), df_rows),
+        transform(load_normalizer("supply"), df_rows),
+    )
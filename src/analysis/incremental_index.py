@@ -0,0 +1,259 @@
+"""
+incremental_index.py
+
+증분 지수 갱신 (자치구 한 곳의 값이 바뀔 때)
+
+역할 요약:
+- 예) 한 자치구의 medical_institutions_count를 정정하면
+  원래는 전체 테이블을 다시 정규화 · 가중합해야 한다.
+- Min-Max 경계(최솟값 / 최댓값)는
+  '바뀐 자치구가 원래 극값이었거나, 새로 극값이 되는 경우'에만 움직인다.
+- 그래서 변수별 최솟값 / 최댓값과 그 값을 가진 자치구 수(중복도)를 들고 있다가
+    · 경계가 그대로면: 바뀐 행의 정규화 점수 / 지수 / 순위만 갱신
+    · 경계가 움직이면: 그 변수 열만 다시 정규화하고 전체 지수 재계산
+- 4사분면은 중앙값 기준이므로 중앙값이 바뀐 경우에만 전체 라벨을 다시 매긴다.
+
+→ 대시보드의 '이 값을 바꾸면?' 같은 대화형 편집을 전국 규모에서도 즉시 반영하기 위한 구조
+
+사용 예:
+    state = build_index_state(df)
+    result = update_value(state, "강남구", "medical_institutions_count", 2500)
+    df_now = state_to_frame(state)
+"""
+import numpy as np
+import pandas as pd
+
+from config import NEED_VARS, SUPPLY_VARS, WEIGHTS_NEED, WEIGHTS_SUPPLY
+from index_calculator import classify_quadrants
+
+VARIABLES = NEED_VARS + SUPPLY_VARS
+
+# 순위를 관리하는 지수 (1위 = 가장 큰 값)
+RANKED = ["Need_Index", "Supply_Index", "Gap_Index"]
+
+
+# =====================================================
+# 1. 상태 생성 (전체 계산 1회)
+# =====================================================
+def build_index_state(df):
+    """
+    district + 원본 변수 테이블 → 증분 갱신용 상태 dict
+
+    상태 구성:
+    - values:  (자치구 × 변수) 원본 값
+    - norm:    (자치구 × 변수) 0~100 정규화 점수 (normalization의 minmax와 같은 계산식)
+    - min / max / n_min / n_max: 변수별 경계와 그 값을 가진 자치구 수
+    - Need_Index / Supply_Index / Gap_Index, 각 *_rank, Quadrant: 자치구 배열
+    """
+    state = {
+        "districts": df["district"].tolist(),
+        "values": df[VARIABLES].to_numpy(dtype=float).copy(),
+        # 가중치는 WEIGHTS_* 키 순서 (index_calculator.weighted_sum과 같은 합산 순서)
+        "need_cols": [VARIABLES.index(c.removesuffix("_norm")) for c in WEIGHTS_NEED],
+        "supply_cols": [VARIABLES.index(c.removesuffix("_norm")) for c in WEIGHTS_SUPPLY],
+        "w_need": np.fromiter(WEIGHTS_NEED.values(), dtype=float),
+        "w_supply": np.fromiter(WEIGHTS_SUPPLY.values(), dtype=float),
+    }
+    state["pos"] = {d: i for i, d in enumerate(state["districts"])}
+
+    n_vars = len(VARIABLES)
+    state["min"], state["max"] = np.empty(n_vars), np.empty(n_vars)
+    state["n_min"], state["n_max"] = np.empty(n_vars, dtype=int), np.empty(n_vars, dtype=int)
+    state["norm"] = np.empty_like(state["values"])
+    for k in range(n_vars):
+        _fit_bounds(state, k)
+        _normalize_column(state, k)
+
+    _recompute_all(state)
+    return state
+
+
+def _fit_bounds(state, k):
+    """변수 k의 최솟값 / 최댓값과 중복도"""
+    col = state["values"][:, k]
+    state["min"][k] = col.min()
+    state["max"][k] = col.max()
+    state["n_min"][k] = np.count_nonzero(col == state["min"][k])
+    state["n_max"][k] = np.count_nonzero(col == state["max"][k])
+
+
+def _scale(state, k):
+    """MinMaxScaler와 같은 계산식의 (scale, offset), 최댓값 = 최솟값이면 0점"""
+    rng = state["max"][k] - state["min"][k]
+    scale = 100.0 / rng if rng > 0 else 0.0
+    return scale, -state["min"][k] * scale
+
+
+def _normalize_column(state, k):
+    scale, offset = _scale(state, k)
+    state["norm"][:, k] = state["values"][:, k] * scale + offset
+
+
+def _row_indices(state, rows):
+    """행 묶음의 Need / Supply / Gap Index (가중합)"""
+    norm = state["norm"][rows]
+    need = norm[:, state["need_cols"]] @ state["w_need"]
+    supply = norm[:, state["supply_cols"]] @ state["w_supply"]
+    return need, supply, need - supply
+
+
+def _recompute_all(state):
+    """전체 지수 / 순위 / 4사분면 재계산 (경계 이동 시의 대체 경로)"""
+    rows = np.arange(len(state["districts"]))
+    need, supply, gap = _row_indices(state, rows)
+    state["Need_Index"], state["Supply_Index"], state["Gap_Index"] = need, supply, gap
+
+    for name in RANKED:
+        order = np.lexsort((rows, -state[name]))
+        ranks = np.empty_like(rows)
+        ranks[order] = rows + 1
+        state[f"{name}_rank"] = ranks
+
+    _reclassify(state, force=True)
+
+
+def _reclassify(state, force=False):
+    """
+    중앙값 기준 4사분면
+
+    - force=False: 중앙값이 바뀌었을 때만 전체 라벨 갱신 (행 하나만 바뀐 경우)
+    - force=True:  전체 재계산 경로 (중앙값이 그대로여도 다른 행 지수가 바뀌었을 수 있음)
+    """
+    median_need = float(np.median(state["Need_Index"]))
+    median_supply = float(np.median(state["Supply_Index"]))
+    changed = (median_need, median_supply) != (state.get("median_need"), state.get("median_supply"))
+    if changed or force:
+        state["median_need"], state["median_supply"] = median_need, median_supply
+        state["Quadrant"] = classify_quadrants(
+            state["Need_Index"], state["Supply_Index"], median_need, median_supply
+        )
+    return changed
+
+
+# =====================================================
+# 2. 증분 갱신
+# =====================================================
+def _update_rank(state, name, i, old):
+    """
+    행 i의 값이 old → 새 값으로 바뀔 때 순위 갱신
+
+    정렬 키는 (-값, 행 번호). 다른 행 j의 순위는
+    'i가 j보다 앞서는지'가 바뀐 경우에만 ±1 된다.
+    반환: 순위가 바뀐 행 번호
+    """
+    values = state[name]
+    new = values[i]
+    if new == old:
+        return np.array([], dtype=int)
+
+    ranks = state[f"{name}_rank"]
+    rows = np.arange(len(values))
+
+    # i가 j보다 앞서는가 (값이 크거나, 같으면 행 번호가 작은 쪽이 앞)
+    before_old = (old > values) | ((old == values) & (i < rows))
+    before_new = (new > values) | ((new == values) & (i < rows))
+    delta = before_new.astype(int) - before_old.astype(int)
+    delta[i] = 0
+
+    moved = np.flatnonzero(delta)
+    ranks[moved] += delta[moved]
+
+    before_i = (values > new) | ((values == new) & (rows < i))
+    before_i[i] = False
+    old_rank = ranks[i]
+    ranks[i] = np.count_nonzero(before_i) + 1
+
+    return moved if ranks[i] == old_rank else np.append(moved, i)
+
+
+def update_value(state, district, var, value):
+    """
+    자치구 한 곳의 변수 값 하나를 바꾸고 지수 / 순위 / 4사분면을 갱신
+
+    반환:
+      {
+        "full":     경계(최솟값/최댓값)가 움직여 전체 재계산했는지,
+        "rows":     지수 또는 순위가 바뀐 자치구 목록,
+        "quadrant": 4사분면 전체 재분류 여부 (중앙값 변경)
+      }
+    """
+    i = state["pos"][district]
+    k = VARIABLES.index(var)
+    old = state["values"][i, k]
+    value = float(value)
+
+    if value == old:
+        return {"full": False, "rows": [], "quadrant": False}
+
+    state["values"][i, k] = value
+    mn, mx = state["min"][k], state["max"][k]
+
+    # -----------------------------------------------------
+    # 1. 경계 이동 여부 판단
+    # -----------------------------------------------------
+    # - 새 값이 범위 밖 → 경계 확장
+    # - 유일한 극값이던 자치구가 안쪽으로 이동 → 경계 축소
+    bound_shift = (
+        value < mn or value > mx
+        or (old == mn and state["n_min"][k] == 1)
+        or (old == mx and state["n_max"][k] == 1)
+    )
+
+    if bound_shift:
+        _fit_bounds(state, k)
+        _normalize_column(state, k)
+        before = {name: state[name].copy() for name in RANKED}
+        _recompute_all(state)
+        changed = np.zeros(len(state["districts"]), dtype=bool)
+        for name in RANKED:
+            changed |= state[name] != before[name]
+        return {
+            "full": True,
+            "rows": [state["districts"][j] for j in np.flatnonzero(changed)],
+            "quadrant": True,
+        }
+
+    # -----------------------------------------------------
+    # 2. 경계 유지 → 중복도만 조정하고 행 i만 갱신
+    # -----------------------------------------------------
+    state["n_min"][k] += int(value == mn) - int(old == mn)
+    state["n_max"][k] += int(value == mx) - int(old == mx)
+
+    scale, offset = _scale(state, k)
+    state["norm"][i, k] = value * scale + offset
+
+    need, supply, gap = _row_indices(state, [i])
+    old_indices = {name: state[name][i] for name in RANKED}
+    state["Need_Index"][i], state["Supply_Index"][i], state["Gap_Index"][i] = need[0], supply[0], gap[0]
+
+    moved = [np.array([i])]
+    for name in RANKED:
+        moved.append(_update_rank(state, name, i, old_indices[name]))
+
+    quadrant_changed = _reclassify(state)
+    if not quadrant_changed:
+        state["Quadrant"][i] = classify_quadrants(
+            state["Need_Index"][i], state["Supply_Index"][i],
+            state["median_need"], state["median_supply"],
+        )
+
+    rows = np.unique(np.concatenate(moved))
+    return {
+        "full": False,
+        "rows": [state["districts"][j] for j in rows],
+        "quadrant": quadrant_changed,
+    }
+
+
+# =====================================================
+# 3. 결과 테이블
+# =====================================================
+def state_to_frame(state):
+    """현재 상태 → district + 지수 + 순위 + 4사분면 DataFrame"""
+    df = pd.DataFrame({"district": state["districts"]})
+    for name in RANKED:
+        df[name] = state[name]
+    for name in RANKED:
+        df[f"{name}_rank"] = state[f"{name}_rank"]
+    df["Quadrant"] = state["Quadrant"]
+    return df
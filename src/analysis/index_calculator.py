@@ -14,8 +14,162 @@ Need, Supply, Gap Index 계산
 '데이터 → 의미 있는 지수 → 정책적 해석 단위'
 로 변환하는 핵심 단계다.
 """
+import warnings
+
+import numpy as np
 import pandas as pd
-from config import WEIGHTS_NEED, WEIGHTS_SUPPLY, OUTPUT_DIR
+from config import (
+    NEED_VARS,
+    SUPPLY_VARS,
+    WEIGHTS_NEED,
+    WEIGHTS_SUPPLY,
+    OUTPUT_DIR,
+    DASHBOARD_RESULT_PATH,
+    NORM_METHOD,
+    VAR_DIRECTIONS,
+)
+from normalization import apply_directions, fit_arrays, transform_arrays
+
+# 분석용 4사분면 코드 → 대시보드용 라벨
+# (대시보드는 Supply를 '공급 수준' 축으로 읽어 A/B 이름이 서로 바뀜)
+DASHBOARD_QUADRANT_LABELS = {
+    "C": "C: 심각 부족형",     # Need 높음 & Supply 낮음
+    "D": "D: 고위험 대응형",   # Need 높음 & Supply 높음
+    "A": "B: 양호형",          # Need 낮음 & Supply 높음
+    "B": "A: 과잉공급형",      # Need 낮음 & Supply 낮음
+}
+
+
+# =====================================================
+# 공용 행렬 연산 (가중합 / 4사분면 / 상위 k개)
+# =====================================================
+def weighted_sum(df, weights):
+    """
+    정규화 행렬 × 가중치 벡터
+
+    - df의 weights 키 컬럼들을 (자치구 × 변수) 행렬로 꺼내
+      가중치 벡터와 한 번의 행렬곱으로 지수를 계산한다.
+    """
+    cols = list(weights)
+    w = np.fromiter(weights.values(), dtype=float, count=len(cols))
+    return df[cols].to_numpy(dtype=float) @ w
+
+
+def classify_quadrants(need, supply, median_need, median_supply):
+    """
+    Need / Supply 배열 → 4사분면 라벨 배열 (중앙값 기준, 행 단위 apply 없이)
+
+    C: Need ≥ 중앙값 & Supply < 중앙값
+    D: Need ≥ 중앙값 & Supply ≥ 중앙값
+    B: Need < 중앙값 & Supply < 중앙값
+    A: 그 외 (Need < 중앙값 & Supply ≥ 중앙값)
+
+    median_*는 스칼라 또는 브로드캐스트 가능한 배열(그룹별 중앙값)
+    """
+    high_need = need >= median_need
+    high_supply = supply >= median_supply
+    return np.select(
+        [high_need & ~high_supply, high_need & high_supply, ~high_need & ~high_supply],
+        ["C", "D", "B"],
+        default="A",
+    )
+
+
+def top_k_indices(scores, k):
+    """
+    행별 점수 상위 k개 컬럼 번호 (점수 내림차순)
+
+    - argpartition으로 상위 k개만 고른 뒤 그 k개만 정렬 → 전체 정렬 불필요
+    - 동점은 앞쪽 컬럼(변수 목록 순서)이 먼저 오도록 정렬
+    """
+    k = min(k, scores.shape[1])
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.lexsort((part, -part_scores), axis=1)
+    return np.take_along_axis(part, order, axis=1)
+
+
+def compute_final_tables(df_need_norm, df_supply_norm, method=NORM_METHOD):
+    """
+    최종 결과 테이블 엔진: 분석용 / 대시보드용 표기를 한 번에 생성
+
+    - Need / Supply 정규화 점수를 하나의 행렬로 모은 뒤
+      config.VAR_DIRECTIONS에 따라 방향을 맞추고
+      (normalization.apply_directions: "negative" 변수만 뒤집음)
+      가중치 벡터와 곱해 두 지수를 계산한다.
+      → 정규화 점수에는 방향이 적용돼 있지 않아야 함 (normalize_data 기본값)
+    - 같은 지수 / 중앙값으로
+      · analysis : Quadrant = A/B/C/D           → OUTPUT_DIR/mhvi_final_result.csv
+      · dashboard: Quadrant = "C: 심각 부족형" 등 → DASHBOARD_RESULT_PATH
+      두 테이블을 만든다. (값은 같고 라벨 표기만 다름)
+
+    입력:
+    - df_need_norm, df_supply_norm: normalize_data()의 결과 (같은 행 순서)
+    - method: normalize_data()에 쓴 정규화 방법 (방향 반전 방식 결정: 0~100 방법은 100 - 점수, 그 외 부호 반전)
+
+    반환:
+      {"analysis", "dashboard": DataFrame, "median_need", "median_supply": 스칼라}
+    """
+    need_cols = list(WEIGHTS_NEED)
+    supply_cols = list(WEIGHTS_SUPPLY)
+    n_need = len(need_cols)
+
+    scores = np.column_stack([
+        df_need_norm[need_cols].to_numpy(dtype=float),
+        df_supply_norm[supply_cols].to_numpy(dtype=float),
+    ])
+
+    # -----------------------------------------------------
+    # 1. 방향 맞추기
+    # -----------------------------------------------------
+    # negative로 선언된 변수만 점수를 뒤집는다. (정규화기와 같은 규칙 / 같은 함수)
+    directions = [
+        VAR_DIRECTIONS.get(c.removesuffix("_norm"), "positive")
+        for c in need_cols + supply_cols
+    ]
+    scores = apply_directions(scores, directions, method)
+
+    # -----------------------------------------------------
+    # 2. 지수 / 4사분면 (한 번만 계산)
+    # -----------------------------------------------------
+    need = scores[:, :n_need] @ np.fromiter(WEIGHTS_NEED.values(), dtype=float)
+    supply = scores[:, n_need:] @ np.fromiter(WEIGHTS_SUPPLY.values(), dtype=float)
+    median_need = float(np.median(need))
+    median_supply = float(np.median(supply))
+    quadrant = classify_quadrants(need, supply, median_need, median_supply)
+
+    df_final = pd.DataFrame({
+        "district": df_need_norm["district"].to_numpy(),
+        "Need_Index": need,
+        "Supply_Index": supply,
+        "Gap_Index": need - supply,
+        "Quadrant": quadrant,
+    })
+    df_dashboard = df_final.assign(
+        Quadrant=df_final["Quadrant"].map(DASHBOARD_QUADRANT_LABELS)
+    )
+
+    return {
+        "analysis": df_final,
+        "dashboard": df_dashboard,
+        "median_need": median_need,
+        "median_supply": median_supply,
+    }
+
+
+def save_final_tables(tables):
+    """분석용 / 대시보드용 최종 결과를 함께 저장 (항상 같은 실행 결과로 맞춰짐)"""
+    tables["analysis"].to_csv(
+        OUTPUT_DIR / "mhvi_final_result.csv",
+        index=False,
+        encoding="utf-8-sig"
+    )
+    DASHBOARD_RESULT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tables["dashboard"].to_csv(
+        DASHBOARD_RESULT_PATH,
+        index=False,
+        encoding="utf-8-sig"
+    )
 
 
 def calculate_need_index(df_need_norm):
@@ -45,22 +199,17 @@ def calculate_need_index(df_need_norm):
     """
 
     # -----------------------------------------------------
-    # 1. Need_Index 초기화
+    # 1~2. 가중합 계산 (정규화 행렬 × 가중치 벡터)
     # -----------------------------------------------------
     # 기존 df_need_norm에는 *_norm 컬럼들만 존재
     # 여기에 새로운 집계 지표인 Need_Index를 추가
-    df_need_norm['Need_Index'] = 0
-
-    # -----------------------------------------------------
-    # 2. 가중합 계산
-    # -----------------------------------------------------
+    #
     # WEIGHTS_NEED:
     #   key   → 정규화된 변수명 (예: suicide_rate_norm)
     #   value → 해당 변수의 정책적 중요도 가중치
     #
     # 모든 가중치의 합은 1 → 지수 해석이 직관적
-    for var, weight in WEIGHTS_NEED.items():
-        df_need_norm['Need_Index'] += df_need_norm[var] * weight
+    df_need_norm['Need_Index'] = weighted_sum(df_need_norm, WEIGHTS_NEED)
 
     # -----------------------------------------------------
     # 3. 정렬 (출력/확인용)
@@ -106,17 +255,11 @@ def calculate_supply_index(df_supply_norm):
     print("=" * 60)
 
     # -----------------------------------------------------
-    # 1. Supply_Index 초기화
-    # -----------------------------------------------------
-    df_supply_norm['Supply_Index'] = 0
-
-    # -----------------------------------------------------
-    # 2. 가중합 계산
+    # 1~2. 가중합 계산 (정규화 행렬 × 가중치 벡터)
     # -----------------------------------------------------
     # WEIGHTS_SUPPLY에 정의된 가중치에 따라
     # 의료/보건/노인/문화 인프라를 종합적으로 반영
-    for var, weight in WEIGHTS_SUPPLY.items():
-        df_supply_norm['Supply_Index'] += df_supply_norm[var] * weight
+    df_supply_norm['Supply_Index'] = weighted_sum(df_supply_norm, WEIGHTS_SUPPLY)
 
     # -----------------------------------------------------
     # 3. 정렬 (확인용)
@@ -128,7 +271,7 @@ def calculate_supply_index(df_supply_norm):
     return df_supply_norm
 
 
-def calculate_gap_index(df, df_need_norm, df_supply_norm):
+def calculate_gap_index(df_need_norm, df_supply_norm, method=NORM_METHOD):
     """
     Gap Index 계산 및 4사분면 분류
 
@@ -149,6 +292,14 @@ def calculate_gap_index(df, df_need_norm, df_supply_norm):
             → 위험은 큰데
             → 지원은 부족한 지역
             → 정책 개입이 시급
+
+    입력:
+    - df_need_norm, df_supply_norm: normalize_data()의 결과 (같은 행 순서)
+    - method: normalize_data()에 쓴 정규화 방법 (방향 반전 방식이 이에 따라 다름)
+
+    반환:
+    - compute_final_tables()의 dict
+      {"analysis", "dashboard", "median_need", "median_supply"}
     """
 
     print("\n" + "=" * 60)
@@ -156,70 +307,31 @@ def calculate_gap_index(df, df_need_norm, df_supply_norm):
     print("=" * 60)
 
     # -----------------------------------------------------
-    # 1. Need / Supply 지수 통합
-    # -----------------------------------------------------
-    # district를 기준으로
-    # Need_Index와 Supply_Index를 하나의 테이블로 결합
-    df_final = df[['district']].copy()
-    df_final = df_final.merge(
-        df_need_norm[['district', 'Need_Index']],
-        on='district'
-    )
-    df_final = df_final.merge(
-        df_supply_norm[['district', 'Supply_Index']],
-        on='district'
-    )
-
-    # -----------------------------------------------------
-    # 2. Gap_Index 계산
-    # -----------------------------------------------------
-    df_final['Gap_Index'] = (
-        df_final['Need_Index'] - df_final['Supply_Index']
-    )
-
-    # -----------------------------------------------------
-    # 3. Gap 기준 정렬 (확인용)
-    # -----------------------------------------------------
-    df_sorted = df_final.sort_values('Gap_Index', ascending=False)
-
-    # -----------------------------------------------------
-    # 4. 4사분면 분류
+    # 1. Need / Supply 지수 통합 + Gap_Index + 4사분면
     # -----------------------------------------------------
+    # compute_final_tables 한 번으로 계산
+    # (df_need_norm / df_supply_norm의 *_norm 점수를 바로 사용)
+    #
     # 중앙값(median)을 기준으로 High / Low 구분
     # → 소표본에서 평균보다 안정적인 기준
-    median_need = df_final['Need_Index'].median()
-    median_supply = df_final['Supply_Index'].median()
-
-    # 4사분면 분류 규칙:
+    #
+    # 4사분면 분류 규칙 (classify_quadrants, 행 단위 apply 없이 한 번에):
     # C: Need 높음 & Supply 부족 → 가장 시급한 개입 대상
     # D: Need 높음 & Supply 높음 → 대응 중이나 위험 지속
     # B: Need 낮음 & Supply 부족 → 잠재 위험군
     # A: Need 낮음 & Supply 충분 → 비교적 안정
-    def classify_quadrant(row):
-        if row['Need_Index'] >= median_need and row['Supply_Index'] < median_supply:
-            return 'C'
-        elif row['Need_Index'] >= median_need and row['Supply_Index'] >= median_supply:
-            return 'D'
-        elif row['Need_Index'] < median_need and row['Supply_Index'] < median_supply:
-            return 'B'
-        else:
-            return 'A'
-
-    df_final['Quadrant'] = df_final.apply(
-        classify_quadrant,
-        axis=1
-    )
+    tables = compute_final_tables(df_need_norm, df_supply_norm, method)
 
     print("\n📊 4사분면 분류:")
-    print(df_final['Quadrant'].value_counts())
+    print(tables["analysis"]['Quadrant'].value_counts())
     print("\n✅ Gap Index 및 분류 완료")
 
-    return df_final, median_need, median_supply
+    return tables
 
 
-def save_rankings(df, df_need_norm, df_supply_norm):
+def save_rankings(df, df_need_norm, df_supply_norm, out_dir=OUTPUT_DIR):
     """
-    순위 테이블 저장 함수
+    순위 테이블 저장 함수 (out_dir: 저장 디렉토리, 기본 OUTPUT_DIR)
 
     생성 파일:
     1) Need Index 순위
@@ -230,9 +342,6 @@ def save_rankings(df, df_need_norm, df_supply_norm):
     - 정책 보고서, 대시보드, 지도 시각화에 바로 사용할 수 있는
       '정리된 결과 테이블' 생성
     """
-    from config import NEED_VARS, OUTPUT_DIR
-    import pandas as pd
-
     # =========================
     # 1. Need Index 순위
     # =========================
@@ -245,7 +354,7 @@ def save_rankings(df, df_need_norm, df_supply_norm):
     need_rank_df['rank'] = need_rank_df.index + 1
 
     need_rank_df.to_csv(
-        OUTPUT_DIR / "need_index_ranking.csv",
+        out_dir / "need_index_ranking.csv",
         index=False,
         encoding="utf-8-sig"
     )
@@ -262,7 +371,7 @@ def save_rankings(df, df_need_norm, df_supply_norm):
     supply_rank_df['rank'] = supply_rank_df.index + 1
 
     supply_rank_df.to_csv(
-        OUTPUT_DIR / "supply_index_ranking.csv",
+        out_dir / "supply_index_ranking.csv",
         index=False,
         encoding="utf-8-sig"
     )
@@ -284,38 +393,115 @@ def save_rankings(df, df_need_norm, df_supply_norm):
     - score         : 정규화 점수 (0~100, 높을수록 심각)
     """
 
-    rows = []
-    for _, row in df_need_norm.iterrows():
-        district = row['district']
-
-        # Need_Index를 구성하는 개별 정규화 변수 점수 추출
-        scores = {
-            var.replace('_norm', ''): row[var]
-            for var in df_need_norm.columns
-            if var.endswith('_norm') and var != 'Need_Index'
-        }
-
-        # 점수가 높은 순으로 상위 3개 선택
-        top3 = sorted(
-            scores.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:3]
-
-        # 지역 × 순위 × 변수 형태로 행 구성
-        for rank, (var, score) in enumerate(top3, start=1):
-            rows.append({
-                'district': district,
-                'rank': rank,
-                'need_variable': var,
-                'score': score
-            })
+    # Need_Index를 구성하는 개별 정규화 변수 점수 행렬 (자치구 × 변수)
+    norm_cols = [
+        var for var in df_need_norm.columns
+        if var.endswith('_norm') and var != 'Need_Index'
+    ]
+    scores = df_need_norm[norm_cols].to_numpy(dtype=float)
+
+    # 자치구별 점수 상위 3개 변수 (argpartition 기반)
+    top_idx = top_k_indices(scores, 3)
+    top_scores = np.take_along_axis(scores, top_idx, axis=1)
+    k = top_idx.shape[1]
+
+    # 지역 × 순위 × 변수 형태로 행 구성
+    rows = {
+        'district': np.repeat(df_need_norm['district'].to_numpy(), k),
+        'rank': np.tile(np.arange(1, k + 1), len(scores)),
+        'need_variable': np.array([c.replace('_norm', '') for c in norm_cols])[top_idx].ravel(),
+        'score': top_scores.ravel(),
+    }
 
     need_top3_df = pd.DataFrame(rows)
     need_top3_df.to_csv(
-        OUTPUT_DIR / "district_need_top3.csv",
+        out_dir / "district_need_top3.csv",
         index=False,
         encoding="utf-8-sig"
     )
 
     print("📊 순위 테이블 저장 완료")
+
+
+def compute_index_arrays(values, variables, method=NORM_METHOD):
+    """
+    (그룹 × 자치구 × 변수) 배열에서 그룹별 지수를 한 번에 계산하는 공용 엔진
+
+    그룹 축(axis=0)은 연도(패널)나 성별·연령 층(strata)처럼
+    '서로 따로 정규화해야 하는 단위'를 뜻한다.
+
+    방법 (그룹 루프 없이 배열 연산):
+    1) 그룹별(axis=1, 자치구 방향) 정규화 (기본 Min-Max → 0~100, normalization.py)
+    2) 정규화 배열 × 가중치 벡터 → Need_Index / Supply_Index (그룹 × 자치구)
+    3) Gap_Index = Need_Index - Supply_Index
+    4) 그룹별 중앙값 기준 4사분면 (calculate_gap_index와 같은 규칙)
+
+    반환: need, supply, gap, quadrant, complete (모두 그룹 × 자치구 배열)
+      - complete: 모든 변수가 채워져 지수가 계산된 칸
+    """
+    # -----------------------------------------------------
+    # 1. 그룹별 정규화
+    # -----------------------------------------------------
+    # 최댓값 = 최솟값인 변수는 MinMaxScaler와 같이 0으로 처리
+    # (관측이 없는 그룹은 전부 NaN → NaN 유지)
+    norm = transform_arrays(values, method, fit_arrays(values, method))
+
+    # -----------------------------------------------------
+    # 2. 가중합 (배열 × 가중치 벡터)
+    # -----------------------------------------------------
+    need_idx = [variables.index(v) for v in NEED_VARS]
+    supply_idx = [variables.index(v) for v in SUPPLY_VARS]
+    w_need = np.array([WEIGHTS_NEED[f"{v}_norm"] for v in NEED_VARS])
+    w_supply = np.array([WEIGHTS_SUPPLY[f"{v}_norm"] for v in SUPPLY_VARS])
+
+    need = norm[:, :, need_idx] @ w_need
+    supply = norm[:, :, supply_idx] @ w_supply
+    gap = need - supply
+
+    # -----------------------------------------------------
+    # 3. 그룹별 중앙값 기준 4사분면
+    # -----------------------------------------------------
+    complete = ~(np.isnan(need) | np.isnan(supply))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median_need = np.nanmedian(np.where(complete, need, np.nan), axis=1, keepdims=True)
+        median_supply = np.nanmedian(np.where(complete, supply, np.nan), axis=1, keepdims=True)
+
+    quadrant = classify_quadrants(need, supply, median_need, median_supply)
+
+    return need, supply, gap, quadrant, complete
+
+
+def calculate_panel_indices(panel, ffill=True):
+    """
+    다년도 패널 전체에 대해 Need / Supply / Gap Index와 4사분면을 한 번에 계산
+
+    입력:
+    - panel: panel.load_panel()이 반환한 dict
+        values[연도, 자치구, 변수] (변수 순서 = NEED_VARS + SUPPLY_VARS)
+    - ffill: True면 해당 연도에 값이 없는 변수는 가장 최근 연도 값을 사용
+
+    출력:
+    - year, district, Need_Index, Supply_Index, Gap_Index, Quadrant (long 형식)
+      ※ 모든 변수가 채워지지 않은 연도/자치구는 제외
+    """
+    values = panel["values"]
+    if ffill:
+        from panel import forward_fill
+        values = forward_fill(values)
+
+    need, supply, gap, quadrant, complete = compute_index_arrays(
+        values, panel["variables"]
+    )
+
+    n_years, n_districts = need.shape
+    df_panel = pd.DataFrame({
+        "year": np.repeat(panel["years"], n_districts),
+        "district": np.tile(panel["districts"], n_years),
+        "Need_Index": need.ravel(),
+        "Supply_Index": supply.ravel(),
+        "Gap_Index": gap.ravel(),
+        "Quadrant": quadrant.ravel(),
+    })
+
+    return df_panel[complete.ravel()].reset_index(drop=True)
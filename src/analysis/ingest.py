@@ -0,0 +1,480 @@
+"""
+ingest.py
+
+KOSIS 원본(raw) 테이블 → need_tidy / supply_tidy 변환
+
+역할 요약:
+- data/raw/need/*.csv, data/raw/supply/*.csv 처럼
+  연도 / 항목 / 세부항목 / 성별 헤더가 여러 줄로 쌓인(multi-header) 원본 파일을 읽어
+  NEED_VARS / SUPPLY_VARS 변수별로 필요한 컬럼 하나만 뽑아낸다.
+- 파일마다 "어떤 컬럼을, 어떤 행에서, 어떤 키로" 가져올지는
+  아래 NEED_SOURCES / SUPPLY_SOURCES에 선언적으로 적어 둔다.
+- 각 파일은 한 줄씩 스트리밍으로 한 번만 읽고,
+  '합계/소계/서울시' 같은 총계 행은 건너뛴다.
+
+→ 손으로 tidy 테이블을 다시 만들던 작업을
+  반복 가능한 배치 단계(python src/analysis/ingest.py)로 대체
+"""
+import csv
+import itertools
+
+import pandas as pd
+
+from config import RAW_DIR, DATA_DIR, NEED_VARS, SUPPLY_VARS
+
+# =====================================================
+# 1. 총계 행 라벨
+# =====================================================
+# 자치구 키 자리에 이 값이 오면 '서울시 전체' 같은 총계 행이므로 제외
+TOTAL_LABELS = {"합계", "소계", "계", "서울시", "서울특별시", "본청"}
+
+# =====================================================
+# 2. 파일별 추출 명세 (변수명 → 명세)
+# =====================================================
+# 공통 키:
+# - path     : RAW_DIR 기준 상대 경로
+# - key      : 자치구명이 들어 있는 컬럼 번호
+# - column   : 헤더 줄을 위에서부터 읽은 라벨 튜플
+#              (연도, 항목, 세부항목, 성별 ...) 중 앞쪽 일부만 적어도 됨
+#
+# 선택 키:
+# - encoding    : 기본 utf-8-sig (일부 파일은 cp949)
+# - format      : "csv"(기본) 또는 "xlsx"
+# - where       : {컬럼 번호: 값} → 해당 값인 행만 사용
+# - denominator : 분모 컬럼 라벨 → column / denominator × scale (비율 변수)
+# - scale       : 비율 변수의 배율 (예: 100 → %)
+# - sum_columns : column 대신 여러 컬럼 라벨의 합계를 사용 (예: 연령대 묶음)
+# - key_token   : 키 셀을 공백으로 나눈 뒤 사용할 토큰 위치 ("서울 종로구" → -1)
+# - key_fallback: 키 셀이 비어 있을 때 대신 사용할 컬럼 번호
+# - aggregate   : "count" → 값 대신 자치구별 행 개수를 센다 (시설 목록 파일)
+# - year        : 연도 헤더가 없는 파일(시설 목록)의 기준 연도 (다년도 패널용)
+NEED_SOURCES = {
+    "suicide_rate": {
+        "path": "need/suicide_rate.csv",
+        "key": 1,
+        "column": ("2024", "자살률 (10만명당 명)", "계", "소계"),
+    },
+    "depression_experience_rate": {
+        "path": "need/depression_experience_rate.csv",
+        "key": 1,
+        "column": ("2023", "전체"),
+    },
+    "perceived_stress_rate": {
+        "path": "need/perceived_stress_rate.csv",
+        "key": 1,
+        "where": {0: "지역별"},
+        "column": ("2023", "전체"),
+    },
+    "high_risk_drinking_rate": {
+        "path": "need/high_risk_dringking_rate.csv",
+        "key": 2,
+        "column": ("2023", "전체"),
+    },
+    "unmet_medical_need_rate": {
+        "path": "need/unmet_medical_need_rate.csv",
+        "encoding": "cp949",
+        "key": 1,
+        "column": ("2024",),
+    },
+    "unemployment_rate": {
+        "path": "need/unemployment_rate.csv",
+        "encoding": "cp949",
+        "key": 0,
+        "key_token": -1,
+        "column": ("2025.1/2",),
+    },
+    "elderly_population_rate": {
+        "path": "need/elderly_population.csv",
+        "key": 1,
+        "column": ("2025 3/4", "65세이상 인구", "소계", "소계"),
+        "denominator": ("2025 3/4", "전체인구", "소계", "소계"),
+        "scale": 100,
+    },
+    "old_dependency_ratio": {
+        "path": "need/old_dependency_ratio_&_elderly_rate.csv",
+        "key": 0,
+        "column": ("2025 3/4", "노년부양비"),
+    },
+    "single_households": {
+        "path": "need/single_households.csv",
+        "key": 1,
+        "where": {2: "계"},
+        "column": ("2024", "합계", "소계"),
+    },
+    "basic_livelihood_recipients": {
+        "path": "need/basic_livelihood.csv",
+        "key": 0,
+        "column": ("2024", "총 수급자", "인원 (명)", "소계"),
+    },
+}
+
+SUPPLY_SOURCES = {
+    "welfare_budget_per_capita": {
+        "path": "supply/welfare_budget_per.csv",
+        "key": 0,
+        "column": ("2023", "금액 (천원/명)"),
+        # 기존 supply_tidy.csv 형식: 정수 금액은 소수점 없이 (1094.0 → 1094)
+        "compact": True,
+    },
+    "public_sports_facilities_count": {
+        "path": "supply/public_sports_facilities.csv",
+        "key": 1,
+        "column": ("2024", "합계", "소계"),
+    },
+    "parks_count": {
+        "path": "supply/parks.csv",
+        "key": 1,
+        "column": ("2024", "합계", "공원수 (개소)"),
+    },
+    "libraries_count": {
+        "path": "supply/libraries.csv",
+        "key": 1,
+        "column": ("2024", "계"),
+    },
+    "medical_institutions_count": {
+        "path": "supply/medical_institutions.csv",
+        "key": 1,
+        "column": ("2024", "계", "소계", "병원수"),
+    },
+    "health_promotion_centers_count": {
+        "path": "supply/health_promotion_centers.csv",
+        "encoding": "cp949",
+        "key": 2,
+        "key_fallback": 3,
+        "key_token": 1,
+        "aggregate": "count",
+        "year": 2025,
+    },
+    "elderly_leisure_welfare_facilities_count": {
+        "path": "supply/elderly_leisure_welfare_facilities.csv",
+        "key": 1,
+        "column": ("2024", "시설합계 (개소)", "소계", "소계"),
+    },
+    "in_home_elderly_welfare_facilities_count": {
+        "path": "supply/in_home_elderly_welfare_facilities.csv",
+        "key": 1,
+        "column": ("2024", "합계", "시설수 (개소)"),
+    },
+    "cultural_satisfaction": {
+        "path": "supply/cultural_satisfaction.xlsx",
+        "format": "xlsx",
+        "key": 1,
+        "column": ("2024", "문화환경 만족도(종합) (점)"),
+    },
+}
+
+
+# =====================================================
+# 3. 원본 파일 행 단위 스트리밍 / 헤더 해석
+# =====================================================
+def _iter_rows(spec):
+    """
+    명세의 파일을 한 줄씩 읽어 '문자열 리스트'로 돌려준다.
+
+    - csv: csv.reader로 스트리밍 (파일 전체를 메모리에 올리지 않음)
+    - xlsx: openpyxl read_only 모드로 스트리밍
+    """
+    path = RAW_DIR / spec["path"]
+
+    if spec.get("format", "csv") == "xlsx":
+        # 엑셀 파일은 문화 만족도 하나뿐이므로 필요할 때만 import
+        from openpyxl import load_workbook
+
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for row in wb.active.iter_rows(values_only=True):
+                yield ["" if v is None else str(v).strip() for v in row]
+        finally:
+            wb.close()
+        return
+
+    with open(path, encoding=spec.get("encoding", "utf-8-sig"), newline="") as f:
+        for row in csv.reader(f):
+            yield [cell.strip() for cell in row]
+
+
+def _district_of(row, spec):
+    """행에서 자치구명을 꺼낸다. (없으면 빈 문자열)"""
+    cell = row[spec["key"]] if spec["key"] < len(row) else ""
+    if not cell and "key_fallback" in spec:
+        cell = row[spec["key_fallback"]]
+
+    if "key_token" in spec and cell:
+        tokens = cell.split()
+        cell = tokens[spec["key_token"]] if len(tokens) > abs(spec["key_token"]) else ""
+
+    return cell
+
+
+def _to_number(cell):
+    """KOSIS 셀 값을 숫자로 변환 ('-' 은 해당 없음 = 0)"""
+    cell = cell.replace(",", "")
+    if cell in ("", "-"):
+        return 0.0
+    return float(cell)
+
+
+def _stacked(headers, j):
+    """j번째 컬럼의 헤더 라벨을 위에서부터 쌓은 튜플"""
+    return tuple(h[j] if j < len(h) else "" for h in headers)
+
+
+def _find_column(headers, labels, path):
+    """
+    헤더 줄들(headers)에서 라벨 튜플(labels)과 앞부분이 일치하는
+    첫 번째 컬럼 번호를 찾는다.
+    """
+    n = len(labels)
+    for j in range(len(headers[0])):
+        if _stacked(headers, j)[:n] == tuple(labels):
+            return j
+    raise ValueError(f"[ingest] {path}: column {labels} not found")
+
+
+def parse_year(label):
+    """
+    연도 헤더 라벨 → 정수 연도 (연도가 아니면 None)
+
+    예: "2024" → 2024, "2025 3/4" → 2025, "2024.2/2" → 2024
+    """
+    head = str(label)[:4]
+    return int(head) if head.isdigit() else None
+
+
+def _find_year_columns(headers, labels, path):
+    """
+    라벨 튜플의 첫 칸(연도)을 와일드카드로 보고,
+    나머지 라벨이 일치하는 컬럼을 연도별로 찾는다. → {연도: 컬럼 번호}
+
+    같은 연도에 여러 컬럼(분기/반기)이 있으면 마지막(가장 최근) 컬럼을 사용
+    """
+    rest = tuple(labels[1:])
+    n = len(rest)
+    found = {}
+    for j in range(len(headers[0])):
+        stacked = _stacked(headers, j)
+        year = parse_year(stacked[0])
+        if year is not None and stacked[1:1 + n] == rest:
+            found[year] = j
+    if not found:
+        raise ValueError(f"[ingest] {path}: column {labels} not found for any year")
+    return found
+
+
+# =====================================================
+# 4. 단일 파일 → 자치구별 값
+# =====================================================
+def _split_headers(spec):
+    """
+    파일 앞쪽의 헤더 줄들과 나머지 데이터 행 iterator를 분리한다.
+
+    헤더 줄 수는 자동으로 판별한다:
+    KOSIS 파일은 헤더 줄마다 첫 컬럼에 같은 라벨(예: "자치구별(1)")이
+    반복되므로, 첫 줄과 첫 셀이 같은 줄까지를 헤더로 본다.
+    (시설 목록처럼 aggregate="count"인 파일은 헤더가 한 줄)
+    """
+    rows = _iter_rows(spec)
+    headers = [next(rows)]
+    if spec.get("aggregate") == "count":
+        return headers, rows
+
+    for row in rows:
+        if row and row[0] == headers[0][0]:
+            headers.append(row)
+            continue
+        return headers, itertools.chain([row], rows)
+    return headers, iter(())
+
+
+def _target(key, spec, headers, find=_find_column):
+    """
+    명세(spec)에서 값 하나를 뽑기 위한 추출 대상을 만든다.
+
+    반환: (key, where, 값 컬럼 목록, 분모 컬럼, 배율)
+    - 값 컬럼이 여러 개(sum_columns)면 합계를 사용
+    - count 집계 명세는 값 컬럼 목록이 None (행 개수를 셈)
+    """
+    if spec.get("aggregate") == "count":
+        return (key, spec.get("where", {}), None, None, 1)
+
+    labels = spec.get("sum_columns", [spec["column"]])
+    cols = [find(headers, lab, spec["path"]) for lab in labels]
+    den = find(headers, spec["denominator"], spec["path"]) if "denominator" in spec else None
+    return (key, spec.get("where", {}), cols, den, spec.get("scale", 1))
+
+
+def _scan(spec, targets):
+    """
+    데이터 행을 한 번만 훑으면서 여러 추출 대상(targets)의 값을 동시에 모은다.
+
+    반환: {대상 key: {자치구: 값}}
+    """
+    headers, rows = _split_headers(spec)
+    targets = targets(headers)
+    values = {t[0]: {} for t in targets}
+
+    for row in rows:
+        if not row:
+            continue
+
+        district = _district_of(row, spec)
+        if not district or district in TOTAL_LABELS:
+            continue
+
+        for key, where, cols, den, scale in targets:
+            if any(row[c] != v for c, v in where.items()):
+                continue
+
+            if cols is None:
+                values[key][district] = values[key].get(district, 0) + 1
+                continue
+
+            value = sum(_to_number(row[c]) for c in cols)
+            if den is not None:
+                value = value / _to_number(row[den]) * scale
+            values[key][district] = value
+
+    return values
+
+
+def read_source(spec):
+    """명세 하나를 읽어 {자치구: 값} dict를 반환한다. (명세에 적힌 연도 하나)"""
+    return _scan(spec, lambda headers: [_target(None, spec, headers)])[None]
+
+
+def read_source_years(spec):
+    """
+    명세 하나를 읽어 파일에 있는 모든 연도의 {연도: {자치구: 값}}을 반환한다.
+
+    column의 연도 라벨만 바꿔 가며 같은 항목을 연도별로 찾는다.
+    (연도 헤더가 없는 count 집계 파일은 명세의 "year" 값을 연도로 사용)
+    """
+    if spec.get("aggregate") == "count":
+        return {spec.get("year"): read_source(spec)}
+
+    def targets(headers):
+        cols = _find_year_columns(headers, spec["column"], spec["path"])
+        dens = (
+            _find_year_columns(headers, spec["denominator"], spec["path"])
+            if "denominator" in spec else {}
+        )
+        return [
+            (year, spec.get("where", {}), [col], dens.get(year), spec.get("scale", 1))
+            for year, col in sorted(cols.items())
+        ]
+
+    return _scan(spec, targets)
+
+
+def read_source_variants(spec, variants):
+    """
+    같은 파일에서 명세 일부만 바꾼 여러 값(성별 / 연령대 등)을 한 번에 읽는다.
+
+    variants: {이름: 덮어쓸 명세 키 dict}  (예: {"남자": {"column": (...)}})
+    반환    : {이름: {자치구: 값}}
+    """
+    return _scan(spec, lambda headers: [
+        _target(name, {**spec, **override}, headers)
+        for name, override in variants.items()
+    ])
+
+
+# =====================================================
+# 5. 변수 목록 → tidy DataFrame
+# =====================================================
+def build_tidy(sources, variables, districts=None):
+    """
+    sources 명세로 variables 순서의 tidy 테이블(district + 변수들)을 만든다.
+
+    - districts를 주지 않으면 첫 번째 변수 파일에 등장한 자치구 순서를 따른다.
+    - count 집계 변수는 목록에 없는 자치구를 0으로 채운다.
+    - 다른 변수에 값이 없는 자치구는 결측으로 남겨 두고 경고를 출력한다.
+    """
+    missing = [v for v in variables if v not in sources]
+    if missing:
+        raise ValueError(f"[ingest] no source spec for: {missing}")
+
+    columns = {}
+    for var in variables:
+        columns[var] = read_source(sources[var])
+        if districts is None:
+            districts = list(columns[var])
+
+    df = pd.DataFrame({"district": districts})
+    for var in variables:
+        _set_column(df, var, sources[var], columns[var])
+
+    return df
+
+
+def patch_tidy(df, sources, variables):
+    """
+    기존 tidy 테이블(df)에서 variables 컬럼만 원본 파일로부터 다시 읽어 교체한다.
+
+    - 다른 컬럼과 자치구 순서는 그대로 유지
+    - 원본 파일 하나가 바뀌었을 때 전체 재수집 없이 해당 컬럼만 갱신하는 용도
+    """
+    df = df.copy()
+    for var in variables:
+        _set_column(df, var, sources[var], read_source(sources[var]))
+    return df
+
+
+def _set_column(df, var, spec, values):
+    """{자치구: 값} dict를 df의 자치구 순서에 맞춰 var 컬럼으로 넣는다."""
+    fill = 0 if spec.get("aggregate") == "count" else None
+    df[var] = [values.get(d, fill) for d in df["district"]]
+
+    if df[var].isnull().any():
+        print(f"  ⚠️ {var}: 값이 없는 자치구 {df.loc[df[var].isnull(), 'district'].tolist()}")
+    elif (df[var] % 1 == 0).all():
+        # 개수형 변수는 정수로 저장 (기존 tidy 파일 형식 유지)
+        df[var] = df[var].astype(int)
+
+
+def _compact(x):
+    """정수 값은 소수점 없이, 나머지는 그대로 (결측은 빈 칸)"""
+    if pd.isna(x):
+        return ""
+    return str(int(x)) if float(x).is_integer() else repr(float(x))
+
+
+def write_tidy(df, path, sources):
+    """
+    tidy 테이블을 CSV로 저장 (기존 파일과 같은 숫자 표기)
+
+    - 명세에 "compact"가 있는 변수는 정수 값을 소수점 없이 쓴다.
+      (실수형 컬럼이라도 기존 파일이 그렇게 저장돼 있음)
+    - 같은 내용이면 바이트도 같게 써야 table_store 내용 해시와 하위 단계 캐시가 유지된다.
+    """
+    out = df.copy()
+    for var in out.columns:
+        if sources.get(var, {}).get("compact"):
+            out[var] = out[var].map(_compact)
+    out.to_csv(path, index=False, encoding="utf-8-sig")
+
+
+def build_need_tidy(districts=None):
+    return build_tidy(NEED_SOURCES, NEED_VARS, districts)
+
+
+def build_supply_tidy(districts=None):
+    return build_tidy(SUPPLY_SOURCES, SUPPLY_VARS, districts)
+
+
+# =====================================================
+# 실행 진입점
+# =====================================================
+def main():
+    df_need = build_need_tidy()
+    df_supply = build_supply_tidy(df_need["district"].tolist())
+
+    write_tidy(df_need, DATA_DIR / "need_tidy.csv", NEED_SOURCES)
+    write_tidy(df_supply, DATA_DIR / "supply_tidy.csv", SUPPLY_SOURCES)
+
+    print("✅ need_tidy.csv / supply_tidy.csv 생성 완료")
+    print(f"📁 저장 위치: {DATA_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+instrumentation.py
+
+단계별 실행 계측 (시간 / 메모리 / 행·열 수)
+
+역할 요약:
+- 파이프라인 단계 하나를 실행하면서
+    · wall 시간 (실제 경과 시간)
+    · CPU 시간 (프로세스 전체, RF의 스레드 사용분 포함)
+    · 최대 RSS 증가량 (단계 실행 중 메모리 최고점이 얼마나 올라갔는지)
+    · 입력 / 출력 행 수 · 열 수
+  를 기록한 dict(레코드)를 만든다.
+- 레코드는 JSON lines 파일에 실행 단위로 누적 저장
+  → 데이터가 커질 때 RF 학습 / SHAP / 입출력 중 어디가 병목인지 비교
+
+조용한 모드(quiet):
+- load_data의 head() / describe() 같은 점검용 출력을 생략
+- 환경변수(MHVI_QUIET)로 전달하므로 병렬 단계의 작업 프로세스에도 그대로 적용된다.
+"""
+import json
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from config import BASE_DIR
+
+try:
+    import resource
+except ImportError:     # Windows: 최대 RSS 측정 생략
+    resource = None
+
+METRICS_PATH = BASE_DIR / "data" / "outputs" / "metrics" / "stage_metrics.jsonl"
+
+QUIET_ENV = "MHVI_QUIET"
+
+
+# =====================================================
+# 1. 조용한 모드
+# =====================================================
+def set_quiet(quiet=True):
+    """점검용 출력(head / describe 등) 생략 여부 설정"""
+    os.environ[QUIET_ENV] = "1" if quiet else "0"
+
+
+def is_quiet():
+    return os.environ.get(QUIET_ENV) == "1"
+
+
+# =====================================================
+# 2. 측정
+# =====================================================
+def _peak_rss_mb():
+    """현재 프로세스의 최대 RSS (MB), 측정 불가면 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+
+def frame_shape(obj):
+    """
+    결과 / 입력 값의 (행 수, 열 수)
+
+    - DataFrame: 그대로
+    - dict / list / tuple: 안에 든 DataFrame들의 (최대 행 수, 열 수 합계)
+    - DataFrame이 없으면 (None, None)
+    """
+    if isinstance(obj, pd.DataFrame):
+        return obj.shape
+    if isinstance(obj, dict):
+        obj = list(obj.values())
+    if isinstance(obj, (list, tuple)):
+        shapes = [s for s in map(frame_shape, obj) if s[0] is not None]
+        if shapes:
+            return max(r for r, _ in shapes), sum(c for _, c in shapes)
+    return None, None
+
+
+def measure(name, func, args):
+    """
+    func(*args)를 실행하고 (결과, 계측 레코드) 반환
+
+    레코드: stage, wall_s, cpu_s, peak_rss_delta_mb, rows_in, cols_in, rows_out, cols_out, pid
+    """
+    rows_in, cols_in = frame_shape(list(args))
+    rss_before = _peak_rss_mb()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+
+    result = func(*args)
+
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    rss_after = _peak_rss_mb()
+    rows_out, cols_out = frame_shape(result)
+
+    record = {
+        "stage": name,
+        "wall_s": round(wall, 4),
+        "cpu_s": round(cpu, 4),
+        "peak_rss_delta_mb": None if rss_before is None else round(rss_after - rss_before, 2),
+        "rows_in": rows_in,
+        "cols_in": cols_in,
+        "rows_out": rows_out,
+        "cols_out": cols_out,
+        "pid": os.getpid(),
+    }
+    return result, record
+
+
+# =====================================================
+# 3. 저장
+# =====================================================
+def write_records(records, path=METRICS_PATH, run_id=None):
+    """레코드 목록을 JSON lines로 추가 저장 (같은 실행은 같은 run_id)"""
+    run_id = run_id or datetime.now().strftime("%Y%m%dT%H%M%S")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps({"run_id": run_id, **record}, ensure_ascii=False) + "\n")
+    return path
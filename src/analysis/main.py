@@ -10,109 +10,126 @@ main.py
 
 이 파일 하나만 실행하면:
 → 모든 결과 CSV 생성
-→ 4사분면 시각화 출력
+→ 4사분면 시각화 저장 (PNG, 화면 대기 없음)
 → AI 기반 사각지대 분석까지 완료
 → Need 기반 정책 제안 생성
 → 자살률-Need 지표 동반성 분석 완료
+
+하위 명령으로 일부 단계만 실행할 수 있다. (필요한 앞 단계는 자동 포함)
+    python main.py                # 전체 (all)
+    python main.py index          # 정규화 → 지수 → 순위 / 최종 CSV 저장
+    python main.py diagnose       # AI 사각지대 진단
+    python main.py drivers        # Need 기반 정책 제안
+    python main.py cooccurrence   # 자살률-Need 지표 동반성 분석
+    python main.py plot           # 4사분면 차트 저장
+sklearn / shap / matplotlib은 해당 단계가 실제로 실행될 때만 import되므로
+index처럼 가벼운 명령은 시작 시간이 짧다.
 """
-from config import OUTPUT_DIR
+import argparse
+from pathlib import Path
+
+import ai_diagnosis
+import data_loader
+import index_calculator
+import model_store
+import need_driver
+import normalization
+import table_store
+import tree_based_need_analysis
+import visualization
+from config import (
+    OUTPUT_DIR,
+    DASHBOARD_RESULT_PATH,
+    NORM_METHOD,
+    VAR_DIRECTIONS,
+    WEIGHTS_NEED,
+    WEIGHTS_SUPPLY,
+    AI_RF_PARAMS,
+    TREE_RF_PARAMS,
+    BASE_DIR,
+    FIGURE_DIR,
+)
 from data_loader import load_data, normalize_data
-from need_driver import run_need_driver_analysis
+from need_driver import run_need_driver_analysis, POLICY_MAP
 from index_calculator import (
     calculate_need_index,
     calculate_supply_index,
     calculate_gap_index,
+    save_final_tables,
     save_rankings
 )
+from normalization import NORMALIZER_DIR
+from instrumentation import METRICS_PATH, set_quiet
+from pipeline import run_pipeline, select_stages
+from table_store import source_hash
 from visualization import plot_quadrant_chart
-from ai_diagnosis import run_ai_diagnosis
+from ai_diagnosis import run_ai_diagnosis, run_blindspot_explanation
 from tree_based_need_analysis import run_tree_based_analysis
 
+POLICY_OUTPUT_DIR = OUTPUT_DIR.parent / "recommend_policy"
+RF_OUTPUT_DIR = BASE_DIR / "data" / "outputs" / "RandomForestModel"
+QUADRANT_CHART_PATH = FIGURE_DIR / "quadrant_chart.png"
 
-def main():
-    """
-    메인 분석 파이프라인
 
-    목적:
-    - MHVI 프로젝트의 모든 분석 단계를
-      '의미 있는 순서'로 연결
-    - 각 단계의 출력이 다음 단계의 입력으로 자연스럽게 이어지도록 설계
+# =====================================================
+# 파이프라인 단계 함수
+# =====================================================
+# 각 함수는 앞 단계 결과만 인자로 받는다.
+# 앞 단계 결과는 캐시에서 불러온 값일 수도 있으므로 직접 수정하지 않고 복사해서 사용.
 
-    전체 흐름 개요:
-    1. 원본 데이터 로드 및 점검
-    2. 모든 변수 정규화 (0~100)
-    3. Need Index 계산 (위험도)
-    4. Supply Index 계산 (공급 결핍)
-    5. Gap Index 계산 및 4사분면 분류
-    6. 정책/보고용 순위 테이블 저장
-    7. 최종 결과 CSV 저장
-    8. 4사분면 시각화
-    9. AI 기반 사각지대 진단
-    10. Need 기반 정책 제안 생성
-    11. 자살률-Need 지표 동반성 분석 (RandomForest + SHAP)
-    """
-
-    # =====================================================
-    # 1. 데이터 로드
-    # =====================================================
+def _stage_load():
     # Need / Supply 원본 tidy 데이터를 불러오고
     # district 기준으로 병합된 통합 DataFrame 생성
-    df = load_data()
+    return load_data()
 
-    # =====================================================
-    # 2. 변수 정규화
-    # =====================================================
+
+def _stage_normalize(df):
     # 서로 단위가 다른 변수들을 0~100 점수로 변환
     # 이후 가중합 기반 지수 계산을 가능하게 함
-    df_need_norm, df_supply_norm = normalize_data(df)
+    # 학습된 정규화 파라미터는 normalizers/{need,supply}.json으로 저장 (시뮬레이터 / 증분 계산 기준)
+    return normalize_data(df, save=True)
 
-    # =====================================================
-    # 3. Need Index 계산
-    # =====================================================
+
+def _stage_need_index(norm):
     # 정규화된 Need 변수 + 정책적 가중치
     # → 지역별 구조적 정신건강 위험 지수 산출
-    df_need_norm = calculate_need_index(df_need_norm)
+    return calculate_need_index(norm[0].copy())
 
-    # =====================================================
-    # 4. Supply Index 계산
-    # =====================================================
+
+def _stage_supply_index(norm):
     # 정규화된 Supply 변수 + 가중치
     # → 지역별 인프라/서비스 결핍 지수 산출
-    df_supply_norm = calculate_supply_index(df_supply_norm)
+    return calculate_supply_index(norm[1].copy())
 
-    # =====================================================
-    # 5. Gap Index 계산 및 4사분면 분류
-    # =====================================================
+
+def _stage_gap(df_need_norm, df_supply_norm):
     # Gap_Index = Need_Index - Supply_Index
     #
     # 이 단계에서:
     # - 정책 개입 우선순위의 핵심 지표(Gap_Index) 계산
     # - 중앙값 기준 4사분면(A/B/C/D) 분류 수행
-    df_final, median_need, median_supply = calculate_gap_index(
-        df, df_need_norm, df_supply_norm
-    )
+    # - 같은 계산 결과로 대시보드용 라벨 테이블도 함께 생성
+    # 방향 반전 방식은 정규화 방법에 따라 다르므로 normalize 단계와 같은 method 전달
+    return calculate_gap_index(df_need_norm, df_supply_norm, method=NORM_METHOD)
 
-    # =====================================================
-    # 6. 순위 테이블 저장
-    # =====================================================
+
+def _stage_rankings(df, df_need_norm, df_supply_norm):
     # - Need Index 순위
     # - Supply Index 순위
     # - 지역별 Need 상위 3개 위험 요인
     #
     # 정책 보고서 / 대시보드 / 지도 시각화에서
     # 바로 활용 가능한 CSV 결과물 생성
-    save_rankings(df, df_need_norm, df_supply_norm)
+    save_rankings(df, df_need_norm.copy(), df_supply_norm.copy())
 
-    # =====================================================
-    # 7. 최종 결과 테이블 저장
-    # =====================================================
+
+def _stage_save(tables):
     # 모든 핵심 결과를 하나로 합친 최종 테이블:
     # district / Need_Index / Supply_Index / Gap_Index / Quadrant
-    df_final.to_csv(
-        OUTPUT_DIR / "mhvi_final_result.csv",
-        index=False,
-        encoding="utf-8-sig"
-    )
+    # - OUTPUT_DIR/mhvi_final_result.csv      (A/B/C/D)
+    # - data/processed/mhvi_final_result.csv  (대시보드용 라벨)
+    # 두 파일을 항상 같은 실행 결과로 함께 저장
+    save_final_tables(tables)
 
     print("\n" + "=" * 60)
     print("💾 결과 저장 완료")
@@ -126,60 +143,246 @@ def main():
     print("\n🎉 분석 완료!")
     print("=" * 60)
 
-    # =====================================================
-    # 8. 4사분면 시각화
-    # =====================================================
+
+def _stage_plot(tables):
     # Need_Index vs Supply_Index 산점도
     # + 중앙값 기준선 표시
     # → 각 자치구의 정책적 위치를 직관적으로 확인
-    plot_quadrant_chart(df_final, median_need, median_supply)
+    #
+    # 화면 출력(plt.show) 대신 PNG로 저장 → 서버 / 야간 배치에서도 멈추지 않음
+    path = plot_quadrant_chart(
+        tables["analysis"], tables["median_need"], tables["median_supply"],
+        out_path=QUADRANT_CHART_PATH,
+    )
+    print(f"\n🖼️ 4사분면 차트 저장: {path}")
 
-    # =====================================================
-    # 9. AI 기반 사각지대 분석
-    # =====================================================
+
+def _stage_ai_diagnosis(df, tables):
     # "공급이 평균적으로 위험을 얼마나 완화하는가"를
     # 정상 작동 지역(A/B)에서 학습한 뒤,
     # 공급 대비 위험이 과도한 지역을 사각지대로 진단
-    df_final, rf_model = run_ai_diagnosis(df, df_final)
+    # SHAP 설명은 다음 단계(ai_shap)에서 사각지대 후보만 따로 계산
+    return run_ai_diagnosis(df, tables["analysis"].copy(), explain=False)
 
-    print("\n" + "=" * 60)
-    print("✅ 전체 파이프라인 완료!")
-    print("=" * 60)
-    
-    # =====================================================
-    # 10. Need 기반 정책 제안 생성
-    # =====================================================
+
+def _stage_ai_shap(df, diagnosis):
+    # 공급 대비 Need가 과도한 지역(Inefficiency > 0)만
+    # 학습된 RF에 대해 정확한 Tree SHAP으로 변수 기여도 분해
+    # (행별 값은 모델 해시 + 행 해시로 캐시 → 바뀐 지역만 다시 계산)
+    # 이 단계는 이미 파이프라인 프로세스 풀에서 실행되므로 SHAP 계산은 단일 프로세스
+    # (안에서 다시 풀을 열면 -j N 실행 시 코어 수보다 많은 프로세스가 생김)
+    df_final, model = diagnosis
+    run_blindspot_explanation(df, df_final, model, n_jobs=1)
+
+
+def _stage_need_driver(df_need_norm):
     print("\n" + "=" * 60)
     print("🔥 정책 제안 단계 진입")
     print("=" * 60)
 
-    policy_output_dir = OUTPUT_DIR.parent / "recommend_policy"
-    policy_output_dir.mkdir(parents=True, exist_ok=True)
+    POLICY_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
     policy_df = run_need_driver_analysis(df_need_norm)
 
     policy_df.to_csv(
-        policy_output_dir / "need_policy_recommendation_by_district.csv",
+        POLICY_OUTPUT_DIR / "need_policy_recommendation_by_district.csv",
         index=False,
         encoding="utf-8-sig"
     )
-    
+
     print("\n📌 Need 기반 정책 제안 생성 완료")
-    print(f"📁 저장 위치: {policy_output_dir}")
+    print(f"📁 저장 위치: {POLICY_OUTPUT_DIR}")
+    return policy_df
 
-    # =====================================================
-    # 11. 자살률-Need 지표 동반성 분석
-    # =====================================================
+
+def _stage_tree_based():
     print("\n" + "=" * 60)
     print("🌲 자살률-Need 지표 동반성 분석 (RandomForest + SHAP)")
     print("=" * 60)
-    
+
     # tree_based_need_analysis 실행
     # 이 함수는 내부에서 모든 출력을 처리하므로 반환값 없음
     run_tree_based_analysis()
-    
+
     print("\n📌 자살률-Need 지표 동반성 분석 완료")
 
+
+# =====================================================
+# 파이프라인 정의 (단계 · 입력 · 설정 · 결과 파일)
+# =====================================================
+# params:   값이 바뀌면 그 단계(와 결과가 달라진 하위 단계)만 다시 실행
+# code:     소스가 바뀌면 다시 실행할 모듈 (단계 함수가 호출하는 분석 모듈 전부)
+#           → data_loader / normalization / index_calculator 등을 고치면 해당 단계부터 다시 실행
+# parallel: 지수 계산 이후 서로 독립인 모델 / 정책 단계 → 프로세스 풀에서 동시 실행
+STAGES = [
+    {
+        "name": "load",
+        "func": _stage_load,
+        "params": lambda: {"data": source_hash("merged")},
+        "code": [data_loader, table_store],
+    },
+    {
+        "name": "normalize",
+        "func": _stage_normalize,
+        "inputs": ["load"],
+        "params": lambda: {"method": NORM_METHOD},
+        "code": [data_loader, normalization],
+        "files": [NORMALIZER_DIR / "need.json", NORMALIZER_DIR / "supply.json"],
+    },
+    {
+        "name": "need_index",
+        "func": _stage_need_index,
+        "inputs": ["normalize"],
+        "params": lambda: {"weights": WEIGHTS_NEED},
+        "code": [index_calculator, normalization],
+    },
+    {
+        "name": "supply_index",
+        "func": _stage_supply_index,
+        "inputs": ["normalize"],
+        "params": lambda: {"weights": WEIGHTS_SUPPLY},
+        "code": [index_calculator, normalization],
+    },
+    {
+        "name": "gap",
+        "func": _stage_gap,
+        "inputs": ["need_index", "supply_index"],
+        "params": lambda: {
+            "need": WEIGHTS_NEED,
+            "supply": WEIGHTS_SUPPLY,
+            "directions": VAR_DIRECTIONS,
+            "method": NORM_METHOD,
+        },
+        "code": [index_calculator, normalization],
+    },
+    {
+        "name": "rankings",
+        "func": _stage_rankings,
+        "inputs": ["load", "need_index", "supply_index"],
+        "code": [index_calculator, normalization],
+        "files": [
+            OUTPUT_DIR / "need_index_ranking.csv",
+            OUTPUT_DIR / "supply_index_ranking.csv",
+            OUTPUT_DIR / "district_need_top3.csv",
+        ],
+    },
+    {
+        "name": "save",
+        "func": _stage_save,
+        "inputs": ["gap"],
+        "code": [index_calculator],
+        "files": [OUTPUT_DIR / "mhvi_final_result.csv", DASHBOARD_RESULT_PATH],
+    },
+    {
+        # 헤드리스 렌더링 → 모델 단계와 함께 백그라운드 프로세스에서 저장
+        "name": "plot",
+        "parallel": True,
+        "func": _stage_plot,
+        "inputs": ["gap"],
+        "code": [visualization],
+        "files": [QUADRANT_CHART_PATH],
+    },
+    {
+        "name": "ai_diagnosis",
+        "parallel": True,
+        "func": _stage_ai_diagnosis,
+        "inputs": ["load", "gap"],
+        "params": lambda: {"rf": AI_RF_PARAMS},
+        "code": [ai_diagnosis, model_store, index_calculator],
+        "files": [OUTPUT_DIR / "ai_blindspot_ranking.csv"],
+    },
+    {
+        "name": "ai_shap",
+        "parallel": True,
+        "func": _stage_ai_shap,
+        "inputs": ["load", "ai_diagnosis"],
+        "code": [ai_diagnosis, model_store],
+        "files": [OUTPUT_DIR / "ai_blindspot_shap.csv"],
+    },
+    {
+        # POLICY_MAP은 need_driver 모듈 소스에 포함 → 바뀌면 이 단계만 재실행
+        "name": "need_driver",
+        "parallel": True,
+        "func": _stage_need_driver,
+        "inputs": ["need_index"],
+        "params": lambda: {"policy_map": POLICY_MAP, "weights": WEIGHTS_NEED},
+        "code": [need_driver, table_store],
+        "files": [POLICY_OUTPUT_DIR / "need_policy_recommendation_by_district.csv"],
+    },
+    {
+        # need_tidy.csv를 직접 읽는 독립 단계
+        "name": "tree_based",
+        "parallel": True,
+        "func": _stage_tree_based,
+        "params": lambda: {"data": source_hash("need"), "rf": TREE_RF_PARAMS},
+        "code": [tree_based_need_analysis, model_store, table_store],
+        "files": [
+            RF_OUTPUT_DIR / "rf_feature_importance.csv",
+            RF_OUTPUT_DIR / "rf_shap_summary.csv",
+            RF_OUTPUT_DIR / "rf_predictions.csv",
+        ],
+    },
+]
+
+
+# =====================================================
+# 하위 명령 → 실행할 최종 단계 (앞 단계는 select_stages가 자동 포함)
+# =====================================================
+COMMANDS = {
+    "all": [s["name"] for s in STAGES],
+    "index": ["gap", "rankings", "save"],
+    "diagnose": ["ai_diagnosis", "ai_shap"],
+    "drivers": ["need_driver"],
+    "cooccurrence": ["tree_based"],
+    "plot": ["plot"],
+}
+
+
+def main(force=False, jobs=None, show=False, command="all", quiet=False, metrics_path=METRICS_PATH):
+    """
+    메인 분석 파이프라인
+
+    목적:
+    - MHVI 프로젝트의 모든 분석 단계를
+      '의미 있는 순서'로 연결
+    - 각 단계의 출력이 다음 단계의 입력으로 자연스럽게 이어지도록 설계
+    - 단계별 입력(앞 단계 결과 + 설정값 + 코드)이 지난 실행과 같으면
+      다시 계산하지 않고 저장된 결과를 사용 (pipeline.py)
+      → force=True면 모든 단계를 다시 실행
+    - ai_diagnosis / need_driver / tree_based는 서로 독립이므로
+      jobs개 프로세스에서 동시에 실행 (jobs=1이면 순차 실행)
+    - 4사분면 차트는 파일로만 저장 (show=True면 마지막에 화면에도 출력)
+    - command: COMMANDS의 하위 명령 (해당 단계와 그 앞 단계만 실행)
+    - 단계마다 시간 / 메모리 / 행·열 수를 metrics_path(JSON lines)에 기록
+      quiet=True면 head() / describe() 같은 점검용 출력 생략
+
+    전체 흐름 개요 (STAGES):
+    1. 원본 데이터 로드 및 점검                (load)
+    2. 모든 변수 정규화 (0~100)                (normalize)
+    3. Need Index 계산 (위험도)               (need_index)
+    4. Supply Index 계산 (공급 결핍)          (supply_index)
+    5. Gap Index 계산 및 4사분면 분류          (gap)
+    6. 정책/보고용 순위 테이블 저장            (rankings)
+    7. 최종 결과 CSV 저장                     (save)
+    8. 4사분면 시각화 (PNG 저장)               (plot)
+    9. AI 기반 사각지대 진단                   (ai_diagnosis)
+       + 사각지대 후보 SHAP 원인 분석           (ai_shap)
+    10. Need 기반 정책 제안 생성               (need_driver)
+    11. 자살률-Need 지표 동반성 분석 (RandomForest + SHAP)  (tree_based)
+    """
+    set_quiet(quiet)
+    stages = select_stages(STAGES, COMMANDS[command])
+    results = run_pipeline(stages, force=force, max_workers=jobs, metrics_path=metrics_path)
+
+    if show and "gap" in results:
+        tables = results["gap"]
+        plot_quadrant_chart(
+            tables["analysis"], tables["median_need"], tables["median_supply"]
+        )
+
+    if command != "all":
+        return results
+
     # =====================================================
     # 최종 완료 메시지
     # =====================================================
@@ -188,7 +391,7 @@ def main():
     print("=" * 60)
     print("\n생성된 결과물:")
     print("  1. MHVI 최종 결과 (mhvi_final_result.csv)")
-    print("  2. 4사분면 시각화")
+    print(f"  2. 4사분면 시각화 ({QUADRANT_CHART_PATH.name})")
     print("  3. AI 사각지대 진단")
     print("  4. Need 기반 정책 제안")
     print("  5. RandomForest Feature Importance")
@@ -196,8 +399,21 @@ def main():
     print("  7. 자살률 예측 및 잔차 분석")
     print("=" * 60 + "\n")
 
+    return results
+
 
 # 이 파일을 직접 실행했을 때만 main() 실행
 # (다른 파일에서 import될 경우 자동 실행 방지)
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="MHVI 분석 파이프라인")
+    parser.add_argument("command", nargs="?", default="all", choices=list(COMMANDS), help="실행할 단계 묶음 (기본: all)")
+    parser.add_argument("--force", action="store_true", help="저장된 단계 결과를 무시하고 전부 다시 실행")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="병렬 단계 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--show", action="store_true", help="4사분면 차트를 화면에도 출력 (GUI 환경용)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="head() / describe() 등 점검용 출력 생략")
+    parser.add_argument("--metrics", type=Path, default=METRICS_PATH, help="단계별 계측 JSON lines 파일")
+    args = parser.parse_args()
+    main(
+        force=args.force, jobs=args.jobs, show=args.show, command=args.command,
+        quiet=args.quiet, metrics_path=args.metrics,
+    )
\ No newline at end of file
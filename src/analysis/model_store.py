@@ -0,0 +1,217 @@
+"""
+model_store.py
+
+학습된 모델 저장소 (입력 해시 기반 joblib 캐시)
+
+역할 요약:
+- RandomForest 같은 학습 모델을 '학습 입력의 해시'를 키로 저장한다.
+    키 = 모델 이름 + 학습 데이터(X, y) 바이트 + 변수 목록 + 하이퍼파라미터 + sklearn 버전
+- 입력이 같으면 다시 학습하지 않고 저장된 모델을 불러온다.
+  → ai_diagnosis / tree_based_need_analysis가 실행될 때마다 트리 300개를 새로 학습하지 않음
+  → 같은 입력이면 항상 같은 모델 객체를 쓰므로 실행마다 예측이 달라지지 않음
+- 입력이 바뀌면 키가 달라지므로 자동으로 다시 학습한다.
+  같은 이름의 모델은 최근 MODEL_KEEP개까지 남기고 그보다 오래된 것만 정리한다.
+  (키가 다른 학습 한 번으로 파이프라인 모델이 바로 지워지지 않음)
+- fit_or_load는 학습했든 불러왔든 마지막으로 사용한 키를 {name}.current에 기록한다.
+  → 입력을 되돌려 예전 모델을 다시 쓰는 경우에도 '현재 모델'이 정확히 그 키를 가리킴
+  → 현재 모델은 정리 대상에서 제외
+- 대시보드 / 시나리오 도구는 학습하지 않고 load_model(name)로 파이프라인이 마지막으로 사용한 모델을
+  읽기 전용 메모리 매핑으로 불러온다. (같은 모델 → ai_blindspot_ranking.csv와 같은 예측)
+  (joblib mmap_mode="r": 모델 안의 numpy 배열은 파일 페이지를 공유
+   ※ sklearn 트리 노드 배열은 불러올 때 트리 내부 버퍼로 복사되므로 매핑 효과는 그 외 배열에 한정)
+
+저장 구성 (MODEL_DIR):
+- {name}_{key}.joblib : 모델 (압축 없음 → 메모리 매핑 가능)
+- {name}_{key}.json   : 키, 변수 목록, 하이퍼파라미터, 학습 행 수, 부가 정보(extra)
+- {name}.current      : 마지막으로 사용한 모델 키 (한 줄)
+"""
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+
+import numpy as np
+
+from config import CACHE_DIR
+
+MODEL_DIR = CACHE_DIR / "models"
+
+# 이름별로 남겨 둘 최근 모델 수
+MODEL_KEEP = 3
+
+
+# =====================================================
+# 1. 키
+# =====================================================
+def model_key(name, X, y, features, params):
+    """학습 입력 → 16자리 해시 (값 · 순서 · 설정 중 하나라도 바뀌면 다른 키)"""
+    import sklearn
+
+    h = hashlib.sha256()
+    h.update(name.encode("utf-8"))
+    h.update(json.dumps(list(features), ensure_ascii=False).encode("utf-8"))
+    h.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    h.update(sklearn.__version__.encode("utf-8"))
+    for arr in (X, y):
+        arr = np.ascontiguousarray(np.asarray(arr, dtype=np.float64))
+        h.update(str(arr.shape).encode("utf-8"))
+        h.update(arr.tobytes())
+    return h.hexdigest()[:16]
+
+
+def model_hash(model):
+    """
+    학습된 트리 모델의 내용 해시 (16자리)
+
+    - 트리 구조(자식 · 분할 변수 · 기준값), 노드별 학습 표본 가중치, 잎 값으로 계산
+      → 같은 모델이면 저장소 로드 여부와 무관하게 같음
+      (path-dependent Tree SHAP은 노드 표본 수를 쓰므로 분할이 같아도 부트스트랩이 다르면 다른 해시)
+    - SHAP 값 캐시처럼 '모델 결과'를 재사용하는 곳의 키로 사용
+    """
+    h = hashlib.sha256()
+    for est in getattr(model, "estimators_", [model]):
+        tree = est.tree_
+        for arr in (
+            tree.children_left, tree.children_right, tree.feature, tree.threshold,
+            tree.weighted_n_node_samples, tree.value,
+        ):
+            h.update(np.ascontiguousarray(arr).tobytes())
+    return h.hexdigest()[:16]
+
+
+def _paths(name, key):
+    stem = MODEL_DIR / f"{name}_{key}"
+    return stem.with_suffix(".joblib"), stem.with_suffix(".json")
+
+
+def _current_path(name):
+    return MODEL_DIR / f"{name}.current"
+
+
+def current_key(name):
+    """마지막으로 사용한 모델 키 (기록이 없으면 None)"""
+    path = _current_path(name)
+    return path.read_text(encoding="utf-8").strip() if path.exists() else None
+
+
+def set_current(name, key):
+    """현재 모델 키 기록 (프로세스별 임시 파일에 쓴 뒤 교체)"""
+    MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "w", dir=MODEL_DIR, prefix=f"{name}.", suffix=".current.tmp", delete=False, encoding="utf-8"
+    ) as f:
+        f.write(key)
+    os.replace(f.name, _current_path(name))
+
+
+# =====================================================
+# 2. 저장 / 로드
+# =====================================================
+def save_model(model, name, key, meta=None):
+    """
+    모델과 메타데이터를 원자적으로 저장하고 같은 이름의 모델은 최근 MODEL_KEEP개만 남김
+    (현재 모델({name}.current)은 오래됐어도 지우지 않음)
+    """
+    import joblib
+
+    MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    model_path, meta_path = _paths(name, key)
+
+    meta = {
+        "name": name,
+        "key": key,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        **(meta or {}),
+    }
+
+    # 쓰는 도중 다른 프로세스가 읽지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_model = model_path.with_name(model_path.name + ".tmp")
+    tmp_meta = meta_path.with_name(meta_path.name + ".tmp")
+    joblib.dump(model, tmp_model)
+    tmp_meta.write_text(json.dumps(meta, ensure_ascii=False, indent=1, default=str), encoding="utf-8")
+    os.replace(tmp_model, model_path)
+    os.replace(tmp_meta, meta_path)
+
+    # 방금 저장한 모델을 포함해 최근 MODEL_KEEP개보다 오래된 모델만 정리
+    # (.tmp는 다른 프로세스가 쓰는 중인 파일이므로 건드리지 않음)
+    keep = {key, current_key(name)}
+    saved = sorted(MODEL_DIR.glob(f"{name}_*.joblib"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in saved[MODEL_KEEP:]:
+        old_key = old.stem.removeprefix(f"{name}_")
+        if old_key not in keep:
+            for path in _paths(name, old_key):
+                path.unlink(missing_ok=True)
+    return model_path
+
+
+def load_model(name, key=None, mmap=True):
+    """
+    저장된 모델 불러오기 (학습하지 않음)
+
+    - key=None이면 그 이름의 현재 모델 ({name}.current: fit_or_load가 마지막으로 사용한 키)
+    - mmap=True면 모델의 numpy 배열을 읽기 전용 메모리 매핑으로 연다 (predict / SHAP은 그대로 동작)
+    - 반환: (모델, 메타데이터 dict)
+    - 없으면 FileNotFoundError (main.py diagnose / cooccurrence를 먼저 실행)
+    """
+    import joblib
+
+    if key is None:
+        key = current_key(name)
+        if key is None:
+            raise FileNotFoundError(
+                f"[model_store] 저장된 모델이 없음: {name} ({MODEL_DIR}) "
+                "→ python main.py diagnose / cooccurrence를 먼저 실행"
+            )
+
+    model_path, meta_path = _paths(name, key)
+    if not model_path.exists():
+        raise FileNotFoundError(
+            f"[model_store] 저장된 모델이 없음: {model_path} "
+            "→ python main.py diagnose / cooccurrence를 먼저 실행"
+        )
+
+    model = joblib.load(model_path, mmap_mode="r" if mmap else None)
+    meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {"key": key}
+    return model, meta
+
+
+# =====================================================
+# 3. 학습 또는 불러오기
+# =====================================================
+def fit_or_load(name, make_model, X, y, params, features=None, extra=None, mmap=True):
+    """
+    입력 해시가 같은 모델이 저장돼 있으면 불러오고, 없으면 학습 후 저장
+
+    입력:
+    - make_model: 학습 전 모델 객체를 만드는 함수 (예: lambda: RandomForestRegressor(**params))
+    - X, y: 학습 데이터 (DataFrame / 배열)
+    - params: 하이퍼파라미터 dict (키에 포함)
+    - features: 변수 목록 (None이면 X의 컬럼명)
+    - extra: 학습 직후 계산해 메타데이터에 함께 남길 값을 만드는 함수 extra(model) → dict
+      (예: 교차검증 점수 → 불러올 때도 다시 계산하지 않음)
+
+    반환: (모델, 메타데이터 dict) — 메타데이터의 "loaded"는 저장소에서 불러왔는지 여부
+    사용한 키는 불러온 경우에도 {name}.current로 기록 (load_model(name)이 같은 모델을 읽도록)
+    """
+    features = list(X.columns) if features is None else list(features)
+    key = model_key(name, X, y, features, params)
+
+    model_path, _ = _paths(name, key)
+    if model_path.exists():
+        model, meta = load_model(name, key, mmap=mmap)
+        set_current(name, key)
+        return model, {**meta, "loaded": True}
+
+    model = make_model()
+    model.fit(X, y)
+
+    meta = {
+        "features": features,
+        "params": params,
+        "n_rows": int(len(y)),
+        "extra": extra(model) if extra else {},
+    }
+    save_model(model, name, key, meta)
+    set_current(name, key)
+    return model, {"name": name, "key": key, **meta, "loaded": False}
@@ -7,6 +7,7 @@ from config import (
     NEED_VARS,
     WEIGHTS_NEED,
 )
+from table_store import load_district_table
 
 
 # =====================================================
@@ -171,11 +172,13 @@ def run_need_driver_analysis(df_need_norm: pd.DataFrame) -> pd.DataFrame:
 def main():
     BASE_DIR = Path(__file__).resolve().parents[2]
 
-    input_path = BASE_DIR / "data" / "processed" / "mhvi_final_result.csv"
     output_dir = BASE_DIR / "data" / "outputs" / "recommend_policy"
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    df = pd.read_csv(input_path)
+    # need_tidy 원값을 *_norm 이름으로 넘기면
+    # run_need_driver_analysis 내부에서 0~100 정규화를 수행한다.
+    df = load_district_table("need")
+    df = df.rename(columns={v: f"{v}_norm" for v in NEED_VARS})
     result = run_need_driver_analysis(df)
 
     result.to_csv(
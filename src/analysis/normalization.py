@@ -0,0 +1,212 @@
+"""
+normalization.py
+
+변수 정규화 (학습된 파라미터 저장 · 재사용)
+
+역할 요약:
+- 모든 변수를 한 번에 정규화하고, 그때 계산한 통계량(최솟값·범위, 평균·표준편차 등)을
+  '정규화 파라미터'로 남긴다.
+- 파라미터는 JSON으로 저장되므로
+  새 자치구 / 값이 바뀐 자치구 한 곳만 같은 기준으로 변환할 수 있다.
+  (전체 테이블을 다시 정규화하지 않음)
+- 정규화 방법은 코드 분기가 아니라 method 인자로 고른다.
+
+정규화 방법:
+- "minmax": 최솟값 → 0, 최댓값 → 100 (기존 MinMaxScaler와 같은 계산식)
+- "zscore": (값 - 평균) / 표준편차
+- "rank":   백분위 순위 0~100 (동점은 평균 순위)
+- "robust": (값 - 중앙값) / 사분위 범위(IQR) → 이상치에 덜 민감
+
+방향(direction):
+- "positive": 값이 클수록 점수가 큼 (기본)
+- "negative": 반대 방향 (0~100 방법은 100 - 점수, 나머지는 부호 반전)
+
+⚠️ 주의:
+- "zscore", "robust"는 0~100 범위가 아니므로
+  지수 값의 크기는 달라지고, 순위 / 4사분면 비교용으로 해석해야 한다.
+"""
+import json
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from config import OUTPUT_DIR
+
+NORMALIZER_DIR = OUTPUT_DIR.parent / "normalizers"
+
+METHODS = ("minmax", "zscore", "rank", "robust")
+
+# 0~100 범위로 닫혀 있는 방법 (negative 방향 = 100 - 점수)
+BOUNDED_METHODS = ("minmax", "rank")
+
+
+# =====================================================
+# 1. 배열 단위 fit / transform (자치구 축 = 뒤에서 두 번째)
+# =====================================================
+# (자치구 × 변수) 2차원뿐 아니라
+# (연도·층 × 자치구 × 변수) 3차원 배열도 그룹별로 한 번에 처리한다.
+def fit_arrays(X, method="minmax"):
+    """자치구 축(axis=-2) 방향 통계량 (NaN 무시)"""
+    if method not in METHODS:
+        raise ValueError(f"[normalization] unknown method: {method} (choose from {METHODS})")
+
+    # 관측이 전혀 없는 그룹(모두 NaN)은 경고 없이 NaN 통계량
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        if method == "minmax":
+            # sklearn MinMaxScaler와 같은 계산식: X * scale + offset
+            # 최댓값 = 최솟값이면 0점 처리
+            mn = np.nanmin(X, axis=-2, keepdims=True)
+            rng = np.nanmax(X, axis=-2, keepdims=True) - mn
+            scale = np.divide(100.0, rng, out=np.zeros_like(rng), where=rng > 0)
+            return {"scale": scale, "offset": -mn * scale}
+
+        if method == "zscore":
+            return {
+                "mean": np.nanmean(X, axis=-2, keepdims=True),
+                "std": np.nanstd(X, axis=-2, keepdims=True),
+            }
+
+        if method == "robust":
+            q25, q50, q75 = np.nanpercentile(X, [25, 50, 75], axis=-2, keepdims=True)
+            return {"median": q50, "iqr": q75 - q25}
+
+        # rank: 정렬된 기준값 전체를 보관 (NaN은 뒤로 정렬됨)
+        return {"sorted": np.sort(X, axis=-2)}
+
+
+def transform_arrays(X, method, stats, directions=None):
+    """fit_arrays의 통계량으로 X를 변환 (X의 자치구 수는 fit 때와 달라도 됨)"""
+    if method == "minmax":
+        out = X * stats["scale"] + stats["offset"]
+    elif method == "zscore":
+        out = _safe_divide(X - stats["mean"], stats["std"])
+    elif method == "robust":
+        out = _safe_divide(X - stats["median"], stats["iqr"])
+    else:
+        out = _percentile_rank(X, stats["sorted"])
+
+    out = np.where(np.isnan(X), np.nan, out)
+
+    if directions is not None:
+        out = apply_directions(out, directions, method)
+    return out
+
+
+def apply_directions(scores, directions, method):
+    """
+    정규화 점수의 방향 맞추기 (마지막 축 = 변수)
+
+    - directions: 변수별 "positive" | "negative"
+    - negative 변수만 뒤집는다 (0~100 방법은 100 - 점수, 그 외 부호 반전)
+    """
+    negative = np.asarray(directions) == "negative"
+    if not negative.any():
+        return scores
+    flipped = (100.0 - scores) if method in BOUNDED_METHODS else -scores
+    return np.where(negative, flipped, scores)
+
+
+def _safe_divide(a, b):
+    return np.divide(a, b, out=np.zeros(np.broadcast(a, b).shape), where=b > 0)
+
+
+def _percentile_rank(X, sorted_ref):
+    """기준값 안에서의 백분위 순위 (동점 = 평균 순위, 기준 사이 값은 중간 순위)"""
+    moved_shape = np.moveaxis(X, -2, -1).shape
+    X2 = np.moveaxis(X, -2, -1).reshape(-1, X.shape[-2])
+    R2 = np.moveaxis(sorted_ref, -2, -1).reshape(-1, sorted_ref.shape[-2])
+    out2 = np.full(X2.shape, np.nan)
+
+    for i, (x, ref) in enumerate(zip(X2, R2)):
+        ref = ref[~np.isnan(ref)]
+        if len(ref) < 2:
+            out2[i] = 0.0
+            continue
+        left = np.searchsorted(ref, x, side="left")
+        right = np.searchsorted(ref, x, side="right")
+        pos = np.clip((left + right - 1) / 2, 0, len(ref) - 1)
+        out2[i] = pos / (len(ref) - 1) * 100.0
+
+    return np.moveaxis(out2.reshape(moved_shape), -1, -2)
+
+
+# =====================================================
+# 2. DataFrame 단위 정규화기 (파라미터 dict)
+# =====================================================
+def fit_normalizer(df, variables, method="minmax", directions=None):
+    """
+    df[variables]에 정규화 파라미터를 한 번에 학습
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        district + 원본 변수
+    variables : list[str]
+        정규화할 변수 목록 (출력 컬럼은 {변수}_norm)
+    method : str
+        METHODS 중 하나
+    directions : dict | None
+        {변수: "positive" | "negative"} (없는 변수는 positive)
+
+    Returns:
+    --------
+    dict
+        {"method", "variables", "directions", "stats"} (save_normalizer로 저장 가능)
+    """
+    directions = directions or {}
+    X = df[variables].to_numpy(dtype=float)
+    return {
+        "method": method,
+        "variables": list(variables),
+        "directions": [directions.get(v, "positive") for v in variables],
+        "stats": fit_arrays(X, method),
+    }
+
+
+def transform(normalizer, df):
+    """
+    학습된 파라미터로 df를 변환 (행 수 제한 없음 → 자치구 1곳도 가능)
+
+    출력: district(있으면) + {변수}_norm 컬럼
+    """
+    X = df[normalizer["variables"]].to_numpy(dtype=float)
+    norm = transform_arrays(
+        X, normalizer["method"], normalizer["stats"], normalizer["directions"]
+    )
+
+    out = df[["district"]].copy() if "district" in df else pd.DataFrame(index=df.index)
+    for j, var in enumerate(normalizer["variables"]):
+        out[f"{var}_norm"] = norm[:, j]
+    return out
+
+
+def fit_transform(df, variables, method="minmax", directions=None):
+    normalizer = fit_normalizer(df, variables, method, directions)
+    return normalizer, transform(normalizer, df)
+
+
+# =====================================================
+# 3. 저장 / 로드
+# =====================================================
+def save_normalizer(normalizer, name):
+    """NORMALIZER_DIR/{name}.json 으로 저장"""
+    NORMALIZER_DIR.mkdir(parents=True, exist_ok=True)
+    path = NORMALIZER_DIR / f"{name}.json"
+    payload = {
+        **normalizer,
+        "stats": {k: np.asarray(v).tolist() for k, v in normalizer["stats"].items()},
+    }
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=1), encoding="utf-8")
+    return path
+
+
+def load_normalizer(name):
+    """save_normalizer로 저장한 파라미터 (없으면 FileNotFoundError)"""
+    path = NORMALIZER_DIR / f"{name}.json"
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    payload["stats"] = {
+        k: np.array(v, dtype=float) for k, v in payload["stats"].items()
+    }
+    return payload
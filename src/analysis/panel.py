@@ -0,0 +1,156 @@
+"""
+panel.py
+
+다년도 패널 저장소 (연도 × 자치구 × 변수)
+
+역할 요약:
+- 원본 KOSIS 파일의 연도 헤더(2023, 2024, "2025 3/4" 등)를 살려
+  NEED_VARS + SUPPLY_VARS 전체를 3차원 배열 values[year, district, variable]로 만든다.
+- 패널은 CACHE_DIR/panel.npz에 저장하고,
+  원본 파일 내용 해시가 같으면 다시 파싱하지 않는다.
+- 지수 계산은 index_calculator.calculate_panel_indices가
+  모든 연도를 한 번의 배열 연산으로 처리한다.
+
+→ 10년치 추세를 보기 위해 파이프라인을 10번 돌리지 않기 위한 저장소
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from config import RAW_DIR, CACHE_DIR, OUTPUT_DIR, NEED_VARS, SUPPLY_VARS
+from ingest import NEED_SOURCES, SUPPLY_SOURCES, read_source_years
+
+PANEL_PATH = CACHE_DIR / "panel.npz"
+
+SOURCES = {**NEED_SOURCES, **SUPPLY_SOURCES}
+VARIABLES = NEED_VARS + SUPPLY_VARS
+
+
+def _raw_hash():
+    """패널이 참조하는 원본 파일들의 내용 해시"""
+    h = hashlib.sha256()
+    for var in VARIABLES:
+        path = RAW_DIR / SOURCES[var]["path"]
+        h.update(var.encode("utf-8"))
+        h.update(path.read_bytes())
+    return h.hexdigest()[:16]
+
+
+# =====================================================
+# 1. 패널 생성
+# =====================================================
+def build_panel():
+    """
+    원본 파일에서 모든 연도를 읽어 패널 dict를 만든다.
+
+    반환:
+      {
+        "years":     [연도, ...],
+        "districts": [자치구, ...]   (첫 번째 Need 변수 파일의 순서),
+        "variables": NEED_VARS + SUPPLY_VARS,
+        "values":    ndarray (연도 수, 자치구 수, 변수 수), 값이 없으면 NaN
+      }
+    """
+    by_var = {var: read_source_years(SOURCES[var]) for var in VARIABLES}
+
+    first = by_var[VARIABLES[0]]
+    districts = list(first[max(first)])
+    years = sorted({y for per_year in by_var.values() for y in per_year})
+
+    values = np.full((len(years), len(districts), len(VARIABLES)), np.nan)
+    year_pos = {y: i for i, y in enumerate(years)}
+
+    for k, var in enumerate(VARIABLES):
+        # 시설 목록(count) 변수는 목록에 없는 자치구 = 0개
+        fill = 0.0 if SOURCES[var].get("aggregate") == "count" else np.nan
+        for y, per_district in by_var[var].items():
+            values[year_pos[y], :, k] = [per_district.get(d, fill) for d in districts]
+
+    return {
+        "years": years,
+        "districts": districts,
+        "variables": list(VARIABLES),
+        "values": values,
+    }
+
+
+def forward_fill(values):
+    """
+    연도 축(axis=0)으로 '가장 최근에 관측된 값'을 채운다.
+
+    예: suicide_rate가 2024년까지만 있으면 2025년 칸에는 2024년 값을 사용
+    (처음 관측되기 이전 연도는 NaN 유지)
+    """
+    n_years = values.shape[0]
+    observed = ~np.isnan(values)
+    idx = np.where(observed, np.arange(n_years)[:, None, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return np.take_along_axis(values, idx, axis=0)
+
+
+# =====================================================
+# 2. 저장 / 로드
+# =====================================================
+def load_panel(use_cache=True):
+    """원본 해시가 같으면 panel.npz에서, 아니면 원본에서 패널을 만든다."""
+    key = _raw_hash()
+
+    if use_cache and PANEL_PATH.exists():
+        with np.load(PANEL_PATH, allow_pickle=False) as z:
+            if str(z["key"]) == key:
+                return {
+                    "years": z["years"].tolist(),
+                    "districts": z["districts"].tolist(),
+                    "variables": z["variables"].tolist(),
+                    "values": z["values"],
+                }
+
+    panel = build_panel()
+
+    PANEL_PATH.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(
+        PANEL_PATH,
+        key=np.array(key),
+        years=np.array(panel["years"]),
+        districts=np.array(panel["districts"]),
+        variables=np.array(panel["variables"]),
+        values=panel["values"],
+    )
+    return panel
+
+
+def panel_to_frame(panel):
+    """패널 → long 형식 DataFrame (year, district, 변수들)"""
+    n_years, n_districts, _ = panel["values"].shape
+    df = pd.DataFrame(
+        panel["values"].reshape(n_years * n_districts, -1),
+        columns=panel["variables"],
+    )
+    df.insert(0, "district", np.tile(panel["districts"], n_years))
+    df.insert(0, "year", np.repeat(panel["years"], n_districts))
+    return df
+
+
+# =====================================================
+# 실행 진입점
+# =====================================================
+def main():
+    from index_calculator import calculate_panel_indices
+
+    panel = load_panel()
+    print(f"📅 패널: {panel['years']} × {len(panel['districts'])}개 자치구 × {len(panel['variables'])}개 변수")
+
+    df_panel = calculate_panel_indices(panel)
+    df_panel.to_csv(
+        OUTPUT_DIR / "mhvi_panel_result.csv",
+        index=False,
+        encoding="utf-8-sig"
+    )
+
+    print(f"✅ 연도별 지수 계산 완료: {sorted(df_panel['year'].unique().tolist())}")
+    print(f"📁 저장 위치: {OUTPUT_DIR / 'mhvi_panel_result.csv'}")
+
+
+if __name__ == "__main__":
+    main()
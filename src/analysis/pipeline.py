@@ -0,0 +1,303 @@
+"""
+pipeline.py
+
+단계(stage) 단위 DAG 실행기 (입력 해시 기반 결과 재사용)
+
+역할 요약:
+- 각 단계는 dict 하나로 선언한다.
+    {
+      "name":   단계 이름,
+      "func":   실행 함수 (inputs 순서대로 앞 단계 결과를 인자로 받음),
+      "inputs": 의존하는 앞 단계 이름 목록,
+      "params": 결과에 영향을 주는 설정값을 돌려주는 함수 (예: POLICY_MAP, RF 파라미터),
+      "code":   소스가 바뀌면 다시 실행해야 하는 모듈 / 함수 목록 (func 자신은 자동 포함),
+      "files":  이 단계가 만드는 결과 파일 목록 (없어지면 다시 실행),
+      "cache":  False면 항상 실행 (예: 화면 출력),
+      "parallel": True면 별도 프로세스에서 실행 (서로 독립인 모델 단계 동시 실행),
+    }
+- 입력 키 = (단계 이름, 함수 / code 소스코드, params, 앞 단계 결과 해시)의 해시
+- 같은 키의 결과가 CACHE_DIR/stages/에 있으면 함수를 실행하지 않고 불러온다.
+
+→ POLICY_MAP만 바꾸면 정책 제안 단계만,
+  RF 파라미터만 바꾸면 해당 모델 단계만 다시 실행된다.
+
+병렬 실행:
+- "parallel" 단계는 입력이 준비되는 대로 프로세스 풀에 넣고,
+  그동안 다른 단계(예: 시각화)는 메인 프로세스에서 계속 실행한다.
+- 입력 DataFrame의 숫자 컬럼은 임시 .npy 파일에 한 번만 쓰고
+  작업 프로세스는 읽기 전용 메모리맵으로 복사 없이 그대로 본다. (문자열 컬럼 등만 pickle로 전달)
+- 작업 프로세스의 출력(print)은 단계가 끝난 뒤 한 번에 모아서 출력한다.
+
+계측:
+- 모든 단계(캐시 로드 포함)를 instrumentation.measure로 감싸
+  wall / CPU 시간, 최대 RSS 증가량, 입력 / 출력 행·열 수를 JSON lines로 남긴다.
+"""
+import contextlib
+import hashlib
+import inspect
+import io
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from config import CACHE_DIR
+from instrumentation import METRICS_PATH, measure, write_records
+
+STAGE_DIR = CACHE_DIR / "stages"
+
+
+# =====================================================
+# 1. 해시 / 실행 순서
+# =====================================================
+def _hash(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+def stage_key(stage, input_hashes):
+    """단계 입력 키 (코드 / 설정 / 앞 단계 결과가 같으면 같은 키)"""
+    params = stage.get("params")
+    params_json = json.dumps(
+        params() if params else None,
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return _hash(
+        stage["name"],
+        *[inspect.getsource(obj) for obj in [stage["func"], *stage.get("code", [])]],
+        params_json,
+        *input_hashes,
+    )
+
+
+def topological_order(stages):
+    """inputs 의존성 순서대로 정렬 (선언 순서를 최대한 유지, 순환이면 ValueError)"""
+    by_name = {s["name"]: s for s in stages}
+    for s in stages:
+        unknown = [d for d in s.get("inputs", []) if d not in by_name]
+        if unknown:
+            raise ValueError(f"[pipeline] {s['name']}: unknown inputs {unknown}")
+
+    ordered, done = [], set()
+    while len(ordered) < len(stages):
+        ready = [
+            s for s in stages
+            if s["name"] not in done and all(d in done for d in s.get("inputs", []))
+        ]
+        if not ready:
+            raise ValueError("[pipeline] cycle detected")
+        ordered.append(ready[0])
+        done.add(ready[0]["name"])
+    return ordered
+
+
+def select_stages(stages, targets):
+    """targets 단계와 그 앞 단계(입력으로 이어지는 모든 단계)만 선언 순서대로 골라낸다."""
+    by_name = {s["name"]: s for s in stages}
+    unknown = [t for t in targets if t not in by_name]
+    if unknown:
+        raise ValueError(f"[pipeline] unknown stages {unknown}")
+
+    needed, todo = set(), list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in needed:
+            needed.add(name)
+            todo.extend(by_name[name].get("inputs", []))
+    return [s for s in stages if s["name"] in needed]
+
+
+# =====================================================
+# 2. 결과 저장 / 로드
+# =====================================================
+def _cache_path(stage, key):
+    return STAGE_DIR / f"{stage['name']}-{key}.pkl"
+
+
+def _load(path):
+    """(결과, 결과 해시) — 결과 해시는 저장된 바이트 내용의 해시"""
+    data = path.read_bytes()
+    return pickle.loads(data), _hash(data)
+
+
+def _save(stage, key, result):
+    STAGE_DIR.mkdir(parents=True, exist_ok=True)
+    data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # 프로세스마다 다른 임시 파일에 쓴 뒤 교체 (동시에 실행해도 서로의 임시 파일을 덮어쓰지 않음)
+    path = _cache_path(stage, key)
+    with tempfile.NamedTemporaryFile(dir=STAGE_DIR, prefix=f"{path.stem}.", suffix=".tmp", delete=False) as f:
+        f.write(data)
+    os.replace(f.name, path)
+
+    # 같은 단계의 이전 결과는 정리 (완성된 .pkl만 — 쓰는 중인 .tmp는 건드리지 않음)
+    for old in STAGE_DIR.glob(f"{stage['name']}-*.pkl"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return _hash(data)
+
+
+# =====================================================
+# 3. 공유 메모리 전달 (병렬 단계 입력)
+# =====================================================
+# 숫자 컬럼은 임시 .npy 파일에 한 번 쓰고 작업 프로세스는 읽기 전용 메모리맵으로 연다.
+# → 운영체제 페이지 캐시를 함께 쓰므로 프로세스마다 배열을 복사하지 않음
+#   (Windows / Linux, fork / spawn 방식 모두 동일하게 동작)
+def _share(obj, share_dir):
+    """
+    DataFrame의 float64 컬럼을 메모리맵 블록 하나로 옮긴 설명자로 바꾼다.
+    (dict / list / tuple 안쪽까지 재귀, 그 밖의 값은 그대로 pickle)
+    """
+    if isinstance(obj, pd.DataFrame):
+        num_cols = [c for c in obj.columns if obj[c].dtype == np.float64]
+        fd, path = tempfile.mkstemp(suffix=".npy", dir=share_dir)
+        os.close(fd)
+        np.save(path, obj[num_cols].to_numpy(dtype=np.float64))
+        return {
+            "__shared_frame__": path,
+            "num_cols": num_cols,
+            "other": obj.drop(columns=num_cols),
+            "columns": list(obj.columns),
+        }
+    if isinstance(obj, dict):
+        return {k: _share(v, share_dir) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_share(v, share_dir) for v in obj)
+    return obj
+
+
+def _attach(obj):
+    """_share 설명자 → 메모리맵을 그대로 보는 DataFrame (숫자 컬럼 복사 없음, 읽기 전용)"""
+    if isinstance(obj, dict) and "__shared_frame__" in obj:
+        block = np.load(obj["__shared_frame__"], mmap_mode="r")
+        df = pd.DataFrame(block, columns=obj["num_cols"], index=obj["other"].index, copy=False)
+        for pos, c in enumerate(obj["columns"]):
+            if c in obj["other"]:
+                df.insert(pos, c, obj["other"][c])
+        return df
+    if isinstance(obj, dict):
+        return {k: _attach(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_attach(v) for v in obj)
+    return obj
+
+
+def _run_in_worker(name, func, shared_args):
+    """작업 프로세스 진입점: (결과, 출력 문자열, 계측 레코드)"""
+    out = io.StringIO()
+    args = _attach(shared_args)
+    with contextlib.redirect_stdout(out):
+        result, record = measure(name, func, args)
+    return result, out.getvalue(), record
+
+
+# =====================================================
+# 4. 실행
+# =====================================================
+def run_pipeline(stages, force=False, max_workers=None, metrics_path=METRICS_PATH):
+    """
+    단계들을 의존성 순서로 실행하고 결과 dict를 반환
+
+    - force=True면 캐시를 무시하고 모든 단계를 다시 실행
+    - max_workers: "parallel" 단계용 프로세스 수 (None이면 CPU 수, 1이면 모두 순차 실행)
+    - metrics_path: 단계별 계측 레코드(JSON lines)를 추가할 파일 (None이면 저장 안 함)
+    - 반환: {단계 이름: 결과}, 각 단계의 실행/재사용 여부와 계측 값은 로그로 출력
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    pending = topological_order(stages)
+    results, hashes, keys = {}, {}, {}
+    log = []
+    running = {}
+    share_dir = None
+    pool = None
+    pipeline_start = time.perf_counter()
+
+    def finish(stage, result, status, record):
+        name = stage["name"]
+        results[name] = result
+        if status == "cached" or not stage.get("cache", True):
+            pass
+        else:
+            hashes[name] = _save(stage, keys[name], result)
+        log.append({**record, "status": status})
+
+    try:
+        while pending or running:
+            ready = [s for s in pending if all(d in results for d in s.get("inputs", []))]
+            # 병렬 단계를 먼저 풀에 넣어 두고 메인 프로세스 단계를 실행
+            ready.sort(key=lambda s: not s.get("parallel", False))
+
+            for stage in ready:
+                pending.remove(stage)
+                name = stage["name"]
+                inputs = stage.get("inputs", [])
+                keys[name] = key = stage_key(stage, [hashes[d] for d in inputs])
+                path = _cache_path(stage, key)
+
+                files_ok = all(f.exists() for f in stage.get("files", []))
+                if stage.get("cache", True) and not force and files_ok and path.exists():
+                    try:
+                        (result, hashes[name]), record = measure(name, _load, (path,))
+                    except FileNotFoundError:
+                        # 동시에 실행 중인 다른 파이프라인이 방금 정리한 결과 → 다시 계산
+                        pass
+                    else:
+                        finish(stage, result, "cached", record)
+                        continue
+
+                if not stage.get("cache", True):
+                    hashes[name] = key
+
+                if stage.get("parallel") and max_workers > 1:
+                    if pool is None:
+                        pool = ProcessPoolExecutor(max_workers=max_workers)
+                        share_dir = tempfile.mkdtemp(prefix="mhvi_share_")
+                    shared_args = _share([results[d] for d in inputs], share_dir)
+                    running[pool.submit(_run_in_worker, name, stage["func"], shared_args)] = stage
+                    continue
+
+                result, record = measure(name, stage["func"], [results[d] for d in inputs])
+                finish(stage, result, "run", record)
+
+            if running and not any(
+                all(d in results for d in s.get("inputs", [])) for s in pending
+            ):
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    result, output, record = future.result()
+                    print(output, end="")
+                    finish(stage, result, "run ∥", record)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if share_dir is not None:
+            shutil.rmtree(share_dir, ignore_errors=True)
+
+    print("\n" + "=" * 60)
+    print("🧩 파이프라인 단계 요약 (∥ = 병렬 실행, wall / CPU 시간, 최대 RSS 증가량, 출력 행×열)")
+    print("=" * 60)
+    for r in log:
+        mark = "⏩" if r["status"] == "cached" else "▶"
+        rss = "-" if r["peak_rss_delta_mb"] is None else f"{r['peak_rss_delta_mb']:.1f}MB"
+        shape = "-" if r["rows_out"] is None else f"{r['rows_out']}×{r['cols_out']}"
+        print(
+            f"  {mark} {r['stage']:20s} {r['status']:6s} "
+            f"{r['wall_s']:7.2f}s {r['cpu_s']:7.2f}s {rss:>9s} {shape:>8s}"
+        )
+    print(f"  전체 {time.perf_counter() - pipeline_start:.2f}s")
+
+    if metrics_path is not None:
+        path = write_records(log, metrics_path)
+        print(f"  📁 단계별 계측: {path}")
+
+    return results
@@ -0,0 +1,280 @@
+"""
+policy_optimizer.py
+
+예산 제약 정책 배분 최적화 (자치구 × 정책 단위)
+
+역할 요약:
+- 정책 단위 = POLICY_SCENARIO 항목 1회 적용 (예: 건강증진센터 1개, 의료기관 5개)
+  단위 비용 = config.POLICY_UNIT_COST (억원)
+- 총 예산 안에서 어느 자치구에 어떤 단위를 몇 개 배분할지 정해
+    · objective="gap":          양수 Gap_Index 합계 (Need - Supply 중 공급 부족분)
+    · objective="inefficiency": 양수 Inefficiency 합계 (AI 기준선 대비 과도한 Need)
+  를 최소화한다.
+- 목적 함수가 자치구별 항의 합이므로, 배분을 하나 바꾸면 그 자치구 항만 다시 계산하면 된다.
+  → 후보 평가는 policy_simulation.score_supply(저장된 정규화 + 학습 모델 predict)를
+    바뀐 자치구 행에만 배치로 호출 (파이프라인 재실행 없음)
+
+탐색 방법:
+1) 탐욕(greedy): 자치구 × 단위 × 개수(1 ~ max_step) 후보 중
+   '감소량 / 비용'이 가장 큰 후보를 예산이 남는 동안 반복 선택
+   (RF 예측은 계단 함수라 1개로는 변화가 없고 2~3개부터 효과가 나는 경우가 있어 개수도 후보에 포함)
+2) 국소 탐색(local search): 배분된 단위 하나를 빼고 다른 자치구에 새 후보를 넣는 교환 중
+   목적 함수가 가장 많이 줄어드는 교환을 반복 → 남은 예산은 다시 탐욕으로 채움
+
+⚠️ 단위 효과는 선형 누적으로 가정 (pct 단위 k개 = 값 × (1 + k × pct))
+   실제 정책 효과가 아니라 AI 기준선 / 지수 기준의 가상 배분 실험
+
+사용 예:
+    python policy_optimizer.py --budget 1000 --objective inefficiency
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from config import OUTPUT_DIR, POLICY_SCENARIO, POLICY_UNIT_COST
+from policy_simulation import scenario_arrays, single_interventions, score_supply
+
+ALLOCATION_PATH = OUTPUT_DIR / "policy_budget_allocation.csv"
+ALLOCATION_DISTRICT_PATH = OUTPUT_DIR / "policy_budget_by_district.csv"
+
+OBJECTIVES = ("gap", "inefficiency")
+
+# 이보다 작은 감소량은 개선으로 보지 않음 (부동소수점 잡음)
+TOL = 1e-9
+
+
+# =====================================================
+# 1. 정책 단위 / 자치구별 손실
+# =====================================================
+def unit_arrays(scenario=POLICY_SCENARIO, costs=POLICY_UNIT_COST):
+    """정책 단위 이름, (단위 × SUPPLY_VARS) pct / add, (단위,) 비용"""
+    names, pct, add = scenario_arrays(single_interventions(scenario))
+    missing = [n for n in names if n not in costs]
+    if missing:
+        raise ValueError(f"[policy_optimizer] POLICY_UNIT_COST에 비용이 없는 단위: {missing}")
+    return names, pct, add, np.array([costs[n] for n in names], dtype=float)
+
+
+def _district_loss(sim, X, need, objective):
+    """공급 값 (… × SUPPLY_VARS) → 자치구별 손실 max(Need - 기준, 0)"""
+    supply, predicted = score_supply(sim, X, predict=objective == "inefficiency")
+    baseline = predicted if objective == "inefficiency" else supply
+    return np.maximum(need - baseline, 0.0)
+
+
+def _supply_values(X, A, pct, add):
+    """원본 값 X (… × 변수) + 배분 A (… × 단위) → 정책 후 공급 값 (선형 누적)"""
+    return X * (1.0 + A @ pct) + A @ add
+
+
+# =====================================================
+# 2. 후보 평가 (바뀐 자치구 행만)
+# =====================================================
+def _refresh(ctx, rows):
+    """
+    rows 자치구의 후보표 갱신 (배분이 바뀐 자치구만)
+
+    - gain[i, u, s]:  단위 u를 steps[s]개 더 넣을 때의 손실 감소량
+    - penalty[i, u]:  단위 u를 1개 뺄 때의 손실 증가량 (배분이 없는 칸은 NaN)
+    넣기 (행 × 단위 × max_step) + 빼기 (행 × 단위) 후보를 한 번의 score_supply로 평가
+    """
+    rows = np.unique(rows)
+    A, steps, eye = ctx["A"], ctx["steps"], ctx["eye"]
+    n_rows, n_units, n_steps = len(rows), len(eye), len(steps)
+
+    A_add = A[rows][:, None, None, :] + steps[None, None, :, None] * eye[None, :, None, :]
+    A_remove = np.maximum(A[rows][:, None, :] - eye[None, :, :], 0)
+    A_cand = np.concatenate([
+        A_add.reshape(n_rows, n_units * n_steps, n_units), A_remove
+    ], axis=1)
+
+    X_cand = _supply_values(ctx["X"][rows][:, None, :], A_cand, ctx["pct"], ctx["add"])
+    loss = _district_loss(ctx["sim"], X_cand, ctx["need"][rows][:, None], ctx["objective"])
+    delta = loss - ctx["loss"][rows][:, None]
+
+    ctx["gain"][rows] = -delta[:, :n_units * n_steps].reshape(n_rows, n_units, n_steps)
+    ctx["penalty"][rows] = np.where(A[rows] > 0, delta[:, n_units * n_steps:], np.nan)
+
+
+def _allocate(ctx, i, u, k, loss_change):
+    """
+    자치구 i에 단위 u를 k개(음수면 회수) 배분하고 손실 / 예산 갱신
+
+    loss_change는 후보표(gain / penalty)에 이미 계산된 값 → 다시 예측하지 않음
+    """
+    ctx["A"][i, u] += k
+    ctx["loss"][i] += loss_change
+    ctx["remaining"] -= k * ctx["cost"][u]
+
+
+# =====================================================
+# 3. 탐욕 / 국소 탐색
+# =====================================================
+def _greedy(ctx):
+    """감소량 / 비용이 가장 큰 후보를 예산이 남는 동안 반복 선택"""
+    step_cost = ctx["cost"][:, None] * ctx["steps"][None, :]      # (단위 × k)
+    while True:
+        feasible = (step_cost <= ctx["remaining"] + TOL)[None, :, :] & (ctx["gain"] > TOL)
+        if not feasible.any():
+            return
+        ratio = np.where(feasible, ctx["gain"] / step_cost[None, :, :], -np.inf)
+        i, u, s = np.unravel_index(np.argmax(ratio), ratio.shape)
+        _allocate(ctx, i, u, int(ctx["steps"][s]), -ctx["gain"][i, u, s])
+        _refresh(ctx, [i])
+
+
+def _best_swap(ctx):
+    """
+    배분된 단위 하나(i, u)를 빼고 다른 자치구 j에 후보(u2, k)를 넣는 교환 중 최선
+
+    교환 효과 = 넣는 쪽 감소량 - 빼는 쪽 증가량 (서로 다른 자치구 → 두 항이 독립)
+    반환: (효과, i, u, j, u2, steps 번호) 또는 None
+    """
+    step_cost = ctx["cost"][:, None] * ctx["steps"][None, :]
+    best = None
+    for i, u in zip(*np.nonzero(ctx["A"])):
+        budget = ctx["remaining"] + ctx["cost"][u]
+        gain = np.where((step_cost <= budget + TOL)[None, :, :], ctx["gain"], -np.inf)
+        gain[i] = -np.inf
+        j, u2, s = np.unravel_index(np.argmax(gain), gain.shape)
+        effect = gain[j, u2, s] - ctx["penalty"][i, u]
+        if effect > TOL and (best is None or effect > best[0]):
+            best = (effect, i, u, j, u2, s)
+    return best
+
+
+def _local_search(ctx, max_iter):
+    for _ in range(max_iter):
+        swap = _best_swap(ctx)
+        if swap is None:
+            return
+        _, i, u, j, u2, s = swap
+        _allocate(ctx, i, u, -1, ctx["penalty"][i, u])
+        _allocate(ctx, j, u2, int(ctx["steps"][s]), -ctx["gain"][j, u2, s])
+        _refresh(ctx, [i, j])
+        # 교환으로 남은 예산이 생겼으면 다시 채움
+        _greedy(ctx)
+
+
+def optimize_budget(
+    sim,
+    budget,
+    objective="inefficiency",
+    costs=POLICY_UNIT_COST,
+    scenario=POLICY_SCENARIO,
+    max_step=3,
+    local_search=True,
+    max_iter=200,
+):
+    """
+    예산 제약 배분 최적화
+
+    입력:
+    - sim: policy_simulation.build_simulator 상태 (정규화 파라미터 + 학습 모델)
+    - budget: 총 예산 (POLICY_UNIT_COST와 같은 단위)
+    - objective: "gap" | "inefficiency"
+    - max_step: 한 번에 넣어 보는 같은 단위의 최대 개수
+    - local_search: 탐욕 결과에 교환 국소 탐색 적용 여부
+
+    반환 dict:
+    - allocation: district, unit, units, cost (배분된 칸만)
+    - districts:  district, Loss_Before, Loss_After, Cost
+    - objective_before / objective_after / spent
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"[policy_optimizer] unknown objective: {objective} (choose from {OBJECTIVES})")
+
+    names, pct, add, cost = unit_arrays(scenario, costs)
+    n, n_units = len(sim["districts"]), len(names)
+
+    ctx = {
+        "sim": sim,
+        "objective": objective,
+        "X": sim["X"],
+        "need": sim["need"],
+        "pct": pct,
+        "add": add,
+        "cost": cost,
+        "eye": np.eye(n_units),
+        "steps": np.arange(1, max_step + 1, dtype=float),
+        "A": np.zeros((n, n_units)),
+        "remaining": float(budget),
+    }
+    ctx["loss"] = _district_loss(sim, sim["X"], sim["need"], objective)
+    loss_before = ctx["loss"].copy()
+
+    # 전체 자치구 후보는 처음 한 번만 배치로 평가, 이후에는 배분이 바뀐 자치구만
+    ctx["gain"] = np.zeros((n, n_units, max_step))
+    ctx["penalty"] = np.full((n, n_units), np.nan)
+    _refresh(ctx, np.arange(n))
+
+    _greedy(ctx)
+    if local_search:
+        _local_search(ctx, max_iter)
+
+    A = ctx["A"].astype(int)
+    i, u = np.nonzero(A)
+    allocation = pd.DataFrame({
+        "district": np.asarray(sim["districts"])[i],
+        "unit": np.asarray(names)[u],
+        "units": A[i, u],
+        "cost": A[i, u] * cost[u],
+    })
+    districts = pd.DataFrame({
+        "district": sim["districts"],
+        "Loss_Before": loss_before,
+        "Loss_After": ctx["loss"],
+        "Cost": A @ cost,
+    })
+
+    return {
+        "allocation": allocation,
+        "districts": districts,
+        "objective_before": float(loss_before.sum()),
+        "objective_after": float(ctx["loss"].sum()),
+        "spent": float(budget - ctx["remaining"]),
+    }
+
+
+# =====================================================
+# 실행 진입점
+# =====================================================
+def main():
+    import time
+    from ai_diagnosis import load_blindspot_model
+    from policy_simulation import build_simulator
+    from table_store import load_district_table
+
+    parser = argparse.ArgumentParser(description="예산 제약 정책 배분 최적화")
+    parser.add_argument("--budget", type=float, default=1_000, help="총 예산 (억원)")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="inefficiency")
+    parser.add_argument("--max-step", type=int, default=3, help="한 번에 넣어 보는 같은 단위 최대 개수")
+    parser.add_argument("--no-local-search", action="store_true", help="탐욕 배분만 사용")
+    args = parser.parse_args()
+
+    df = load_district_table("merged")
+    df_final = pd.read_csv(OUTPUT_DIR / "mhvi_final_result.csv", encoding="utf-8-sig")
+    model = load_blindspot_model()
+    sim = build_simulator(df, df_final, model)
+
+    start = time.perf_counter()
+    result = optimize_budget(
+        sim, args.budget, args.objective,
+        max_step=args.max_step, local_search=not args.no_local_search,
+    )
+    elapsed = time.perf_counter() - start
+
+    result["allocation"].to_csv(ALLOCATION_PATH, index=False, encoding="utf-8-sig")
+    result["districts"].to_csv(ALLOCATION_DISTRICT_PATH, index=False, encoding="utf-8-sig")
+
+    print(f"\n💰 예산 {args.budget:,.0f}억원 배분 ({args.objective}, {elapsed:.2f}초)")
+    print(f"  목적 함수: {result['objective_before']:.2f} → {result['objective_after']:.2f}"
+          f"  (사용 {result['spent']:,.0f}억원)")
+    print(result["allocation"].to_string(index=False))
+    print(f"📁 저장 위치: {ALLOCATION_PATH}")
+    print(f"📁 저장 위치: {ALLOCATION_DISTRICT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
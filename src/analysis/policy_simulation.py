@@ -0,0 +1,231 @@
+"""
+policy_simulation.py
+
+정책 시나리오 시뮬레이터 (config.POLICY_SCENARIO 실행)
+
+역할 요약:
+- POLICY_SCENARIO 형식({변수: ("pct" | "add", 변화량)})의 가상 정책을
+  모든 자치구에 한 번에 적용한다.
+    · "pct": 값 × (1 + 변화량)
+    · "add": 값 + 변화량
+- 시나리오 여러 개를 (시나리오 × 자치구 × 공급 변수) 배열 하나로 만들고
+    · Supply_Index: 원래 파이프라인이 저장한 정규화 파라미터(normalizers/supply.json)로 다시 계산
+      (시나리오 값으로 다시 fit하지 않음 → 다른 자치구 점수가 같이 움직이지 않음)
+    · Predicted_Need_by_Supply: ai_diagnosis에서 학습한 모델로 predict 한 번에 재평가
+    · Inefficiency = Need_Index - Predicted_Need_by_Supply
+  를 계산한다. (공급 정책이므로 Need_Index는 그대로)
+- 4사분면은 현재 중앙값 기준선을 그대로 써서 '정책 후 위치'를 표시한다.
+
+→ 대시보드에서 시나리오 수십 개를 전체 자치구에 대해 바로 비교하기 위한 엔진
+  (policy_optimizer / counterfactual도 같은 상태 dict와 score_supply를 사용)
+
+⚠️ 실제 정책 효과가 아니라, AI 기준선(공급 → 기대 Need)이 어떻게 움직이는지 보는 가상 실험
+
+사용 예:
+    sim = build_simulator(df, df_final, model)
+    df_sim = simulate(sim, {"기본안": POLICY_SCENARIO, **single_interventions(POLICY_SCENARIO)})
+"""
+import numpy as np
+import pandas as pd
+
+from config import SUPPLY_VARS, WEIGHTS_SUPPLY, OUTPUT_DIR, POLICY_SCENARIO
+from index_calculator import classify_quadrants
+from normalization import load_normalizer, transform_arrays
+
+SCENARIO_PATH = OUTPUT_DIR / "policy_scenario_simulation.csv"
+SCENARIO_SUMMARY_PATH = OUTPUT_DIR / "policy_scenario_summary.csv"
+
+MODES = ("pct", "add")
+
+
+# =====================================================
+# 1. 시나리오 → 배열
+# =====================================================
+def scenario_arrays(scenarios, variables=SUPPLY_VARS):
+    """
+    {시나리오 이름: POLICY_SCENARIO 형식 dict} → (이름 목록, pct, add)
+
+    - pct, add: (시나리오 × 변수) 배열, 새 값 = 값 × (1 + pct) + add
+    - 한 시나리오 안에서 변수마다 방식은 하나 (POLICY_SCENARIO와 같은 형식)
+    """
+    names = list(scenarios)
+    pct = np.zeros((len(names), len(variables)))
+    add = np.zeros((len(names), len(variables)))
+
+    for s, name in enumerate(names):
+        for var, (mode, amount) in scenarios[name].items():
+            if var not in variables:
+                raise ValueError(f"[policy_simulation] {name}: 공급 변수가 아님: {var}")
+            if mode not in MODES:
+                raise ValueError(f"[policy_simulation] {name}: unknown mode {mode} (choose from {MODES})")
+            target = pct if mode == "pct" else add
+            target[s, variables.index(var)] = amount
+
+    return names, pct, add
+
+
+def single_interventions(scenario=POLICY_SCENARIO):
+    """시나리오의 항목을 하나씩 떼어 낸 시나리오 묶음 ({변수: {변수: (방식, 변화량)}})"""
+    return {var: {var: spec} for var, spec in scenario.items()}
+
+
+def apply_scenarios(X, pct, add):
+    """(자치구 × 변수) 원본 값 + (시나리오 × 변수) 변화 → (시나리오 × 자치구 × 변수)"""
+    return X[None, :, :] * (1.0 + pct[:, None, :]) + add[:, None, :]
+
+
+# =====================================================
+# 2. 시뮬레이터 상태
+# =====================================================
+def build_simulator(df, df_final, model, normalizer=None):
+    """
+    시나리오 평가에 필요한 값을 한 번만 준비한 상태 dict
+
+    입력:
+    - df: district + SUPPLY_VARS (원본 값, load_district_table("merged"))
+    - df_final: district + Need_Index + Supply_Index (mhvi_final_result.csv)
+    - model: 파이프라인이 저장한 사각지대 모델 (ai_diagnosis.load_blindspot_model)
+    - normalizer: 공급 변수 정규화 파라미터 (None이면 저장된 normalizers/supply.json)
+
+    상태 구성:
+    - districts, X (자치구 × SUPPLY_VARS), need
+    - base_supply / base_predicted: 현재 값 기준 Supply_Index / 기대 Need
+      (score_supply로 다시 계산 → 시나리오 결과와 같은 계산 경로의 차이만 남음)
+    - median_need / median_supply: 현재 4사분면 기준선
+    """
+    normalizer = normalizer or load_normalizer("supply")
+    df_final = df_final.set_index("district")
+    districts = df["district"].tolist()
+
+    sim = {
+        "districts": districts,
+        "X": df[SUPPLY_VARS].to_numpy(dtype=float),
+        "need": df_final.loc[districts, "Need_Index"].to_numpy(dtype=float),
+        "model": model,
+        "normalizer": normalizer,
+        # 정규화기 변수 순서 → SUPPLY_VARS 열 번호 / 가중치
+        "cols": [SUPPLY_VARS.index(v) for v in normalizer["variables"]],
+        "weights": np.array([WEIGHTS_SUPPLY[f"{v}_norm"] for v in normalizer["variables"]]),
+        "median_need": float(df_final["Need_Index"].median()),
+        "median_supply": float(df_final["Supply_Index"].median()),
+    }
+    sim["base_supply"], sim["base_predicted"] = score_supply(sim, sim["X"])
+    return sim
+
+
+def score_supply(sim, X_new, predict=True):
+    """
+    (… × 자치구 × SUPPLY_VARS) 공급 값 → (Supply_Index, Predicted_Need_by_Supply)
+
+    - 저장된 정규화 파라미터로 변환 후 가중합
+    - 모델 예측은 모든 행을 한 번의 predict로 (트리 순회가 배치 단위로 병렬화됨)
+    - predict=False면 예측을 건너뛰고 (Supply_Index, None)
+    """
+    normalizer = sim["normalizer"]
+    X_norm = X_new[..., sim["cols"]]
+    norm = transform_arrays(X_norm, normalizer["method"], normalizer["stats"], normalizer["directions"])
+    supply = norm @ sim["weights"]
+    if not predict:
+        return supply, None
+
+    flat = pd.DataFrame(X_new.reshape(-1, len(SUPPLY_VARS)), columns=SUPPLY_VARS)
+    predicted = sim["model"].predict(flat).reshape(X_new.shape[:-1])
+    return supply, predicted
+
+
+# =====================================================
+# 3. 시나리오 평가
+# =====================================================
+def simulate(sim, scenarios):
+    """
+    시나리오 묶음 전체를 모든 자치구에 적용한 결과 (long 형식)
+
+    컬럼:
+    scenario, district, Need_Index, Supply_Index, Supply_Delta,
+    Predicted_Need_by_Supply, Inefficiency, Inefficiency_Delta, Gap_Index,
+    Quadrant_Before, Quadrant
+    """
+    names, pct, add = scenario_arrays(scenarios)
+    supply, predicted = score_supply(sim, apply_scenarios(sim["X"], pct, add))
+
+    n_scen, n_dist = supply.shape
+    need = np.broadcast_to(sim["need"], supply.shape)
+    inefficiency = need - predicted
+    base_inefficiency = sim["need"] - sim["base_predicted"]
+
+    quad_before = classify_quadrants(
+        sim["need"], sim["base_supply"], sim["median_need"], sim["median_supply"]
+    )
+    quad_after = classify_quadrants(need, supply, sim["median_need"], sim["median_supply"])
+
+    return pd.DataFrame({
+        "scenario": np.repeat(names, n_dist),
+        "district": np.tile(sim["districts"], n_scen),
+        "Need_Index": need.ravel(),
+        "Supply_Index": supply.ravel(),
+        "Supply_Delta": (supply - sim["base_supply"]).ravel(),
+        "Predicted_Need_by_Supply": predicted.ravel(),
+        "Inefficiency": inefficiency.ravel(),
+        "Inefficiency_Delta": (inefficiency - base_inefficiency).ravel(),
+        "Gap_Index": (need - supply).ravel(),
+        "Quadrant_Before": np.tile(quad_before, n_scen),
+        "Quadrant": quad_after.ravel(),
+    })
+
+
+def summarize_scenarios(df_sim):
+    """
+    시나리오별 요약
+
+    - mean_supply_delta: 평균 Supply_Index 변화
+    - positive_gap / positive_inefficiency: 양수 Gap / Inefficiency 합계 (작을수록 좋음)
+    - n_blindspots: Inefficiency > 0 자치구 수
+    - n_quadrant_changed: 4사분면이 바뀐 자치구 수
+    """
+    g = df_sim.assign(
+        positive_gap=df_sim["Gap_Index"].clip(lower=0),
+        positive_inefficiency=df_sim["Inefficiency"].clip(lower=0),
+        blindspot=df_sim["Inefficiency"] > 0,
+        quadrant_changed=df_sim["Quadrant"] != df_sim["Quadrant_Before"],
+    ).groupby("scenario", sort=False)
+
+    return pd.DataFrame({
+        "mean_supply_delta": g["Supply_Delta"].mean(),
+        "positive_gap": g["positive_gap"].sum(),
+        "positive_inefficiency": g["positive_inefficiency"].sum(),
+        "n_blindspots": g["blindspot"].sum(),
+        "n_quadrant_changed": g["quadrant_changed"].sum(),
+    }).reset_index()
+
+
+# =====================================================
+# 실행 진입점
+# =====================================================
+def main():
+    import time
+    from ai_diagnosis import load_blindspot_model
+    from table_store import load_district_table
+
+    df = load_district_table("merged")
+    df_final = pd.read_csv(OUTPUT_DIR / "mhvi_final_result.csv", encoding="utf-8-sig")
+    model = load_blindspot_model()
+
+    scenarios = {"POLICY_SCENARIO": POLICY_SCENARIO, **single_interventions(POLICY_SCENARIO)}
+
+    start = time.perf_counter()
+    sim = build_simulator(df, df_final, model)
+    df_sim = simulate(sim, scenarios)
+    elapsed = time.perf_counter() - start
+
+    df_summary = summarize_scenarios(df_sim)
+    df_sim.to_csv(SCENARIO_PATH, index=False, encoding="utf-8-sig")
+    df_summary.to_csv(SCENARIO_SUMMARY_PATH, index=False, encoding="utf-8-sig")
+
+    print(f"\n🧪 정책 시나리오 {len(scenarios)}개 × 자치구 {len(sim['districts'])}곳 ({elapsed:.2f}초)")
+    print(df_summary.to_string(index=False))
+    print(f"📁 저장 위치: {SCENARIO_PATH}")
+    print(f"📁 저장 위치: {SCENARIO_SUMMARY_PATH}")
+
+
+if __name__ == "__main__":
+    main()
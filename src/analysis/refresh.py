@@ -0,0 +1,201 @@
+"""
+refresh.py
+
+원본 데이터 증분 갱신 (파일 매니페스트 기반)
+
+역할 요약:
+- data/raw/, data/infra/ 아래 모든 파일의 (수정시각, 크기, SHA-256)을
+  매니페스트(CACHE_DIR/raw_manifest.json)로 기록
+- 다음 갱신 때는 매니페스트와 비교해 '내용이 바뀐 파일'만 골라내고,
+  그 파일에서 나오는 변수 컬럼만 need_tidy / supply_tidy에 다시 채운다.
+- 수정시각과 크기가 그대로인 파일은 해시도 다시 계산하지 않는다.
+
+→ 매월 지표 한두 개(예: suicide_rate.csv)만 새로 들어올 때
+  20개 파일 전체를 다시 수집하지 않기 위한 단계
+"""
+import argparse
+import hashlib
+import json
+
+import pandas as pd
+
+from config import BASE_DIR, RAW_DIR, INFRA_DIR, DATA_DIR, CACHE_DIR
+from ingest import (
+    NEED_SOURCES,
+    SUPPLY_SOURCES,
+    build_need_tidy,
+    build_supply_tidy,
+    patch_tidy,
+    write_tidy,
+)
+
+MANIFEST_PATH = CACHE_DIR / "raw_manifest.json"
+WATCH_DIRS = [RAW_DIR, INFRA_DIR]
+
+NEED_PATH = DATA_DIR / "need_tidy.csv"
+SUPPLY_PATH = DATA_DIR / "supply_tidy.csv"
+
+
+# =====================================================
+# 1. 매니페스트
+# =====================================================
+def _sha256(path):
+    """파일 내용 해시 (큰 파일도 1MB 단위로 나눠 읽음)"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def scan_manifest(previous=None):
+    """
+    감시 디렉토리의 현재 상태를 매니페스트 dict로 만든다.
+
+    key   : 프로젝트 루트 기준 상대 경로 (예: data/raw/need/suicide_rate.csv)
+    value : {"mtime", "size", "sha256"}
+
+    previous에 같은 파일이 있고 mtime/size가 같으면 해시 계산을 생략한다.
+    """
+    previous = previous or {}
+    manifest = {}
+
+    for root in WATCH_DIRS:
+        for path in sorted(root.rglob("*")):
+            if not path.is_file():
+                continue
+
+            rel = path.relative_to(BASE_DIR).as_posix()
+            stat = path.stat()
+            old = previous.get(rel)
+
+            if old and old["mtime"] == stat.st_mtime and old["size"] == stat.st_size:
+                manifest[rel] = old
+            else:
+                manifest[rel] = {
+                    "mtime": stat.st_mtime,
+                    "size": stat.st_size,
+                    "sha256": _sha256(path),
+                }
+
+    return manifest
+
+
+def load_manifest():
+    """저장된 매니페스트 (없으면 None → 전체 수집 필요)"""
+    if not MANIFEST_PATH.exists():
+        return None
+    return json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+
+
+def save_manifest(manifest):
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    MANIFEST_PATH.write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=1),
+        encoding="utf-8",
+    )
+
+
+def changed_files(previous, current):
+    """추가 / 삭제 / 내용 변경된 파일 목록 (상대 경로)"""
+    return sorted(
+        rel for rel in set(previous) | set(current)
+        if previous.get(rel, {}).get("sha256") != current.get(rel, {}).get("sha256")
+    )
+
+
+# =====================================================
+# 2. 파일 → 영향받는 변수
+# =====================================================
+def affected_variables(files, sources):
+    """바뀐 파일 목록에서 sources 명세가 참조하는 변수만 골라낸다."""
+    raw_prefix = RAW_DIR.relative_to(BASE_DIR).as_posix()
+    files = set(files)
+    return [
+        var for var, spec in sources.items()
+        if f"{raw_prefix}/{spec['path']}" in files
+    ]
+
+
+# =====================================================
+# 3. 증분 갱신
+# =====================================================
+def refresh(full=False):
+    """
+    바뀐 원본 파일만 다시 읽어 tidy 테이블의 해당 컬럼을 갱신한다.
+
+    - 매니페스트나 tidy 파일이 없거나 full=True면 전체 수집
+    - tidy 테이블이 실제로 바뀐 경우에만 CSV를 다시 쓴다
+      (table_store 캐시는 CSV 내용 해시로 자동 무효화)
+
+    반환:
+      {"files": 바뀐 파일, "need": 갱신된 Need 변수, "supply": 갱신된 Supply 변수}
+    """
+    previous = load_manifest()
+    current = scan_manifest(previous)
+
+    if full or previous is None or not (NEED_PATH.exists() and SUPPLY_PATH.exists()):
+        print("🔄 전체 수집 (매니페스트 없음 또는 --full)")
+        df_need = build_need_tidy()
+        df_supply = build_supply_tidy(df_need["district"].tolist())
+        write_tidy(df_need, NEED_PATH, NEED_SOURCES)
+        write_tidy(df_supply, SUPPLY_PATH, SUPPLY_SOURCES)
+        save_manifest(current)
+        return {
+            "files": sorted(current),
+            "need": list(NEED_SOURCES),
+            "supply": list(SUPPLY_SOURCES),
+        }
+
+    files = changed_files(previous, current)
+    need_vars = affected_variables(files, NEED_SOURCES)
+    supply_vars = affected_variables(files, SUPPLY_SOURCES)
+
+    print(f"🔍 변경된 파일 {len(files)}개")
+    for rel in files:
+        print(f"  - {rel}")
+
+    for path, sources, variables in [
+        (NEED_PATH, NEED_SOURCES, need_vars),
+        (SUPPLY_PATH, SUPPLY_SOURCES, supply_vars),
+    ]:
+        if not variables:
+            continue
+        df_old = pd.read_csv(path)
+        df_new = patch_tidy(df_old, sources, variables)
+        if not df_new.equals(df_old):
+            write_tidy(df_new, path, sources)
+        print(f"  ✅ {path.name}: {variables} 갱신")
+
+    unused = [
+        rel for rel in files
+        if not affected_variables([rel], NEED_SOURCES)
+        and not affected_variables([rel], SUPPLY_SOURCES)
+    ]
+    if unused:
+        print(f"  ℹ️ tidy 테이블과 무관한 파일 (컬럼 갱신 없음): {unused}")
+
+    # 갱신이 끝난 뒤에만 매니페스트 저장 → 중간 실패 시 다음 실행에서 재시도
+    save_manifest(current)
+
+    return {"files": files, "need": need_vars, "supply": supply_vars}
+
+
+# =====================================================
+# 실행 진입점
+# =====================================================
+def main():
+    parser = argparse.ArgumentParser(description="원본 데이터 증분 갱신")
+    parser.add_argument("--full", action="store_true", help="모든 원본 파일 재수집")
+    args = parser.parse_args()
+
+    result = refresh(full=args.full)
+
+    if not result["need"] and not result["supply"]:
+        print("✅ 변경된 지표 없음 (tidy 테이블 유지)")
+    else:
+        print("✅ 원본 데이터 갱신 완료")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+spatial_adjacency.py
+
+자치구 경계(GeoJSON) 기반 공간 인접 행렬
+
+역할 요약:
+- data/raw/seoul_municipalities.geojson의 폴리곤에서
+    · queen 인접: 경계 꼭짓점을 하나라도 공유
+    · rook 인접:  경계 선분(변)을 하나라도 공유
+    · 거리 기준(distance band): 중심점 사이 거리가 band_km 이하
+  를 희소 행렬(scipy.sparse CSR, 0/1)로 만든다.
+- 모든 쌍을 비교하면 폴리곤 수의 제곱만큼 걸리므로
+  경계 상자(bounding box)를 x축으로 정렬해 겹칠 수 있는 쌍만 후보로 고른 뒤
+  후보 쌍만 꼭짓점 / 거리 비교 (전국 3,500개 읍면동 규모 대응)
+- 결과는 CACHE_DIR/adjacency/에 저장하고,
+  경계 좌표 해시(geometry hash)와 설정이 같으면 다시 계산하지 않는다.
+
+→ 공간 시차(이웃 평균) 지수, 이웃 비교, 공간 자기상관 분석의 공용 입력
+
+사용 예:
+    adj = load_adjacency()
+    W = align_weights(adj, df["district"], kind="queen")
+    lag = spatial_lag(row_standardize(W), df["Need_Index"].to_numpy())
+"""
+import hashlib
+import json
+
+import numpy as np
+import scipy.sparse as sp
+
+from config import RAW_DIR, CACHE_DIR
+
+GEOJSON_PATH = RAW_DIR / "seoul_municipalities.geojson"
+ADJACENCY_DIR = CACHE_DIR / "adjacency"
+
+# 꼭짓점 비교 허용 오차 (경위도, 약 1cm) → 좌표를 이 단위로 맞춘 뒤 같은 점으로 본다
+SNAP = 1e-7
+
+# 거리 기준 이웃의 기본 반경 (km, 중심점 사이 거리)
+DISTANCE_BAND_KM = 7.0
+
+KINDS = ["queen", "rook", "distance"]
+
+
+# =====================================================
+# 1. 폴리곤 읽기
+# =====================================================
+def read_polygons(path=GEOJSON_PATH, id_key="SIG_CD", name_key="SIG_KOR_NM"):
+    """
+    GeoJSON → {"ids", "names", "rings", "exterior"}
+
+    - rings: 지역별 링 목록 (Polygon / MultiPolygon의 외곽 + 구멍 링, 각 (꼭짓점 수 × 2) 배열)
+    - exterior: rings와 같은 모양의 외곽 링 여부 (각 폴리곤의 첫 링 = 외곽)
+    """
+    with open(path, encoding="utf-8") as f:
+        features = json.load(f)["features"]
+
+    ids, names, rings, exterior = [], [], [], []
+    for feature in features:
+        geom = feature["geometry"]
+        if geom["type"] == "Polygon":
+            parts = [geom["coordinates"]]
+        elif geom["type"] == "MultiPolygon":
+            parts = geom["coordinates"]
+        else:
+            raise ValueError(f"[spatial_adjacency] unsupported geometry: {geom['type']}")
+
+        ids.append(str(feature["properties"][id_key]))
+        names.append(feature["properties"][name_key])
+        rings.append([np.asarray(ring, dtype=float)[:, :2] for part in parts for ring in part])
+        exterior.append([k == 0 for part in parts for k in range(len(part))])
+
+    return {"ids": ids, "names": names, "rings": rings, "exterior": exterior}
+
+
+def geometry_hash(polys):
+    """지역 코드 + 경계 좌표의 내용 해시 (속성값이 바뀌어도 경계가 같으면 같은 값)"""
+    h = hashlib.sha256()
+    for region_id, rings in zip(polys["ids"], polys["rings"]):
+        h.update(region_id.encode("utf-8"))
+        for ring in rings:
+            h.update(np.ascontiguousarray(ring).tobytes())
+    return h.hexdigest()[:16]
+
+
+# =====================================================
+# 2. 경계 상자 공간 인덱스
+# =====================================================
+def bbox_candidate_pairs(bounds, pad=0.0):
+    """
+    경계 상자가 겹치는 (i, j) 쌍 (i < j)
+
+    - bounds: (지역 수 × 4) [minx, miny, maxx, maxy]
+    - pad: 상자를 사방으로 넓히는 폭 (허용 오차 / 거리 반경)
+
+    방법 (sort-and-sweep):
+    - minx 기준으로 정렬하면 i와 x축이 겹칠 수 있는 상자는
+      정렬 순서상 i 뒤쪽의 'minx ≤ i의 maxx'인 구간뿐이다. (searchsorted로 한 번에 탐색)
+    - 그 구간 안에서만 y축 겹침을 배열 연산으로 확인
+    """
+    lo = bounds[:, :2] - pad
+    hi = bounds[:, 2:] + pad
+
+    order = np.argsort(lo[:, 0], kind="stable")
+    lo, hi = lo[order], hi[order]
+    ends = np.searchsorted(lo[:, 0], hi[:, 0], side="right")
+
+    pairs = []
+    for a in range(len(order)):
+        b = np.arange(a + 1, ends[a])
+        if len(b) == 0:
+            continue
+        overlap = (lo[b, 1] <= hi[a, 1]) & (hi[b, 1] >= lo[a, 1])
+        b = b[overlap]
+        pairs.append(np.column_stack([np.full(len(b), order[a]), order[b]]))
+
+    if not pairs:
+        return np.empty((0, 2), dtype=int)
+    pairs = np.sort(np.concatenate(pairs), axis=1)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+def _bounds(rings):
+    return np.array([
+        np.concatenate([r.min(axis=0), r.max(axis=0)])
+        for r in (np.concatenate(region) for region in rings)
+    ])
+
+
+# =====================================================
+# 3. 인접 판정
+# =====================================================
+def _vertex_codes(rings, origin, snap):
+    """링 꼭짓점 → 허용 오차 단위 정수 좌표 코드 (링별 배열)"""
+    codes = []
+    for ring in rings:
+        q = np.rint((ring - origin) / snap).astype(np.int64)
+        codes.append(q[:, 0] << 32 | q[:, 1])
+    return codes
+
+
+def _edges(codes):
+    """링 코드 → 방향 없는 선분 집합"""
+    edges = set()
+    for c in codes:
+        a, b = c[:-1], c[1:]
+        edges.update(zip(np.minimum(a, b).tolist(), np.maximum(a, b).tolist()))
+    return edges
+
+
+def contiguity(polys, snap=SNAP):
+    """
+    queen / rook 인접 행렬 (CSR, 대칭, 대각 0)
+
+    - 후보 쌍: 허용 오차만큼 넓힌 경계 상자가 겹치는 쌍
+    - queen: 꼭짓점 코드 교집합이 있으면 인접
+    - rook:  queen 쌍 중 선분(연속한 두 꼭짓점)을 공유하면 인접
+    """
+    rings = polys["rings"]
+    n = len(rings)
+    origin = np.min([r.min(axis=0) for region in rings for r in region], axis=0)
+
+    span = np.max([r.max(axis=0) for region in rings for r in region], axis=0) - origin
+    if np.any(span / snap >= 2 ** 31):
+        raise ValueError("[spatial_adjacency] extent too large for snap tolerance")
+
+    codes = [_vertex_codes(region, origin, snap) for region in rings]
+    vertices = [np.unique(np.concatenate(c)) for c in codes]
+    edges = {}
+
+    queen, rook = [], []
+    for i, j in bbox_candidate_pairs(_bounds(rings), pad=snap):
+        if len(np.intersect1d(vertices[i], vertices[j], assume_unique=True)) == 0:
+            continue
+        queen.append((i, j))
+
+        for k in (i, j):
+            if k not in edges:
+                edges[k] = _edges(codes[k])
+        if not edges[i].isdisjoint(edges[j]):
+            rook.append((i, j))
+
+    return _symmetric(queen, n), _symmetric(rook, n)
+
+
+def _symmetric(pairs, n):
+    pairs = np.asarray(pairs, dtype=int).reshape(-1, 2)
+    rows = np.concatenate([pairs[:, 0], pairs[:, 1]])
+    cols = np.concatenate([pairs[:, 1], pairs[:, 0]])
+    return sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+
+
+def centroids_km(polys):
+    """
+    지역별 면적 가중 중심점 (km 좌표)
+
+    - 경위도를 전체 평균 위도 기준 등장방형(equirectangular) 투영으로 km 변환
+      (시 · 도 규모에서는 거리 오차가 무시할 만큼 작음)
+    - 링별 신발끈 공식 중심점을 면적으로 가중 평균 (구멍 링은 면적을 뺀다)
+    """
+    rings = polys["rings"]
+    lat0 = np.deg2rad(np.mean([r[:, 1].mean() for region in rings for r in region]))
+    scale = np.array([111.320 * np.cos(lat0), 110.574])
+
+    centers = np.empty((len(rings), 2))
+    for k, (region, exterior) in enumerate(zip(rings, polys["exterior"])):
+        total, moment = 0.0, np.zeros(2)
+        for ring, is_exterior in zip(region, exterior):
+            xy = ring * scale
+            x, y = xy[:, 0], xy[:, 1]
+            cross = x[:-1] * y[1:] - x[1:] * y[:-1]
+            signed = cross.sum() / 2
+            if signed == 0:
+                continue
+            # 중심점은 링 방향과 무관 (cross와 signed의 부호가 함께 바뀜)
+            c = np.array([((x[:-1] + x[1:]) * cross).sum(), ((y[:-1] + y[1:]) * cross).sum()]) / (6 * signed)
+            area = abs(signed) if is_exterior else -abs(signed)
+            total += area
+            moment += area * c
+        centers[k] = moment / total if total else np.concatenate(region).mean(axis=0) * scale
+    return centers
+
+
+def distance_band(centers, band_km=DISTANCE_BAND_KM):
+    """중심점 사이 거리 ≤ band_km인 이웃 행렬 (CSR, 0/1) — 후보 쌍은 같은 경계 상자 인덱스 사용"""
+    bounds = np.hstack([centers, centers])
+    pairs = bbox_candidate_pairs(bounds, pad=band_km / 2)
+    d = np.linalg.norm(centers[pairs[:, 0]] - centers[pairs[:, 1]], axis=1)
+    return _symmetric(pairs[d <= band_km], len(centers))
+
+
+# =====================================================
+# 4. 생성 + 캐시
+# =====================================================
+def build_adjacency(polys, snap=SNAP, band_km=DISTANCE_BAND_KM):
+    """폴리곤 → {"ids", "names", "centroids", "queen", "rook", "distance"}"""
+    queen, rook = contiguity(polys, snap)
+    centers = centroids_km(polys)
+    return {
+        "ids": polys["ids"],
+        "names": polys["names"],
+        "centroids": centers,
+        "queen": queen,
+        "rook": rook,
+        "distance": distance_band(centers, band_km),
+    }
+
+
+def load_adjacency(path=GEOJSON_PATH, snap=SNAP, band_km=DISTANCE_BAND_KM, use_cache=True):
+    """경계 좌표 해시 + 설정이 같으면 캐시에서, 아니면 새로 계산해 저장"""
+    polys = read_polygons(path)
+    key = f"{geometry_hash(polys)}-{snap:g}-{band_km:g}"
+    cache_path = ADJACENCY_DIR / f"{key}.npz"
+
+    if use_cache and cache_path.exists():
+        with np.load(cache_path, allow_pickle=False) as z:
+            n = len(z["ids"])
+            adj = {
+                "ids": z["ids"].tolist(),
+                "names": z["names"].tolist(),
+                "centroids": z["centroids"],
+            }
+            for kind in KINDS:
+                adj[kind] = sp.csr_matrix(
+                    (np.ones(len(z[f"{kind}_indices"])), z[f"{kind}_indices"], z[f"{kind}_indptr"]),
+                    shape=(n, n),
+                )
+            return adj
+
+    adj = build_adjacency(polys, snap, band_km)
+
+    ADJACENCY_DIR.mkdir(parents=True, exist_ok=True)
+    arrays = {
+        "ids": np.array(adj["ids"]),
+        "names": np.array(adj["names"]),
+        "centroids": adj["centroids"],
+    }
+    for kind in KINDS:
+        arrays[f"{kind}_indices"] = adj[kind].indices
+        arrays[f"{kind}_indptr"] = adj[kind].indptr
+    np.savez(cache_path, **arrays)
+    return adj
+
+
+# =====================================================
+# 5. 분석용 도우미
+# =====================================================
+def align_weights(adj, districts, kind="queen"):
+    """
+    인접 행렬을 분석 테이블의 district 순서로 재배열
+
+    - districts: 자치구 이름 목록 (GeoJSON의 SIG_KOR_NM과 같은 표기)
+    - GeoJSON에 없는 자치구가 있으면 KeyError
+    """
+    pos = {name: k for k, name in enumerate(adj["names"])}
+    missing = [d for d in districts if d not in pos]
+    if missing:
+        raise KeyError(f"[spatial_adjacency] not in geometry: {missing}")
+    idx = np.array([pos[d] for d in districts])
+    return adj[kind][idx][:, idx].tocsr()
+
+
+def row_standardize(W):
+    """행 합이 1이 되도록 정규화 (이웃이 없는 행은 0 유지)"""
+    sums = np.asarray(W.sum(axis=1)).ravel()
+    inv = np.divide(1.0, sums, out=np.zeros_like(sums, dtype=float), where=sums > 0)
+    return sp.diags(inv) @ W
+
+
+def spatial_lag(W, x):
+    """공간 시차 W·x (행 정규화된 W면 이웃 평균)"""
+    return W @ np.asarray(x, dtype=float)
+
+
+# =====================================================
+# 실행 진입점
+# =====================================================
+def main():
+    import time
+
+    start = time.perf_counter()
+    adj = load_adjacency(use_cache=False)
+    elapsed = time.perf_counter() - start
+
+    print(f"🗺️ 공간 인접 행렬: {len(adj['names'])}개 지역 ({elapsed:.2f}초)")
+    for kind in KINDS:
+        n_links = adj[kind].nnz // 2
+        print(f"  {kind:8s} 이웃 쌍 {n_links:4d}개, 평균 이웃 수 {adj[kind].nnz / len(adj['names']):.2f}")
+
+
+if __name__ == "__main__":
+    main()
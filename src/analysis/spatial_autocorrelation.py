@@ -0,0 +1,254 @@
+"""
+spatial_autocorrelation.py
+
+공간 자기상관 분석 (전역 Moran's I / 국지 LISA 군집)
+
+역할 요약:
+- mhvi_final_result.csv의 Need_Index / Supply_Index / Gap_Index에 대해
+    · 전역 Moran's I: 값이 비슷한 지역끼리 모여 있는 정도 (지도 전체 1개 값)
+    · 국지 Moran's I (LISA): 지역별로 이웃과 함께 높은지 / 낮은지
+      → High-High(고-고 군집), Low-Low, High-Low, Low-High, 유의하지 않음(ns)
+  을 계산한다.
+- 공간 가중치: spatial_adjacency의 queen 인접 행렬 (행 정규화)
+- 유의성: 순열(permutation) 검정, 기본 9,999회
+    · 전역: 값 전체를 무작위로 섞은 순열 묶음을 한 번의 희소 행렬곱으로 계산
+    · 국지: 조건부 순열 (지역 i 값은 고정, 나머지 중 이웃 수만큼 무작위 추출)
+      → 순열 × 이웃 인덱스 배열 하나로 모든 순열을 한 번에 계산
+- 순열 작업은 (변수, 지역 묶음) 단위 청크로 나눠 여러 코어에서 병렬 계산한다.
+  청크마다 seed에서 파생된 독립 난수열을 쓰므로 같은 seed면 코어 수와 무관하게 결과가 같다.
+
+→ 4사분면(중앙값 분할)은 지리를 고려하지 않으므로,
+  '서로 붙어 있는 고격차(Gap) 자치구 묶음'을 찾기 위한 보조 분석
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config import OUTPUT_DIR
+
+INDEX_COLS = ["Need_Index", "Supply_Index", "Gap_Index"]
+
+GLOBAL_PATH = OUTPUT_DIR / "spatial_moran_global.csv"
+LISA_PATH = OUTPUT_DIR / "spatial_lisa_clusters.csv"
+
+# 유의수준 (이보다 작은 순열 p값만 군집으로 표시)
+ALPHA = 0.05
+
+CLUSTER_LABELS = {1: "High-High", 2: "Low-High", 3: "Low-Low", 4: "High-Low"}
+
+
+# =====================================================
+# 1. 순열 표본
+# =====================================================
+def _sample_without_replacement(rng, n_perm, population, k):
+    """
+    (n_perm × k) 배열: 행마다 0 ~ population-1 중 서로 다른 k개 (순서도 무작위)
+
+    Floyd 알고리즘을 행 방향으로 한꺼번에 적용 (k번 반복, 매번 n_perm개 추출)
+    → 순열마다 population 전체를 섞지 않아도 됨
+    """
+    sel = np.empty((n_perm, k), dtype=np.int64)
+    for c, j in enumerate(range(population - k, population)):
+        t = rng.integers(0, j + 1, size=n_perm)
+        dup = (sel[:, :c] == t[:, None]).any(axis=1)
+        sel[:, c] = np.where(dup, j, t)
+    return rng.permuted(sel, axis=1)
+
+
+# 순열 값 ≥ 관측값 비교의 상대 허용 오차
+# 관측값은 희소 행렬곱(W @ z), 순열 값은 밀집 행렬곱(z[ids] @ w)으로 계산해 더하는 순서가 다르다.
+# 순열이 실제 이웃 집합을 뽑으면 두 값의 차이가 반올림 오차(~1e-12)뿐이므로
+# 허용 오차 없이 비교하면 p값이 실행마다 달라질 수 있음
+REL_TOL = 1e-10
+
+
+def _folded_p(sims, observed):
+    """순열 분포에서 관측값보다 극단적인 비율 (한쪽 꼬리, 관측 방향 기준)"""
+    n_perm = sims.shape[-1]
+    observed = np.asarray(observed)
+    threshold = observed - REL_TOL * np.abs(observed)
+    larger = (sims >= threshold[..., None]).sum(axis=-1)
+    larger = np.minimum(larger, n_perm - larger)
+    return (larger + 1) / (n_perm + 1)
+
+
+# =====================================================
+# 2. 청크 단위 계산 (병렬 작업 단위)
+# =====================================================
+def _global_chunk(args):
+    """전역 Moran's I 순열 청크: 값 순서를 섞은 (순열 × 지역) 묶음의 I 값들"""
+    z, W, n_perm, seed_seq = args
+    rng = np.random.default_rng(seed_seq)
+
+    Z = rng.permuted(np.broadcast_to(z, (n_perm, len(z))), axis=1)
+    lag = (W @ Z.T).T
+    return (Z * lag).sum(axis=1) / (z @ z) * len(z) / W.sum()
+
+
+def _local_chunk(args):
+    """
+    국지 Moran's I 조건부 순열 청크 (지역 start ~ stop)
+
+    - 지역 i의 이웃 가중치 w_i(길이 k_i)는 그대로 두고
+      i를 뺀 n-1개 지역 중 k_i개를 무작위로 골라 이웃 값으로 사용
+    - 무작위 인덱스 표 rids(순열 × 최대 이웃 수)는 청크 안의 모든 지역이 공유
+      (앞 k_i열 사용, i 이상인 인덱스는 +1 해서 i 자신을 건너뜀)
+
+    반환: 청크 지역들의 순열 p값 (순열 분포 자체는 청크 밖으로 보내지 않음 → 메모리 일정)
+    """
+    z, W_rows, start, observed, n_perm, seed_seq = args
+    rng = np.random.default_rng(seed_seq)
+    n = len(z)
+    m2 = (z @ z) / n
+
+    counts = np.diff(W_rows.indptr)
+    k_max = int(counts.max()) if len(counts) else 0
+    sims = np.zeros((W_rows.shape[0], n_perm))
+    if k_max == 0:
+        return _folded_p(sims, observed)
+
+    rids = _sample_without_replacement(rng, n_perm, n - 1, k_max)
+    for r in range(W_rows.shape[0]):
+        k = counts[r]
+        if k == 0:
+            continue
+        i = start + r
+        w = W_rows.data[W_rows.indptr[r]:W_rows.indptr[r + 1]]
+        ids = rids[:, :k]
+        ids = ids + (ids >= i)
+        sims[r] = z[i] * (z[ids] @ w) / m2
+    return _folded_p(sims, observed)
+
+
+# =====================================================
+# 3. 전체 계산
+# =====================================================
+def run_spatial_autocorrelation(
+    df,
+    W,
+    columns=INDEX_COLS,
+    permutations=9_999,
+    seed=42,
+    chunk_size=500,
+    n_jobs=None,
+):
+    """
+    전역 Moran's I + LISA 군집
+
+    입력:
+    - df: district + columns (mhvi_final_result.csv)
+    - W: df 행 순서와 같은 행 정규화 공간 가중치 (spatial_adjacency.align_weights + row_standardize)
+    - permutations: 순열 횟수
+    - chunk_size: 국지 순열 청크 하나의 지역 수 (전역 순열도 같은 개수 단위로 나눔)
+    - n_jobs: 병렬 프로세스 수 (None이면 CPU 수, 1이면 단일 프로세스)
+
+    반환:
+    - df_global: variable, Moran_I, Expected_I, p_sim, z_sim
+    - df_local:  district + {변수}_LISA_I / _LISA_p / _LISA_Cluster
+    """
+    W = W.tocsr()
+    n = W.shape[0]
+    islands = np.diff(W.indptr) == 0
+
+    # -----------------------------------------------------
+    # 1. 관측값 (희소 행렬곱으로 공간 시차 계산)
+    # -----------------------------------------------------
+    z = {c: df[c].to_numpy(dtype=float) - df[c].mean() for c in columns}
+    lag = {c: W @ z[c] for c in columns}
+    observed_global = {c: (z[c] @ lag[c]) / (z[c] @ z[c]) * n / W.sum() for c in columns}
+    observed_local = {c: z[c] * lag[c] / ((z[c] @ z[c]) / n) for c in columns}
+
+    # -----------------------------------------------------
+    # 2. 순열 작업 목록 (변수 × 청크)
+    # -----------------------------------------------------
+    perm_sizes = [min(chunk_size, permutations - s) for s in range(0, permutations, chunk_size)]
+    row_starts = list(range(0, n, chunk_size))
+
+    tasks, funcs, keys = [], [], []
+    seeds = iter(np.random.SeedSequence(seed).spawn(len(columns) * (len(perm_sizes) + len(row_starts))))
+    for c in columns:
+        for size in perm_sizes:
+            tasks.append((z[c], W, size, next(seeds)))
+            funcs.append(_global_chunk)
+            keys.append((c, "global"))
+        for start in row_starts:
+            stop = min(start + chunk_size, n)
+            tasks.append((
+                z[c], W[start:stop], start, observed_local[c][start:stop], permutations, next(seeds)
+            ))
+            funcs.append(_local_chunk)
+            keys.append((c, "local"))
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1:
+        parts = [f(t) for f, t in zip(funcs, tasks)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as pool:
+            futures = [pool.submit(f, t) for f, t in zip(funcs, tasks)]
+            parts = [fut.result() for fut in futures]
+
+    # -----------------------------------------------------
+    # 3. 청크 결과 합치기 → p값 / 군집
+    # -----------------------------------------------------
+    rows = []
+    df_local = pd.DataFrame({"district": df["district"].to_numpy()})
+    for c in columns:
+        sims_global = np.concatenate([p for p, k in zip(parts, keys) if k == (c, "global")])
+
+        rows.append({
+            "variable": c,
+            "Moran_I": observed_global[c],
+            "Expected_I": -1.0 / (n - 1),
+            "p_sim": float(_folded_p(sims_global, np.array(observed_global[c]))),
+            "z_sim": (observed_global[c] - sims_global.mean()) / sims_global.std(),
+        })
+
+        p_local = np.concatenate([p for p, k in zip(parts, keys) if k == (c, "local")])
+        p_local[islands] = np.nan
+
+        # 사분면 코드: 1 = HH, 2 = LH, 3 = LL, 4 = HL (Moran 산점도 기준)
+        high, high_lag = z[c] > 0, lag[c] > 0
+        quad = np.select(
+            [high & high_lag, ~high & high_lag, ~high & ~high_lag],
+            [1, 2, 3],
+            default=4,
+        )
+        significant = p_local <= ALPHA
+        df_local[f"{c}_LISA_I"] = observed_local[c]
+        df_local[f"{c}_LISA_p"] = p_local
+        df_local[f"{c}_LISA_Cluster"] = np.where(
+            significant, [CLUSTER_LABELS[q] for q in quad], "ns"
+        )
+
+    return pd.DataFrame(rows), df_local
+
+
+# =====================================================
+# 실행 진입점
+# =====================================================
+def main():
+    import time
+    from spatial_adjacency import load_adjacency, align_weights, row_standardize
+
+    df = pd.read_csv(OUTPUT_DIR / "mhvi_final_result.csv", encoding="utf-8-sig")
+    W = row_standardize(align_weights(load_adjacency(), df["district"], kind="queen"))
+
+    start = time.perf_counter()
+    df_global, df_local = run_spatial_autocorrelation(df, W)
+    elapsed = time.perf_counter() - start
+
+    df_global.to_csv(GLOBAL_PATH, index=False, encoding="utf-8-sig")
+    df_local.to_csv(LISA_PATH, index=False, encoding="utf-8-sig")
+
+    print(f"\n🗺️ 공간 자기상관 (queen 인접, 순열 9,999회, {elapsed:.2f}초)")
+    print(df_global.to_string(index=False))
+    print("\n[Gap_Index LISA 군집]")
+    print(df_local["Gap_Index_LISA_Cluster"].value_counts().to_string())
+    print(f"📁 저장 위치: {GLOBAL_PATH}")
+    print(f"📁 저장 위치: {LISA_PATH}")
+
+
+if __name__ == "__main__":
+    main()
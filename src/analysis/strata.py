@@ -0,0 +1,187 @@
+"""
+strata.py
+
+성별 · 연령대별(층화) Need / Supply / Gap Index
+
+역할 요약:
+- 원본 파일에 이미 들어 있는 성별(남자/여자), 연령대(1인가구 16개 연령 구간) 값을
+  '합계/소계'만 남기지 않고 층(stratum)별로 뽑아낸다.
+- 층 × 자치구 × 변수 3차원 배열을 만든 뒤
+  index_calculator.compute_index_arrays로 모든 층을 한 번에 계산한다.
+- 결과는 전체(합계) 결과와 같은 폴더에 mhvi_strata_result.csv로 저장한다.
+
+층 정의:
+- 성별: 전체 / 남자 / 여자
+- 연령대: 전체 / 청년(39세 이하) / 중장년(40~64세) / 노년(65세 이상)
+
+해당 층의 값이 원본에 없는 변수는 가까운 상위 층 값을 사용한다.
+  (성별, 연령대) → (성별, 전체) → (전체, 전체)
+  예) 남자·노년 층의 우울감 경험률 → 연령별 자치구 값이 없으므로 남자 전체 값
+Supply 변수는 성별·연령 구분이 없으므로 모든 층에서 같은 값을 사용한다.
+
+⚠️ 해석 주의:
+- 층별 지수는 '같은 층 안에서' 25개 자치구를 상대 비교한 값이다.
+  (남자·노년 지수와 여자·청년 지수를 직접 비교하는 용도가 아님)
+"""
+import numpy as np
+import pandas as pd
+
+from config import OUTPUT_DIR, NEED_VARS, SUPPLY_VARS
+from ingest import NEED_SOURCES, SUPPLY_SOURCES, read_source, read_source_variants
+from index_calculator import compute_index_arrays
+
+SEXES = ["전체", "남자", "여자"]
+
+# 1인가구 연령 구간(single_households.csv 헤더) 묶음
+AGE_BANDS = {
+    "청년": ["20세미만", "20~24세", "25~29세", "30~34세", "35~39세"],
+    "중장년": ["40~44세", "45~49세", "50~54세", "55~59세", "60~64세"],
+    "노년": ["65~69세", "70~74세", "75~79세", "80~84세", "85세이상"],
+}
+AGE_GROUPS = ["전체"] + list(AGE_BANDS)
+
+STRATA = [(sex, age) for sex in SEXES for age in AGE_GROUPS]
+
+
+# =====================================================
+# 1. 층별 추출 명세 (ingest 명세에서 바뀌는 부분만)
+# =====================================================
+def _sex_column(var, sex):
+    """column 라벨의 마지막(성별) 자리만 바꾼 명세"""
+    labels = NEED_SOURCES[var]["column"]
+    return {"column": labels[:-1] + (sex,)}
+
+
+STRATA_SOURCES = {
+    "suicide_rate": {
+        (sex, "전체"): _sex_column("suicide_rate", sex) for sex in ["남자", "여자"]
+    },
+    "depression_experience_rate": {
+        (sex, "전체"): _sex_column("depression_experience_rate", sex) for sex in ["남자", "여자"]
+    },
+    "perceived_stress_rate": {
+        (sex, "전체"): _sex_column("perceived_stress_rate", sex) for sex in ["남자", "여자"]
+    },
+    "high_risk_drinking_rate": {
+        (sex, "전체"): _sex_column("high_risk_drinking_rate", sex) for sex in ["남자", "여자"]
+    },
+    "elderly_population_rate": {
+        (sex, "전체"): {
+            "column": ("2025 3/4", "65세이상 인구", sex, "소계"),
+            "denominator": ("2025 3/4", "전체인구", sex, "소계"),
+        }
+        for sex in ["남자", "여자"]
+    },
+    "basic_livelihood_recipients": {
+        (sex, "전체"): _sex_column("basic_livelihood_recipients", sex) for sex in ["남자", "여자"]
+    },
+    # 1인가구: 성별은 행(where), 연령대는 컬럼 묶음(sum_columns)
+    "single_households": {
+        (sex, age): {
+            "where": {2: "계" if sex == "전체" else sex},
+            **(
+                {"sum_columns": [("2024", "합계", band) for band in AGE_BANDS[age]]}
+                if age != "전체" else {}
+            ),
+        }
+        for sex in SEXES
+        for age in AGE_GROUPS
+        if (sex, age) != ("전체", "전체")
+    },
+}
+
+
+# =====================================================
+# 2. 층 × 자치구 × 변수 배열
+# =====================================================
+def build_strata_tensor(districts=None):
+    """
+    층별 값 배열을 만든다.
+
+    반환:
+      {
+        "strata":    [(성별, 연령대), ...],
+        "districts": [자치구, ...],
+        "variables": NEED_VARS + SUPPLY_VARS,
+        "values":    ndarray (층 수, 자치구 수, 변수 수)
+      }
+    """
+    sources = {**NEED_SOURCES, **SUPPLY_SOURCES}
+    variables = NEED_VARS + SUPPLY_VARS
+
+    # 변수별로 파일을 한 번만 읽으면서 전체 + 층별 값을 함께 추출
+    by_var = {}
+    for var in variables:
+        variants = {("전체", "전체"): {}}
+        variants.update(STRATA_SOURCES.get(var, {}))
+        by_var[var] = read_source_variants(sources[var], variants)
+
+    if districts is None:
+        districts = list(read_source(sources[variables[0]]))
+
+    values = np.full((len(STRATA), len(districts), len(variables)), np.nan)
+    for k, var in enumerate(variables):
+        fill = 0.0 if sources[var].get("aggregate") == "count" else np.nan
+        for s, (sex, age) in enumerate(STRATA):
+            # (성별, 연령대) → (성별, 전체) → (전체, 전체) 순으로 대체
+            for key in [(sex, age), (sex, "전체"), ("전체", "전체")]:
+                if key in by_var[var]:
+                    per_district = by_var[var][key]
+                    break
+            values[s, :, k] = [per_district.get(d, fill) for d in districts]
+
+    return {
+        "strata": list(STRATA),
+        "districts": districts,
+        "variables": variables,
+        "values": values,
+    }
+
+
+# =====================================================
+# 3. 층별 지수 계산
+# =====================================================
+def calculate_strata_indices(tensor):
+    """
+    모든 층의 Need / Supply / Gap Index와 4사분면을 한 번의 배열 연산으로 계산
+
+    출력:
+    - sex, age_group, district, Need_Index, Supply_Index, Gap_Index, Quadrant
+    """
+    need, supply, gap, quadrant, complete = compute_index_arrays(
+        tensor["values"], tensor["variables"]
+    )
+
+    n_strata, n_districts = need.shape
+    df_strata = pd.DataFrame({
+        "sex": np.repeat([s for s, _ in tensor["strata"]], n_districts),
+        "age_group": np.repeat([a for _, a in tensor["strata"]], n_districts),
+        "district": np.tile(tensor["districts"], n_strata),
+        "Need_Index": need.ravel(),
+        "Supply_Index": supply.ravel(),
+        "Gap_Index": gap.ravel(),
+        "Quadrant": quadrant.ravel(),
+    })
+
+    return df_strata[complete.ravel()].reset_index(drop=True)
+
+
+# =====================================================
+# 실행 진입점
+# =====================================================
+def main():
+    tensor = build_strata_tensor()
+    df_strata = calculate_strata_indices(tensor)
+
+    df_strata.to_csv(
+        OUTPUT_DIR / "mhvi_strata_result.csv",
+        index=False,
+        encoding="utf-8-sig"
+    )
+
+    print(f"✅ 층별 지수 계산 완료: {len(tensor['strata'])}개 층 × {len(tensor['districts'])}개 자치구")
+    print(f"📁 저장 위치: {OUTPUT_DIR / 'mhvi_strata_result.csv'}")
+
+
+if __name__ == "__main__":
+    main()
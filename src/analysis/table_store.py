@@ -0,0 +1,136 @@
+"""
+table_store.py
+
+자치구 단위 전처리 테이블의 공용 로더 (해시 기반 바이너리 캐시)
+
+역할 요약:
+- need_tidy.csv / supply_tidy.csv를 읽어 병합하는 작업을 한 곳으로 모음
+  (data_loader, tree_based_need_analysis, need_driver, src/data/analysis.py,
+   ui_3.py 가 모두 같은 함수를 사용)
+- 원본 CSV의 '내용 해시'를 키로 숫자 행렬을 .npy(열 단위 연속 배열)로 저장하고,
+  같은 내용이면 CSV 파싱 없이 캐시에서 바로 읽는다.
+- CSV가 바뀌면 해시가 달라지므로 캐시는 자동으로 무효화된다.
+
+캐시 구성 (CACHE_DIR):
+- {kind}_{hash}.npy  : district를 제외한 숫자 컬럼 행렬 (float64, Fortran 순서)
+- {kind}_{hash}.json : district 목록, 컬럼명, 정수형 컬럼 목록
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_DIR, CACHE_DIR
+
+# 테이블 종류별 원본 CSV
+SOURCES = {
+    "need": ["need_tidy.csv"],
+    "supply": ["supply_tidy.csv"],
+    "merged": ["need_tidy.csv", "supply_tidy.csv"],
+}
+
+
+def source_hash(kind):
+    """원본 CSV 파일 이름 + 바이트 내용으로 16자리 해시를 만든다."""
+    h = hashlib.sha256()
+    for name in SOURCES[kind]:
+        h.update(name.encode("utf-8"))
+        h.update((DATA_DIR / name).read_bytes())
+    return h.hexdigest()[:16]
+
+
+def _read_csv_table(kind):
+    """캐시가 없을 때 CSV를 직접 읽어 테이블을 만든다."""
+    frames = [pd.read_csv(DATA_DIR / name) for name in SOURCES[kind]]
+
+    # need / supply 모두 있는 자치구만 분석 대상 (inner join)
+    df = frames[0]
+    for other in frames[1:]:
+        df = df.merge(other, on="district", how="inner")
+    return df
+
+
+def _write_cache(stem, df, kind):
+    """숫자 행렬(.npy)과 메타데이터(.json)를 원자적으로 저장"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    columns = [c for c in df.columns if c != "district"]
+    meta = {
+        "district": df["district"].tolist(),
+        "columns": columns,
+        "int_columns": [c for c in columns if pd.api.types.is_integer_dtype(df[c])],
+    }
+    values = np.asfortranarray(df[columns].to_numpy(dtype=np.float64))
+
+    # 쓰는 도중 다른 프로세스가 읽지 않도록 임시 파일에 쓴 뒤 교체
+    # (임시 파일 이름은 프로세스마다 달라 동시에 저장해도 서로 덮어쓰지 않음)
+    with tempfile.NamedTemporaryFile(dir=CACHE_DIR, prefix=f"{stem.name}.", suffix=".tmp.npy", delete=False) as f:
+        np.save(f, values)
+    with tempfile.NamedTemporaryFile(
+        "w", dir=CACHE_DIR, prefix=f"{stem.name}.", suffix=".tmp.json", delete=False, encoding="utf-8"
+    ) as g:
+        g.write(json.dumps(meta, ensure_ascii=False))
+    os.replace(f.name, stem.with_suffix(".npy"))
+    os.replace(g.name, stem.with_suffix(".json"))
+
+    # 같은 종류의 오래된 캐시는 정리
+    # (완성된 .npy / .json만 — 다른 프로세스가 쓰는 중인 .tmp 파일은 건드리지 않음)
+    for old in CACHE_DIR.glob(f"{kind}_*"):
+        if old.suffix not in (".npy", ".json") or old.stem.endswith(".tmp"):
+            continue
+        if old.stem != stem.name:
+            old.unlink(missing_ok=True)
+
+
+def _read_cache(stem):
+    """캐시 파일에서 DataFrame을 복원 (없거나 깨져 있으면 None)"""
+    npy, meta_path = stem.with_suffix(".npy"), stem.with_suffix(".json")
+    if not (npy.exists() and meta_path.exists()):
+        return None
+
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        values = np.load(npy, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+    df = pd.DataFrame(np.array(values), columns=meta["columns"])
+    for c in meta["int_columns"]:
+        df[c] = df[c].astype(np.int64)
+    df.insert(0, "district", meta["district"])
+    return df
+
+
+def load_district_table(kind="merged", use_cache=True):
+    """
+    자치구 단위 테이블 로드
+
+    Parameters:
+    -----------
+    kind : str
+        "need"   → need_tidy.csv
+        "supply" → supply_tidy.csv
+        "merged" → 두 테이블을 district 기준 inner join
+    use_cache : bool
+        False면 캐시를 건너뛰고 CSV를 직접 읽는다 (디버깅용)
+
+    Returns:
+    --------
+    pd.DataFrame
+        district + 변수 컬럼 (CSV를 직접 읽었을 때와 같은 컬럼 순서 / dtype)
+    """
+    if kind not in SOURCES:
+        raise ValueError(f"[table_store] unknown table kind: {kind}")
+
+    if not use_cache:
+        return _read_csv_table(kind)
+
+    stem = CACHE_DIR / f"{kind}_{source_hash(kind)}"
+    df = _read_cache(stem)
+    if df is None:
+        df = _read_csv_table(kind)
+        _write_cache(stem, df, kind)
+    return df
@@ -25,14 +25,15 @@ import os
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import cross_val_score
-from sklearn.metrics import mean_squared_error, r2_score
-import shap
 import warnings
 warnings.filterwarnings('ignore')
 
-from config import BASE_DIR, DATA_DIR
+from config import BASE_DIR, DATA_DIR, TREE_RF_PARAMS
+from table_store import load_district_table
+from model_store import fit_or_load
+
+# model_store 저장 이름
+COOCCURRENCE_MODEL = "suicide_need_rf"
 
 
 def run_tree_based_analysis():
@@ -42,6 +43,11 @@ def run_tree_based_analysis():
     RandomForest와 SHAP을 이용하여 자살률과 함께 나타나는
     Need 지표들의 패턴을 분석합니다.
     """
+    # sklearn / shap은 import 시간이 길어 분석이 실제로 실행될 때만 불러온다.
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.model_selection import cross_val_score
+    from sklearn.metrics import mean_squared_error, r2_score
+    import shap
     
     # =====================================================
     # 1. 경로 설정
@@ -63,7 +69,8 @@ def run_tree_based_analysis():
     # =====================================================
     # 2. 데이터 로드
     # =====================================================
-    df = pd.read_csv(INPUT_PATH)
+    # need_tidy.csv (공용 로더: 내용이 같으면 바이너리 캐시 사용)
+    df = load_district_table("need")
     
     print(f"\n✓ 데이터 로드 완료: {df.shape[0]}개 자치구, {df.shape[1]}개 변수")
     
@@ -86,15 +93,8 @@ def run_tree_based_analysis():
     # =====================================================
     # 4. RandomForest 학습
     # =====================================================
-    RF_PARAMS = {
-        'n_estimators': 300,
-        'max_depth': 4,
-        'min_samples_split': 3,
-        'min_samples_leaf': 2,
-        'max_features': 'sqrt',
-        'random_state': 42,
-        'n_jobs': -1
-    }
+    # 하이퍼파라미터는 config.TREE_RF_PARAMS에서 관리
+    RF_PARAMS = TREE_RF_PARAMS
     
     print(f"\n{'=' * 60}")
     print("RandomForest 학습 시작")
@@ -102,8 +102,31 @@ def run_tree_based_analysis():
     for key, val in RF_PARAMS.items():
         print(f"  {key}: {val}")
     
-    rf_model = RandomForestRegressor(**RF_PARAMS)
-    rf_model.fit(X, y)
+    # 교차검증(5-fold)도 학습 5번이므로 모델과 함께 저장해 두고
+    # 같은 입력이면 모델 · 점수 모두 저장소에서 불러온다. (model_store)
+    def cross_validate(model):
+        # 학습된 모델과 같은 설정으로 교차검증 (cross_val_score가 fold마다 복제해서 새로 학습)
+        scores = cross_val_score(
+            model,
+            X,
+            y,
+            cv=5,
+            scoring='r2',
+            n_jobs=-1
+        )
+        return {"cv_scores": scores.tolist()}
+    
+    rf_model, model_meta = fit_or_load(
+        COOCCURRENCE_MODEL,
+        lambda: RandomForestRegressor(**RF_PARAMS),
+        X,
+        y,
+        RF_PARAMS,
+        features=feature_cols,
+        extra=cross_validate,
+    )
+    if model_meta["loaded"]:
+        print(f"\n✓ 저장된 모델 사용 (입력 동일, key={model_meta['key']})")
     
     # =====================================================
     # 5. 예측 및 성능 평가
@@ -113,14 +136,7 @@ def run_tree_based_analysis():
     train_r2 = r2_score(y, y_pred)
     train_rmse = np.sqrt(mean_squared_error(y, y_pred))
     
-    cv_scores = cross_val_score(
-        rf_model,
-        X,
-        y,
-        cv=5,
-        scoring='r2',
-        n_jobs=-1
-    )
+    cv_scores = np.array(model_meta["extra"]["cv_scores"])
     
     cv_r2_mean = cv_scores.mean()
     cv_r2_std = cv_scores.std()
@@ -12,11 +12,36 @@ visualization.py
 이 시각화는:
 "어디가 위험한가?"를 넘어서
 "어떤 유형의 개입이 필요한가?"를 한눈에 보여주는 도구다.
+
+렌더링 모드:
+- out_path 지정 (헤드리스): pyplot / GUI 백엔드 없이 Figure 객체에 그려
+  PNG / SVG 파일로 저장 → 서버 / 야간 배치에서 화면 대기 없이 실행
+- out_path 없음 (대화형): 기존처럼 plt.show()로 화면 출력
+- render_quadrant_charts: 연도별 / 시나리오별 차트 여러 장을 프로세스 풀에서 동시에 저장
 """
-import matplotlib.pyplot as plt
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from config import FONT_FAMILY, FIGURE_DIR
+
 
+def _style():
+    """
+    한글 폰트 + 마이너스 기호 설정 (차트를 그릴 때만 적용)
 
-def plot_quadrant_chart(df_final, median_need, median_supply):
+    FONT_FAMILY가 설치되지 않은 서버에서는 matplotlib 기본 폰트 사용
+    (글자마다 findfont 경고가 반복 출력되는 것을 방지)
+    """
+    from matplotlib import font_manager
+
+    style = {'axes.unicode_minus': False}
+    if any(f.name == FONT_FAMILY for f in font_manager.fontManager.ttflist):
+        style['font.family'] = FONT_FAMILY
+    return style
+
+
+def plot_quadrant_chart(df_final, median_need, median_supply, out_path=None, title=None):
     """
     4사분면 시각화 함수
 
@@ -27,16 +52,46 @@ def plot_quadrant_chart(df_final, median_need, median_supply):
         Need_Index 중앙값 (위/아래 분면 구분 기준)
     - median_supply:
         Supply_Index 중앙값 (좌/우 분면 구분 기준)
+    - out_path:
+        저장할 파일 경로 (.png / .svg, 확장자로 형식 결정)
+        None이면 화면 출력 (plt.show)
+    - title:
+        차트 제목 (None이면 기본 제목, 연도 / 시나리오 구분용)
 
     출력:
-    - matplotlib 산점도 (화면 출력)
+    - out_path 지정 시: 저장한 파일 경로 (화면 출력 없음)
+    - 아니면: matplotlib 산점도 (화면 출력)
     """
+    import matplotlib
 
-    # -----------------------------------------------------
-    # 1. Figure 설정
-    # -----------------------------------------------------
-    # 정사각형 비율 → 두 축의 상대적 크기를 왜곡 없이 비교
-    plt.figure(figsize=(8, 8))
+    with matplotlib.rc_context(_style()):
+        # -----------------------------------------------------
+        # 1. Figure 설정
+        # -----------------------------------------------------
+        # 정사각형 비율 → 두 축의 상대적 크기를 왜곡 없이 비교
+        if out_path is None:
+            import matplotlib.pyplot as plt
+            fig = plt.figure(figsize=(8, 8))
+        else:
+            # pyplot을 거치지 않는 Figure → 비대화형(Agg / SVG) 캔버스로만 저장
+            from matplotlib.figure import Figure
+            fig = Figure(figsize=(8, 8))
+
+        _draw_quadrant_chart(fig.add_subplot(), df_final, median_need, median_supply, title)
+        fig.tight_layout()      # 레이아웃 자동 조정
+
+        if out_path is None:
+            plt.show()          # 화면 출력
+            return None
+
+        out_path = Path(out_path)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        fig.savefig(out_path, dpi=150)
+        return out_path
+
+
+def _draw_quadrant_chart(ax, df_final, median_need, median_supply, title=None):
+    """plot_quadrant_chart의 실제 그리기 (주어진 Axes 하나에)"""
 
     # -----------------------------------------------------
     # 2. 분면별 라벨 및 색상 정의
@@ -64,7 +119,7 @@ def plot_quadrant_chart(df_final, median_need, median_supply):
     # 동일한 색상과 라벨로 묶어서 시각화
     for quad, (label, color) in color_map.items():
         subset = df_final[df_final['Quadrant'] == quad]
-        plt.scatter(
+        ax.scatter(
             subset['Supply_Index'],   # x축: 공급 수준
             subset['Need_Index'],     # y축: 위험 수준
             label=label,
@@ -83,13 +138,13 @@ def plot_quadrant_chart(df_final, median_need, median_supply):
     # - 위/아래: 위험 수준
     # - 좌/우: 공급 수준
     # 을 직관적으로 구분할 수 있음
-    plt.axhline(
+    ax.axhline(
         median_need,
         color='black',
         linestyle='--',
         linewidth=1
     )
-    plt.axvline(
+    ax.axvline(
         median_supply,
         color='black',
         linestyle='--',
@@ -105,7 +160,7 @@ def plot_quadrant_chart(df_final, median_need, median_supply):
     # offset을 주는 이유:
     # - 점과 텍스트가 겹쳐 가독성이 떨어지는 것을 방지
     for _, row in df_final.iterrows():
-        plt.annotate(
+        ax.annotate(
             row['district'],
             (row['Supply_Index'], row['Need_Index']),
             textcoords="offset points",
@@ -119,14 +174,85 @@ def plot_quadrant_chart(df_final, median_need, median_supply):
     # -----------------------------------------------------
     # 6. 축 라벨 및 제목
     # -----------------------------------------------------
-    plt.xlabel("Supply Index (인프라 공급도)")
-    plt.ylabel("Need Index (위험도)")
-    plt.title("Need–Supply 기반 4사분면 분류")
+    ax.set_xlabel("Supply Index (인프라 공급도)")
+    ax.set_ylabel("Need Index (위험도)")
+    ax.set_title(title or "Need–Supply 기반 4사분면 분류")
 
     # -----------------------------------------------------
     # 7. 기타 시각적 요소
     # -----------------------------------------------------
-    plt.legend()            # 분면 설명 범례
-    plt.grid(alpha=0.3)     # 가독성 향상을 위한 연한 그리드
-    plt.tight_layout()      # 레이아웃 자동 조정
-    plt.show()              # 화면 출력
+    ax.legend()             # 분면 설명 범례
+    ax.grid(alpha=0.3)      # 가독성 향상을 위한 연한 그리드
+
+
+# =====================================================
+# 여러 장 일괄 저장 (연도별 / 시나리오별)
+# =====================================================
+def quadrant_charts_by(df_long, by):
+    """
+    long 형식 결과 테이블 → {그룹 값: (df, median_need, median_supply)}
+
+    - by: 그룹 컬럼 (예: calculate_panel_indices 결과의 "year", 시나리오 이름 컬럼)
+    - 중앙값은 그룹마다 따로 계산 (4사분면 기준선 = 그 연도 / 시나리오의 중앙값)
+    """
+    return {
+        key: (
+            group.reset_index(drop=True),
+            float(group['Need_Index'].median()),
+            float(group['Supply_Index'].median()),
+        )
+        for key, group in df_long.groupby(by, sort=True)
+    }
+
+
+def _render_one(args):
+    name, (df, median_need, median_supply), out_path = args
+    return plot_quadrant_chart(df, median_need, median_supply, out_path=out_path, title=f"Need–Supply 4사분면 ({name})")
+
+
+def render_quadrant_charts(charts, out_dir=FIGURE_DIR, fmt="png", prefix="quadrant", n_jobs=None):
+    """
+    차트 여러 장을 헤드리스로 동시에 저장
+
+    입력:
+    - charts: {이름: (df, median_need, median_supply)} (quadrant_charts_by 결과 등)
+    - fmt: "png" 또는 "svg"
+    - n_jobs: 프로세스 수 (None이면 CPU 수, 1이면 현재 프로세스에서 순차 저장)
+
+    출력:
+    - {이름: 저장 경로}  (파일명: {prefix}_{이름}.{fmt})
+    """
+    if fmt not in ("png", "svg"):
+        raise ValueError(f"[visualization] unsupported format: {fmt}")
+
+    tasks = [
+        (name, chart, Path(out_dir) / f"{prefix}_{name}.{fmt}")
+        for name, chart in charts.items()
+    ]
+    n_jobs = min(n_jobs or os.cpu_count() or 1, max(len(tasks), 1))
+
+    if n_jobs == 1:
+        paths = [_render_one(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            paths = list(pool.map(_render_one, tasks))
+
+    return {name: path for (name, _, _), path in zip(tasks, paths)}
+
+
+# =====================================================
+# 실행 진입점 (연도별 4사분면 차트)
+# =====================================================
+def main():
+    from panel import load_panel
+    from index_calculator import calculate_panel_indices
+
+    df_panel = calculate_panel_indices(load_panel())
+    paths = render_quadrant_charts(quadrant_charts_by(df_panel, "year"))
+
+    print(f"🖼️ 연도별 4사분면 차트 {len(paths)}장 저장 완료")
+    print(f"📁 저장 위치: {FIGURE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+weight_scenarios.py
+
+가중치 시나리오 일괄 평가 (민감도 분석)
+
+역할 요약:
+- config.py의 WEIGHTS_NEED / WEIGHTS_SUPPLY는
+  '정책적 판단을 반영한 가설적 설정'이므로 다른 가중치로도 결과를 봐야 한다.
+- S개의 가중치 벡터를 (S × 변수 수) 행렬로 받아
+  정규화 행렬과 한 번의 행렬곱으로 S개 시나리오의
+  Need / Supply / Gap Index, 순위, 4사분면을 동시에 계산한다.
+- S가 크면 결과를 청크 단위로 디스크(.npy 메모리맵)에 바로 기록한다.
+
+예) "자살률 가중치를 0.25 대신 0.15로 하면?" 같은 질문 수십 개를
+    main.py 재실행 없이 한 번에 비교
+"""
+import json
+
+import numpy as np
+
+from config import OUTPUT_DIR, NEED_VARS, SUPPLY_VARS, WEIGHTS_NEED, WEIGHTS_SUPPLY
+from index_calculator import classify_quadrants
+
+NEED_COLS = [f"{v}_norm" for v in NEED_VARS]
+SUPPLY_COLS = [f"{v}_norm" for v in SUPPLY_VARS]
+
+# 4사분면 라벨 ↔ 저장용 코드 (uint8)
+QUADRANTS = np.array(["A", "B", "C", "D"])
+
+SCENARIO_DIR = OUTPUT_DIR.parent / "weight_scenarios"
+
+
+# =====================================================
+# 1. 시나리오 → 가중치 행렬
+# =====================================================
+def weight_matrix(scenarios, base, columns, normalize=False):
+    """
+    가중치 변경 시나리오 목록 → (S × 변수 수) 가중치 행렬
+
+    Parameters:
+    -----------
+    scenarios : list[dict]
+        기본 가중치(base)에서 바꿀 항목만 적은 dict 목록
+        예: [{"suicide_rate_norm": 0.15}, {"unemployment_rate_norm": 0.2}]
+    base : dict
+        기본 가중치 (WEIGHTS_NEED / WEIGHTS_SUPPLY)
+    columns : list[str]
+        행렬의 열 순서 (*_norm 변수명)
+    normalize : bool
+        True면 각 행의 합을 1로 다시 맞춘다
+        (기본값 False: config 가중치를 그대로 쓰는 main.py 결과와 같은 스케일)
+    """
+    W = np.tile([base.get(c, 0.0) for c in columns], (len(scenarios), 1))
+    col_pos = {c: j for j, c in enumerate(columns)}
+
+    for i, override in enumerate(scenarios):
+        for c, w in override.items():
+            if c not in col_pos:
+                raise ValueError(f"[weight_scenarios] unknown weight key: {c}")
+            W[i, col_pos[c]] = w
+
+    if normalize:
+        W = W / W.sum(axis=1, keepdims=True)
+    return W
+
+
+# =====================================================
+# 2. 시나리오 일괄 계산
+# =====================================================
+def _ranks(values):
+    """(S × 자치구) 값 → 시나리오별 순위 (1 = 가장 큰 값)"""
+    order = np.argsort(-values, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, values.shape[1] + 1), axis=1)
+    return ranks
+
+
+def _evaluate_chunk(X_need, X_supply, W_need, W_supply):
+    """가중치 행렬 청크 하나에 대한 전체 결과 (모두 시나리오 × 자치구)"""
+    need = W_need @ X_need.T
+    supply = W_supply @ X_supply.T
+    gap = need - supply
+
+    median_need = np.median(need, axis=1, keepdims=True)
+    median_supply = np.median(supply, axis=1, keepdims=True)
+    quadrant = classify_quadrants(need, supply, median_need, median_supply)
+
+    return {
+        "need": need,
+        "supply": supply,
+        "gap": gap,
+        "need_rank": _ranks(need),
+        "supply_rank": _ranks(supply),
+        "gap_rank": _ranks(gap),
+        "quadrant": np.searchsorted(QUADRANTS, quadrant).astype(np.uint8),
+    }
+
+
+def evaluate_weight_scenarios(
+    df_need_norm,
+    df_supply_norm,
+    W_need=None,
+    W_supply=None,
+    chunk_size=10_000,
+    out_dir=None,
+):
+    """
+    S개 가중치 시나리오의 지수 / 순위 / 4사분면 일괄 계산
+
+    입력:
+    - df_need_norm, df_supply_norm: normalize_data()의 결과 (*_norm 컬럼, 같은 행 순서)
+    - W_need:   (S × Need 변수 수)   None이면 WEIGHTS_NEED 1개 시나리오
+    - W_supply: (S × Supply 변수 수) None이면 WEIGHTS_SUPPLY 1개 시나리오
+      ※ 한쪽만 S행이고 다른 쪽이 1행이면 1행 가중치를 모든 시나리오에 공통 적용
+    - chunk_size: 한 번에 계산할 시나리오 수 (메모리 사용량 제한)
+    - out_dir: 지정하면 결과를 {out_dir}/{항목}.npy 메모리맵에 청크 단위로 기록
+
+    반환:
+    - {"need", "supply", "gap", "need_rank", "supply_rank", "gap_rank", "quadrant"}
+      각 (S × 자치구) 배열 (out_dir 지정 시 읽기 전용 메모리맵)
+      quadrant는 QUADRANTS 인덱스 코드 (0=A, 1=B, 2=C, 3=D)
+    """
+    X_need = df_need_norm[NEED_COLS].to_numpy(dtype=float)
+    X_supply = df_supply_norm[SUPPLY_COLS].to_numpy(dtype=float)
+
+    if W_need is None:
+        W_need = weight_matrix([{}], WEIGHTS_NEED, NEED_COLS)
+    if W_supply is None:
+        W_supply = weight_matrix([{}], WEIGHTS_SUPPLY, SUPPLY_COLS)
+    W_need = np.atleast_2d(W_need)
+    W_supply = np.atleast_2d(W_supply)
+
+    n_scenarios = max(len(W_need), len(W_supply))
+    for name, W in [("W_need", W_need), ("W_supply", W_supply)]:
+        if len(W) not in (1, n_scenarios):
+            raise ValueError(f"[weight_scenarios] {name} has {len(W)} rows, expected 1 or {n_scenarios}")
+
+    n_districts = len(X_need)
+    shape = (n_scenarios, n_districts)
+    dtypes = {
+        "need": np.float64, "supply": np.float64, "gap": np.float64,
+        "need_rank": np.int32, "supply_rank": np.int32, "gap_rank": np.int32,
+        "quadrant": np.uint8,
+    }
+
+    # -----------------------------------------------------
+    # 결과 버퍼: 메모리 배열 또는 디스크 메모리맵
+    # -----------------------------------------------------
+    if out_dir is None:
+        results = {k: np.empty(shape, dtype=t) for k, t in dtypes.items()}
+    else:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        results = {
+            k: np.lib.format.open_memmap(out_dir / f"{k}.npy", mode="w+", dtype=t, shape=shape)
+            for k, t in dtypes.items()
+        }
+        np.save(out_dir / "W_need.npy", np.broadcast_to(W_need, (n_scenarios, W_need.shape[1])))
+        np.save(out_dir / "W_supply.npy", np.broadcast_to(W_supply, (n_scenarios, W_supply.shape[1])))
+        (out_dir / "meta.json").write_text(json.dumps({
+            "district": df_need_norm["district"].tolist(),
+            "need_columns": NEED_COLS,
+            "supply_columns": SUPPLY_COLS,
+            "quadrants": QUADRANTS.tolist(),
+        }, ensure_ascii=False), encoding="utf-8")
+
+    # -----------------------------------------------------
+    # 청크 단위 계산 (청크마다 행렬곱 1회)
+    # -----------------------------------------------------
+    for start in range(0, n_scenarios, chunk_size):
+        stop = min(start + chunk_size, n_scenarios)
+        chunk = _evaluate_chunk(
+            X_need,
+            X_supply,
+            W_need[start:stop] if len(W_need) > 1 else W_need,
+            W_supply[start:stop] if len(W_supply) > 1 else W_supply,
+        )
+        for k, arr in chunk.items():
+            results[k][start:stop] = np.broadcast_to(arr, (stop - start, n_districts))
+
+    if out_dir is not None:
+        for arr in results.values():
+            arr.flush()
+        del results
+        return {k: np.load(out_dir / f"{k}.npy", mmap_mode="r") for k in dtypes}
+
+    return results
+
+
+# =====================================================
+# 실행 진입점 (Need 가중치 개별 민감도 예시)
+# =====================================================
+def main():
+    from table_store import load_district_table
+    from data_loader import normalize_data
+
+    df = load_district_table("merged")
+    df_need_norm, df_supply_norm = normalize_data(df)
+
+    # 각 Need 가중치를 기본값의 0.5배 ~ 1.5배로 바꾼 시나리오
+    factors = np.linspace(0.5, 1.5, 11)
+    scenarios = [
+        {col: WEIGHTS_NEED[col] * f}
+        for col in NEED_COLS
+        for f in factors
+    ]
+    W_need = weight_matrix(scenarios, WEIGHTS_NEED, NEED_COLS)
+
+    result = evaluate_weight_scenarios(
+        df_need_norm, df_supply_norm, W_need=W_need, out_dir=SCENARIO_DIR
+    )
+
+    ranks = result["need_rank"]
+    print("\n📊 Need 순위 민감도 (가중치 ±50%, 시나리오 {}개)".format(len(ranks)))
+    for j, d in enumerate(df_need_norm["district"]):
+        print(f"  {d:6s} 순위 {ranks[:, j].min():2d} ~ {ranks[:, j].max():2d}")
+    print(f"📁 저장 위치: {SCENARIO_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+weight_uncertainty.py
+
+가중치 불확실성 몬테카를로 분석 (순위 안정성)
+
+역할 요약:
+- config.py의 WEIGHTS_NEED / WEIGHTS_SUPPLY 주변에서
+  디리클레(Dirichlet) 분포로 가중치 벡터를 무작위 추출
+- weight_scenarios의 행렬 계산으로 추출된 모든 시나리오를 평가하고
+  자치구별로 다음을 집계한다.
+    · Need / Gap 순위 분포 (평균, 5% / 95% 분위, 최소 ~ 최대)
+    · Need 상위 5위 안에 들 확률
+    · 각 4사분면(A/B/C/D)에 속할 확률
+- 시나리오는 고정 크기 청크로 나눠 여러 코어에서 병렬 계산한다.
+  청크마다 seed에서 파생된 독립 난수열을 쓰므로
+  같은 seed면 코어 수와 무관하게 결과가 같다.
+
+→ need_index_ranking.csv의 순위가 '가중치 설정에 얼마나 민감한지'를 보여주는 보조 결과
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config import OUTPUT_DIR, WEIGHTS_NEED, WEIGHTS_SUPPLY
+from weight_scenarios import NEED_COLS, SUPPLY_COLS, QUADRANTS, weight_matrix, _evaluate_chunk
+
+TOP_N = 5
+
+
+# =====================================================
+# 1. 가중치 추출
+# =====================================================
+def sample_weights(base, columns, n, concentration, rng):
+    """
+    기본 가중치 주변의 디리클레 추출 (n × 변수 수)
+
+    - 평균이 기본 가중치 비율과 같도록 alpha = 비율 × concentration
+    - concentration이 클수록 기본 가중치에 가깝게 모인다
+    - 추출된 벡터는 기본 가중치의 합으로 다시 곱해
+      main.py 결과와 같은 스케일을 유지 (WEIGHTS_NEED 합은 1.1)
+    """
+    w = weight_matrix([{}], base, columns)[0]
+    total = w.sum()
+    return rng.dirichlet(w / total * concentration, size=n) * total
+
+
+# =====================================================
+# 2. 청크 단위 집계 (병렬 작업 단위)
+# =====================================================
+def _simulate_chunk(args):
+    """
+    청크 하나를 추출 · 평가하고 카운트만 반환 (결과 배열은 보관하지 않음)
+
+    반환 카운트:
+    - need_rank / gap_rank: (자치구 × 순위) 히스토그램
+    - quadrant: (자치구 × 4) 히스토그램
+    """
+    X_need, X_supply, n, concentration, seed_seq = args
+    rng = np.random.default_rng(seed_seq)
+
+    W_need = sample_weights(WEIGHTS_NEED, NEED_COLS, n, concentration, rng)
+    W_supply = sample_weights(WEIGHTS_SUPPLY, SUPPLY_COLS, n, concentration, rng)
+    result = _evaluate_chunk(X_need, X_supply, W_need, W_supply)
+
+    n_districts = X_need.shape[0]
+    cols = np.arange(n_districts)
+
+    def histogram(codes, n_bins):
+        flat = (cols * n_bins + codes).ravel()
+        return np.bincount(flat, minlength=n_districts * n_bins).reshape(n_districts, n_bins)
+
+    return {
+        "need_rank": histogram(result["need_rank"] - 1, n_districts),
+        "gap_rank": histogram(result["gap_rank"] - 1, n_districts),
+        "quadrant": histogram(result["quadrant"], len(QUADRANTS)),
+    }
+
+
+def simulate_weight_uncertainty(
+    df_need_norm,
+    df_supply_norm,
+    n_draws=100_000,
+    concentration=100.0,
+    seed=42,
+    chunk_size=10_000,
+    n_jobs=None,
+):
+    """
+    가중치 몬테카를로 시뮬레이션
+
+    입력:
+    - df_need_norm, df_supply_norm: normalize_data()의 결과
+    - n_draws: 추출할 가중치 시나리오 수
+    - concentration: 디리클레 집중도 (클수록 기본 가중치 근처)
+    - seed: 재현용 시드 (청크별 난수열은 SeedSequence.spawn으로 파생)
+    - chunk_size: 청크 하나의 시나리오 수 (결과 재현성 단위)
+    - n_jobs: 병렬 프로세스 수 (None이면 CPU 수, 1이면 단일 프로세스)
+
+    반환:
+    - {"need_rank", "gap_rank", "quadrant"} 카운트 배열 + "n_draws"
+    """
+    X_need = df_need_norm[NEED_COLS].to_numpy(dtype=float)
+    X_supply = df_supply_norm[SUPPLY_COLS].to_numpy(dtype=float)
+
+    sizes = [min(chunk_size, n_draws - s) for s in range(0, n_draws, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(X_need, X_supply, n, concentration, ss) for n, ss in zip(sizes, seeds)]
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or len(tasks) == 1:
+        parts = map(_simulate_chunk, tasks)
+        counts = _sum_counts(parts)
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as pool:
+            counts = _sum_counts(pool.map(_simulate_chunk, tasks))
+
+    counts["n_draws"] = n_draws
+    return counts
+
+
+def _sum_counts(parts):
+    total = None
+    for part in parts:
+        if total is None:
+            total = part
+        else:
+            for k in total:
+                total[k] += part[k]
+    return total
+
+
+# =====================================================
+# 3. 자치구별 요약표
+# =====================================================
+def _rank_quantile(hist, q):
+    """순위 히스토그램 → 분위수 순위 (자치구별)"""
+    cdf = np.cumsum(hist, axis=1) / hist.sum(axis=1, keepdims=True)
+    return (cdf < q).sum(axis=1) + 1
+
+
+def summarize_uncertainty(counts, districts, top_n=TOP_N):
+    """
+    카운트 → 자치구별 순위 안정성 표
+
+    출력 컬럼:
+    - Need_Rank_Mean / _P05 / _P95 / _Min / _Max
+    - P_Need_Top{top_n}
+    - Gap_Rank_Mean / _P05 / _P95
+    - P_Quadrant_A ~ P_Quadrant_D
+    """
+    n = counts["n_draws"]
+    ranks = np.arange(1, len(districts) + 1)
+
+    df = pd.DataFrame({"district": districts})
+    for name, key in [("Need", "need_rank"), ("Gap", "gap_rank")]:
+        hist = counts[key]
+        df[f"{name}_Rank_Mean"] = hist @ ranks / n
+        df[f"{name}_Rank_P05"] = _rank_quantile(hist, 0.05)
+        df[f"{name}_Rank_P95"] = _rank_quantile(hist, 0.95)
+        if name == "Need":
+            seen = hist > 0
+            df["Need_Rank_Min"] = seen.argmax(axis=1) + 1
+            df["Need_Rank_Max"] = len(districts) - seen[:, ::-1].argmax(axis=1)
+            df[f"P_Need_Top{top_n}"] = hist[:, :top_n].sum(axis=1) / n
+
+    for j, q in enumerate(QUADRANTS):
+        df[f"P_Quadrant_{q}"] = counts["quadrant"][:, j] / n
+
+    return df.sort_values("Need_Rank_Mean").reset_index(drop=True)
+
+
+# =====================================================
+# 실행 진입점
+# =====================================================
+def main():
+    import time
+    from table_store import load_district_table
+    from data_loader import normalize_data
+
+    df = load_district_table("merged")
+    df_need_norm, df_supply_norm = normalize_data(df)
+
+    start = time.perf_counter()
+    counts = simulate_weight_uncertainty(df_need_norm, df_supply_norm)
+    elapsed = time.perf_counter() - start
+
+    df_unc = summarize_uncertainty(counts, df_need_norm["district"].tolist())
+    df_unc.to_csv(
+        OUTPUT_DIR / "need_rank_uncertainty.csv",
+        index=False,
+        encoding="utf-8-sig"
+    )
+
+    print(f"\n🎲 가중치 몬테카를로: {counts['n_draws']:,}회 ({elapsed:.2f}초)")
+    print(df_unc[["district", "Need_Rank_Mean", "Need_Rank_P05", "Need_Rank_P95",
+                  f"P_Need_Top{TOP_N}"]].head(10).to_string(index=False))
+    print(f"📁 저장 위치: {OUTPUT_DIR / 'need_rank_uncertainty.csv'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ import folium
 from streamlit_folium import st_folium
 import json
 import os
+import sys
 import pandas as pd
 import charts_3 as charts
 
@@ -46,6 +47,10 @@ RANK_PATH = os.path.join(ROOT_DIR, "data", "outputs", "tables", "ai_blindspot_ra
 SHAP_PATH = os.path.join(ROOT_DIR, "data", "outputs", "tables", "ai_blindspot_shap.csv")
 POLICY_PATH = os.path.join(ROOT_DIR, "data", "outputs", "recommend_policy", "need_policy_recommendation_by_district.csv")
 
+# 분석 파이프라인과 같은 테이블 로더(해시 기반 캐시)를 쓰기 위해 src/analysis 경로 추가
+sys.path.insert(0, os.path.join(ROOT_DIR, "src", "analysis"))
+from table_store import load_district_table
+
 # 2. Streamlit 페이지 기본 설정
 st.set_page_config(
     page_title="서울시 정신건강 인사이트 플랫폼",
@@ -283,9 +288,7 @@ def load_data():
     # 레이더 차트용 통합 데이터
     if os.path.exists(NEED_PATH) and os.path.exists(SUPPLY_PATH):
         try:
-            df_need = pd.read_csv(NEED_PATH)
-            df_supply = pd.read_csv(SUPPLY_PATH)
-            radar_df = pd.merge(df_need, df_supply, on='district', how='inner')
+            radar_df = load_district_table("merged")
         except Exception as e:
             st.error(f"레이더 데이터 로드 중 오류: {e}")
 
@@ -0,0 +1,6 @@
+"""src/analysis 모듈은 평평한 import(from config import ...)를 쓰므로 경로에 추가"""
+import sys
+from pathlib import Path
+
+ANALYSIS_DIR = Path(__file__).resolve().parents[1] / "src" / "analysis"
+sys.path.insert(0, str(ANALYSIS_DIR))
@@ -0,0 +1,41 @@
+"""main.py import 비용: 무거운 라이브러리는 해당 단계가 실행될 때만 불러와야 함"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ANALYSIS_DIR = Path(__file__).resolve().parents[1] / "src" / "analysis"
+
+# 단계 실행 전에는 불러오면 안 되는 라이브러리
+HEAVY_MODULES = ["sklearn", "shap", "matplotlib", "joblib", "scipy"]
+
+# import main 시간 상한 (초) — pandas / numpy import 포함, 현재 약 0.5초
+IMPORT_BUDGET_S = 2.0
+
+SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "loaded": loaded}}))
+"""
+
+
+def _import_main():
+    # 새 인터프리터에서 측정 (테스트 프로세스에 이미 불러온 모듈의 영향 없음)
+    out = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        cwd=ANALYSIS_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_main_import_skips_heavy_modules():
+    assert _import_main()["loaded"] == []
+
+
+def test_main_import_within_budget():
+    # 첫 실행의 .pyc 생성 / 디스크 캐시 영향을 줄이기 위해 두 번 중 빠른 쪽
+    elapsed = min(_import_main()["elapsed"] for _ in range(2))
+    assert elapsed < IMPORT_BUDGET_S, f"import main: {elapsed:.2f}s (budget {IMPORT_BUDGET_S}s)"
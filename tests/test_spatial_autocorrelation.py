@@ -0,0 +1,41 @@
+"""spatial_autocorrelation: 같은 seed면 실행 / 코어 수와 무관하게 같은 p값"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import OUTPUT_DIR
+from spatial_autocorrelation import _folded_p, run_spatial_autocorrelation
+
+
+def test_folded_p_ignores_rounding_noise():
+    # 순열이 실제 이웃 집합을 뽑으면 합산 순서만 달라 관측값과 반올림 오차만큼 차이남
+    observed = np.array([0.3, -0.2])
+    sims = np.array([
+        [0.3, 0.0, 1.0, 2.0],
+        [-0.2, 0.0, -1.0, 1.0],
+    ])
+    exact = _folded_p(sims, observed)
+    for noise in (1 - 1e-13, 1 + 1e-13):
+        noisy = sims.copy()
+        noisy[:, 0] *= noise
+        np.testing.assert_array_equal(_folded_p(noisy, observed), exact)
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    from spatial_adjacency import load_adjacency, align_weights, row_standardize
+
+    df = pd.read_csv(OUTPUT_DIR / "mhvi_final_result.csv", encoding="utf-8-sig")
+    W = row_standardize(align_weights(load_adjacency(), df["district"], kind="queen"))
+    return df, W
+
+
+def test_same_seed_same_result(inputs):
+    df, W = inputs
+    runs = [
+        run_spatial_autocorrelation(df, W, permutations=999, chunk_size=7, n_jobs=n_jobs)
+        for n_jobs in (1, 1, 2)
+    ]
+    for df_global, df_local in runs[1:]:
+        pd.testing.assert_frame_equal(df_global, runs[0][0])
+        pd.testing.assert_frame_equal(df_local, runs[0][1])